@@ -0,0 +1,56 @@
+import time
+import hashlib
+from typing import Dict, Any
+from src.ai_analyzer import ANALYSIS_PROMPT, narrow_prompt
+from src.summary_parser import parse_summary_page, missing_fields, merge_results
+
+class FakeAnalyzer:
+    """
+    Drop-in replacement for AIAnalyzer that never calls the API.
+    Each "response" takes `latency` seconds (prompt building is timed separately by the benchmark).
+    Fields the summary parser cannot read are filled with values derived from a hash of the text,
+    so the same filing always yields the same JSON.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def _respond(self, text: str) -> Dict[str, Any]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+        def value(i: int, scale: float) -> float:
+            return round(((seed >> (i * 4)) % 997 + 3) * scale, 1)
+
+        return {
+            "basic_info": {"company_name": "", "fiscal_period": ""},
+            "pl": {"net_sales": value(0, 100), "operating_profit": value(1, 10), "ordinary_profit": value(2, 10),
+                   "net_income": value(3, 6), "eps": value(4, 0.1), "operating_profit_forecast": value(5, 40)},
+            "bs": {"total_assets": value(6, 200), "total_net_assets": value(7, 100), "current_assets": value(8, 80),
+                   "current_liabilities": value(9, 50), "quick_assets": value(10, 40),
+                   "interest_bearing_debt": value(11, 30), "equity_ratio": value(12, 0.05), "bps": value(13, 1)},
+            "cf": {"operating_cf": value(1, 11), "investment_cf": -value(14, 5), "financing_cf": -value(15, 2)},
+            "qualitative": {
+                "progress_comment": "計画通りに進捗しています。",
+                "future_strategy": "主力事業の拡大を継続します。",
+                "risk_factors": "為替変動リスクがあります。",
+                "management_attitude": "株主還元に積極的です。",
+                "cost_efficiency_comment": "販管費の効率化が進んでいます。",
+            },
+        }
+
+    def analyze_text(self, text: str, use_cache: bool = True, prompt: str = ANALYSIS_PROMPT) -> Dict[str, Any]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(text)
+
+    def analyze(self, text: str, use_cache: bool = True, fast_path: bool = True) -> Dict[str, Any]:
+        if fast_path:
+            return self.analyze_with_fast_path(text, use_cache=use_cache)
+        return self.analyze_text(text, use_cache=use_cache)
+
+    def analyze_with_fast_path(self, text: str, use_cache: bool = True) -> Dict[str, Any]:
+        parsed = parse_summary_page(text)
+        llm = self.analyze_text(text, use_cache=use_cache, prompt=narrow_prompt(missing_fields(parsed)))
+        return merge_results(parsed, llm)
@@ -0,0 +1,79 @@
+"""
+Memory footprint of a screening universe held as FinancialData, FinancialRecord and FinancialTable.
+
+    python -m benchmarks.memory --companies 4000 --quarters 20
+"""
+import sys
+import json
+import random
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+from src.models import FinancialData
+from src.columnar import FinancialRecord, FinancialTable, NUMERIC_FIELDS
+
+COMMENTS = [
+    "計画通りに進捗しています。主力製品の販売が堅調に推移しました。",
+    "原材料価格の高騰により利益率が低下しました。価格転嫁を進めています。",
+    "新規事業への投資を継続し、中期経営計画の達成を目指します。",
+    "為替変動および地政学リスクの影響を注視しています。",
+]
+
+def make_universe(companies: int, quarters: int, seed: int = 0) -> List[FinancialData]:
+    rng = random.Random(seed)
+    rows = []
+    for c in range(companies):
+        name = f"テスト{1000 + c}株式会社"
+        for q in range(quarters):
+            values = {f: (round(rng.uniform(-1e5, 1e6), 1) if rng.random() > 0.1 else None) for f in NUMERIC_FIELDS}
+            # Text built at runtime, as json.loads would, so equal strings are separate objects
+            rows.append(FinancialData(
+                **values,
+                company_name="".join(name),
+                fiscal_period=f"{2020 + q // 4}年3月期 第{q % 4 + 1}四半期",
+                progress_comment="".join(rng.choice(COMMENTS)) + str(rng.randint(0, 50)),
+                future_strategy="".join(rng.choice(COMMENTS)),
+                risk_factors="".join(rng.choice(COMMENTS)),
+                management_attitude="".join(rng.choice(COMMENTS)),
+                cost_efficiency_comment="".join(rng.choice(COMMENTS)) + str(rng.randint(0, 50)),
+            ))
+    return rows
+
+def measure(build: Callable[[], object]) -> int:
+    """Bytes still allocated by the object build() returns."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del obj
+    return size
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare memory use of FinancialData containers")
+    parser.add_argument("--companies", type=int, default=4000)
+    parser.add_argument("--quarters", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    def dataclasses():
+        return make_universe(args.companies, args.quarters)
+
+    source = make_universe(args.companies, args.quarters)
+    results: Dict[str, int] = {
+        "FinancialData list": measure(dataclasses),
+        "FinancialRecord list": measure(lambda: [FinancialRecord.from_data(d) for d in make_universe(args.companies, args.quarters)]),
+        "FinancialTable": measure(lambda: FinancialTable.from_records(make_universe(args.companies, args.quarters))),
+        "FinancialTable (lazy text)": measure(lambda: FinancialTable.from_records(
+            source, text_loader=lambda key: None)),
+    }
+    rows = args.companies * args.quarters
+    baseline = results["FinancialData list"]
+    print(f"{rows:,} rows ({args.companies} companies x {args.quarters} quarters)")
+    for name, size in results.items():
+        print(f"{name:<28}{size / 2**20:>10.1f} MiB{size / rows:>10.0f} B/row{size / baseline:>8.0%}")
+    print(json.dumps({"rows": rows, "bytes": results}))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Pipeline benchmark on synthetic filings with a fake LLM backend.
+
+    python -m benchmarks.run                       # run and compare against benchmarks/baseline.json
+    python -m benchmarks.run --update-baseline     # record a new baseline
+    python -m benchmarks.run --companies 50 --pages 40 --latency 0.5 --output result.json
+
+Each company goes through the same stages as main.py (discovery, pdfminer extraction, prompt build,
+analysis, map_json_to_model, evaluate, generate_markdown_report). Per-stage p50/p95 latency and
+overall throughput are written as JSON. The exit status is 1 when a stage is slower than the
+baseline by more than --tolerance.
+
+Absolute timings depend on the machine, so every run also times a fixed pure-Python workload
+(calibration_ms), and compare() scales the baseline by the ratio of the two calibrations before
+applying the tolerance. A baseline recorded on a different machine then still measures the code
+rather than the hardware; re-record it when the hardware differs a lot (e.g. another CPU family).
+"""
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+from typing import Dict, List, Optional
+from src.pdf_loader import find_financial_reports, extract_text_from_pdf
+from src.prompt_builder import PromptBuilder
+from src.pipeline import select_periods
+from src.evaluator import Evaluator
+from src.reporter import Reporter
+from src.file_index import FileIndex
+from .synthetic import generate_universe
+from .fake_analyzer import FakeAnalyzer
+
+STAGES = ["discovery", "extraction", "prompt_build", "analysis", "map_json_to_model", "evaluate", "report"]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+# Stages faster than this are too noisy to compare with a relative tolerance alone
+MIN_DELTA_MS = 1.0
+
+def calibrate(repeat: int = 7) -> float:
+    """
+    Time of a fixed pure-Python workload, in milliseconds, to normalize timings across machines.
+    The fastest run after a warm-up is used; it is far less noisy than the median.
+    """
+    samples = []
+    for _ in range(repeat + 1):
+        started = time.perf_counter()
+        counts: Dict[str, int] = {}
+        for i in range(200_000):
+            key = str(i % 997)
+            counts[key] = counts.get(key, 0) + i
+        samples.append(time.perf_counter() - started)
+    return round(min(samples[1:]) * 1000, 3)
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(samples, 0.5) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+        "total_s": round(sum(samples), 4),
+    }
+
+def run_benchmark(companies: int, pages: int, latency: float, sections_only: bool, warmup: int = 1,
+                  workdir: Optional[str] = None) -> Dict[str, object]:
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        input_dir = os.path.join(tmp, "input")
+        codes = generate_universe(input_dir, companies + warmup, pages)
+
+        index_start = time.perf_counter()
+        index = FileIndex(input_dir)
+        index_build = time.perf_counter() - index_start
+
+        analyzer = FakeAnalyzer(latency=latency)
+        prompt_builder = PromptBuilder()
+        evaluator = Evaluator("config/criteria.yaml")
+        reporter = Reporter(os.path.join(tmp, "output"))
+        samples: Dict[str, List[float]] = {s: [] for s in STAGES}
+
+        start = None
+        for i, code in enumerate(codes):
+            if i == warmup:
+                start = time.perf_counter()
+            timings = {}
+
+            t = time.perf_counter()
+            reports_map = find_financial_reports(input_dir, code, index=index)
+            _, _, current_path, _, prev_path = select_periods(reports_map)
+            timings["discovery"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            current_text = extract_text_from_pdf(current_path, sections_only=sections_only)
+            prev_text = extract_text_from_pdf(prev_path, sections_only=sections_only)
+            timings["extraction"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            prompt_builder.build(current_text)
+            prompt_builder.build(prev_text)
+            timings["prompt_build"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            current_json = analyzer.analyze_with_fast_path(current_text)
+            prev_json = analyzer.analyze_with_fast_path(prev_text)
+            timings["analysis"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            current_data = evaluator.map_json_to_model(current_json)
+            last_year_data = evaluator.map_json_to_model(prev_json)
+            timings["map_json_to_model"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            report = evaluator.evaluate(current_data, last_year_data, 2500.0)
+            timings["evaluate"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                reporter.generate_markdown_report(report)
+            timings["report"] = time.perf_counter() - t
+
+            if i >= warmup:
+                for stage, seconds in timings.items():
+                    samples[stage].append(seconds)
+
+        elapsed = time.perf_counter() - start
+
+    return {
+        "config": {"companies": companies, "pages": pages, "latency": latency, "sections_only": sections_only},
+        "calibration_ms": calibrate(),
+        "throughput_per_min": round(companies / elapsed * 60, 2),
+        "elapsed_s": round(elapsed, 3),
+        "index_build_ms": round(index_build * 1000, 3),
+        "stages": {stage: summarize(s) for stage, s in samples.items()},
+    }
+
+def compare(result: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """
+    Regressions of result against baseline, as human-readable lines. When both carry calibration_ms
+    the baseline is first scaled to this machine's speed.
+    """
+    scale = 1.0
+    if result.get("calibration_ms") and baseline.get("calibration_ms"):
+        scale = result["calibration_ms"] / baseline["calibration_ms"]
+    regressions = []
+    for stage, base in baseline.get("stages", {}).items():
+        current = result["stages"].get(stage)
+        if current is None:
+            continue
+        for stat in ("p50_ms", "p95_ms"):
+            expected = base[stat] * scale
+            limit = max(expected * (1 + tolerance), expected + MIN_DELTA_MS)
+            if current[stat] > limit:
+                regressions.append(f"{stage} {stat}: {current[stat]:.3f} > {limit:.3f} (baseline {base[stat]:.3f}"
+                                   + (f", x{scale:.2f} for this machine)" if scale != 1.0 else ")"))
+    base_throughput = baseline.get("throughput_per_min")
+    if base_throughput:
+        base_throughput /= scale
+    if base_throughput and result["throughput_per_min"] < base_throughput * (1 - tolerance):
+        regressions.append(f"throughput: {result['throughput_per_min']:.2f}/min < "
+                           f"{base_throughput * (1 - tolerance):.2f}/min (baseline {base_throughput:.2f})")
+    return regressions
+
+def print_table(result: Dict[str, object]):
+    print(f"{'stage':<20}{'p50 ms':>12}{'p95 ms':>12}{'mean ms':>12}")
+    for stage, s in result["stages"].items():
+        print(f"{stage:<20}{s['p50_ms']:>12.3f}{s['p95_ms']:>12.3f}{s['mean_ms']:>12.3f}")
+    print(f"throughput: {result['throughput_per_min']:.2f} companies/min ({result['config']['companies']} companies)")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on synthetic filings")
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=30, help="pages per synthetic filing")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake LLM latency per call in seconds")
+    parser.add_argument("--full-text", action="store_true", help="extract every page instead of the relevant sections")
+    parser.add_argument("--warmup", type=int, default=1, help="companies run before timing starts")
+    parser.add_argument("--output", help="write the result JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed slowdown against the baseline (0.3 = 30%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.companies, args.pages, args.latency, not args.full_text, args.warmup)
+    print_table(result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one.")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get("config") != result["config"]:
+        print(f"Baseline was recorded with {baseline.get('config')}; not comparing.")
+        return 0
+    regressions = compare(result, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Startup cost of each CLI subcommand, measured in fresh interpreters.
+
+    python -m benchmarks.startup                   # compare against benchmarks/startup_baseline.json
+    python -m benchmarks.startup --update-baseline
+
+For every subcommand the wall time of a complete run on a small fixture and the import time
+reported by `python -X importtime` are recorded. "eager imports" loads openai and pdfminer up
+front, as main.py used to, for reference. The bare "interpreter" row is the calibration: the
+baseline is scaled by the ratio of the interpreter times before it is compared (see run.compare).
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Optional
+from .run import compare, percentile
+from .synthetic import write_pdf, filing_pages
+from .fake_analyzer import FakeAnalyzer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "startup_baseline.json")
+_IMPORTTIME = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| (\S.*)$")
+
+def top_level_import_us(stderr: str) -> int:
+    """Sum of the cumulative times of top-level imports in -X importtime output, in microseconds."""
+    total = 0
+    for line in stderr.splitlines():
+        m = _IMPORTTIME.match(line)
+        # Nested imports are indented below their parent
+        if m and not m.group(2).startswith(" "):
+            total += int(m.group(1))
+    return total
+
+def commands(workdir: str) -> Dict[str, List[str]]:
+    main = os.path.join(REPO_ROOT, "main.py")
+    pdf = os.path.join(workdir, "1234_2025_1Q.pdf")
+    current_json = os.path.join(workdir, "1234_2025_1Q.json")
+    return {
+        "interpreter": ["-c", "pass"],
+        "eager imports": ["-c", "import openai, pdfminer.high_level, src.evaluator"],
+        "import main": ["-c", "import main"],
+        "extract": [main, "extract", pdf, "--out", os.path.join(workdir, "text")],
+        "analyze --dry-run": [main, "analyze", pdf, "--dry-run"],
+        "evaluate": [main, "evaluate", "--json", current_json, "--price", "1500"],
+        "report": [main, "report", "--json", current_json, "--price", "1500", "--output", os.path.join(workdir, "out")],
+    }
+
+def prepare_fixture(workdir: str):
+    pdf = os.path.join(workdir, "1234_2025_1Q.pdf")
+    write_pdf(pdf, filing_pages("1234", 2025, "1Q", 8))
+    from src.pdf_loader import extract_text_from_pdf
+    result = FakeAnalyzer().analyze_with_fast_path(extract_text_from_pdf(pdf, sections_only=True))
+    with open(os.path.join(workdir, "1234_2025_1Q.json"), 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False)
+
+def run_startup_benchmark(repeat: int = 5) -> Dict[str, object]:
+    stages = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        prepare_fixture(workdir)
+        for name, argv in commands(workdir).items():
+            walls, imports = [], []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                proc = subprocess.run([sys.executable, "-X", "importtime", *argv], cwd=REPO_ROOT,
+                                      capture_output=True, text=True)
+                walls.append(time.perf_counter() - started)
+                if proc.returncode != 0:
+                    raise RuntimeError(f"{name} failed: {proc.stderr[-500:]}")
+                imports.append(top_level_import_us(proc.stderr) / 1e6)
+            stages[name] = {
+                "p50_ms": round(percentile(walls, 0.5) * 1000, 1),
+                "p95_ms": round(percentile(walls, 0.95) * 1000, 1),
+                "import_ms": round(percentile(imports, 0.5) * 1000, 1),
+            }
+    return {"config": {"repeat": repeat}, "calibration_ms": stages["interpreter"]["p50_ms"], "stages": stages}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure CLI startup time per subcommand")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the result JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    result = run_startup_benchmark(args.repeat)
+    print(f"{'command':<20}{'wall p50 ms':>14}{'wall p95 ms':>14}{'import ms':>12}")
+    for name, s in result["stages"].items():
+        print(f"{name:<20}{s['p50_ms']:>14.1f}{s['p95_ms']:>14.1f}{s['import_ms']:>12.1f}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one.")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    baseline.setdefault("calibration_ms", baseline["stages"].get("interpreter", {}).get("p50_ms"))
+    # The reference rows measure third-party packages, not this code base
+    baseline["stages"] = {k: v for k, v in baseline["stages"].items() if k not in ("interpreter", "eager imports")}
+    regressions = compare(result, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Generates synthetic 決算短信-like PDFs for benchmarking.
+
+The PDFs use the non-embedded Type0 font HeiseiKakuGo-W5 with the UniJIS-UCS2-H CMap, like many
+Japanese filings, so pdfminer goes through the same CJK decoding path as for real documents.
+"""
+import os
+import random
+from typing import List
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+FONT_SIZE = 9
+LEADING = 13
+LINES_PER_PAGE = 58
+
+FILLER_TOPICS = ["注記事項", "セグメント情報", "継続企業の前提に関する注記", "株主資本の金額に著しい変動があった場合の注記",
+                 "会計方針の変更", "補足情報", "受注の状況", "販売の状況"]
+
+def _hex(text: str) -> str:
+    return "<" + text.encode("utf-16-be").hex().upper() + ">"
+
+def _content_stream(lines: List[str]) -> bytes:
+    ops = ["BT", f"/F1 {FONT_SIZE} Tf", f"{LEADING} TL", f"40 {PAGE_HEIGHT - 50} Td"]
+    for line in lines:
+        ops.append(f"{_hex(line)} Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode("ascii")
+
+def write_pdf(path: str, pages: List[List[str]]):
+    """Writes one PDF page per list of lines."""
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # placeholder, filled in once the page tree exists
+    pages_obj = add(b"")
+    descriptor = add(b"<< /Type /FontDescriptor /FontName /HeiseiKakuGo-W5 /Flags 4 "
+                     b"/FontBBox [-92 -250 1010 922] /ItalicAngle 0 /Ascent 752 /Descent -221 "
+                     b"/CapHeight 737 /StemV 114 >>")
+    cid_font = add(f"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /HeiseiKakuGo-W5 "
+                   f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Japan1) /Supplement 2 >> "
+                   f"/FontDescriptor {descriptor} 0 R /DW 1000 /W [1 95 500] >>".encode("ascii"))
+    font = add(f"<< /Type /Font /Subtype /Type0 /BaseFont /HeiseiKakuGo-W5-UniJIS-UCS2-H "
+               f"/Encoding /UniJIS-UCS2-H /DescendantFonts [{cid_font} 0 R] >>".encode("ascii"))
+
+    page_ids = []
+    for lines in pages:
+        stream = _content_stream(lines)
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(f"<< /Type /Page /Parent {pages_obj} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                            f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {content} 0 R >>".encode("ascii")))
+
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_obj} 0 R >>".encode("ascii")
+    kids = " ".join(f"{p} 0 R" for p in page_ids)
+    objects[pages_obj - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("ascii")
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode("ascii") + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("ascii")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+def _num(value: float) -> str:
+    return f"△{abs(value):,.0f}" if value < 0 else f"{value:,.0f}"
+
+def filing_pages(code: str, year: int, quarter: str, page_count: int, seed: int = 0) -> List[List[str]]:
+    """
+    Page texts of one synthetic filing: サマリー情報, 経営成績等の概況, the three statements and
+    filler notes up to page_count pages. Figures are random but deterministic for (code, year, quarter, seed).
+    """
+    rng = random.Random(f"{code}-{year}-{quarter}-{seed}")
+    company = f"テスト{code}株式会社"
+    qn = {"1Q": 1, "2Q": 2, "3Q": 3}.get(quarter)
+    period = f"{year}年3月期第{qn}四半期" if qn else f"{year}年3月期"
+    prior = f"{year - 1}年3月期第{qn}四半期" if qn else f"{year - 1}年3月期"
+    title = f"{year}年3月期 第{qn}四半期決算短信〔日本基準〕(連結)" if qn else f"{year}年3月期 決算短信〔日本基準〕(連結)"
+
+    sales = rng.randint(10_000, 500_000) * (qn or 4) / 4
+    op = sales * rng.uniform(0.02, 0.2)
+    ordinary = op * rng.uniform(0.95, 1.1)
+    net = ordinary * 0.65
+    eps = net / rng.randint(50, 400)
+    assets = sales * rng.uniform(1.0, 2.5)
+    net_assets = assets * rng.uniform(0.3, 0.7)
+    forecast_op = op / (qn or 4) * 4 * rng.uniform(0.9, 1.2)
+
+    summary = [
+        title,
+        f"上場会社名 {company} 上場取引所 東",
+        f"コード番号 {code} URL https://www.example.co.jp",
+        "(百万円未満切捨て)",
+        f"1．{period}の連結業績",
+        "(1) 連結経営成績（累計） (%表示は、対前年同四半期増減率)",
+        "売上高 営業利益 経常利益 親会社株主に帰属する当期純利益",
+        "百万円 % 百万円 % 百万円 % 百万円 %",
+        f"{period} {_num(sales)} 8.0 {_num(op)} 5.0 {_num(ordinary)} 4.0 {_num(net)} 3.0",
+        f"{prior} {_num(sales / 1.08)} 2.0 {_num(op / 1.05)} 1.0 {_num(ordinary / 1.04)} 1.5 {_num(net / 1.03)} 0.5",
+        "1株当たり当期純利益 潜在株式調整後1株当たり当期純利益",
+        "円 銭 円 銭",
+        f"{period} {eps:.2f} －",
+        f"{prior} {eps / 1.03:.2f} －",
+        "(2) 連結財政状態",
+        "総資産 純資産 自己資本比率",
+        "百万円 百万円 %",
+        f"{period} {_num(assets)} {_num(net_assets)} {net_assets / assets * 100:.1f}",
+        f"{year - 1}年3月期 {_num(assets * 0.97)} {_num(net_assets * 0.97)} {net_assets / assets * 100:.1f}",
+        "2．配当の状況",
+        f"3．{year}年3月期の連結業績予想",
+        "売上高 営業利益 経常利益",
+        "百万円 % 百万円 % 百万円 %",
+        f"通期 {_num(sales / (qn or 4) * 4)} 8.0 {_num(forecast_op)} 5.0 {_num(forecast_op * 1.02)} 4.0",
+    ]
+    toc = ["目次"] + [f"{i + 1}．{t} ........ {i + 2}" for i, t in
+                     enumerate(["経営成績等の概況", "連結貸借対照表", "連結損益計算書", "連結キャッシュ・フロー計算書"])]
+    qualitative = ["1．経営成績等の概況", "(1) 当期の経営成績の概況"] + [
+        f"当社グループは主力製品の販売が堅調に推移し、販管費の効率化を進めました。施策{i + 1}を継続しています。"
+        for i in range(20)
+    ]
+    current_assets = assets * 0.5
+    bs = ["2．連結財務諸表及び主な注記", "(1) 連結貸借対照表", "（単位：百万円）",
+          "資産の部", f"流動資産合計 {_num(current_assets)}", f"現金及び預金 {_num(current_assets * 0.4)}",
+          f"受取手形及び売掛金 {_num(current_assets * 0.3)}", f"資産合計 {_num(assets)}",
+          "負債の部", f"流動負債合計 {_num(current_assets * 0.6)}", f"短期借入金 {_num(assets * 0.05)}",
+          f"長期借入金 {_num(assets * 0.1)}", f"純資産合計 {_num(net_assets)}"]
+    pl = ["(2) 連結損益計算書及び連結包括利益計算書", "（単位：百万円）",
+          f"売上高 {_num(sales)}", f"売上原価 {_num(sales * 0.7)}", f"売上総利益 {_num(sales * 0.3)}",
+          f"販売費及び一般管理費 {_num(sales * 0.3 - op)}", f"営業利益 {_num(op)}", f"経常利益 {_num(ordinary)}",
+          f"親会社株主に帰属する当期純利益 {_num(net)}"]
+    cf = ["(3) 連結キャッシュ・フロー計算書", "（単位：百万円）",
+          f"営業活動によるキャッシュ・フロー {_num(op * 1.1)}", f"投資活動によるキャッシュ・フロー {_num(-op * 0.5)}",
+          f"財務活動によるキャッシュ・フロー {_num(-op * 0.2)}"]
+
+    pages = [summary, toc, qualitative, bs, pl, cf]
+    i = 0
+    while len(pages) < page_count:
+        topic = FILLER_TOPICS[i % len(FILLER_TOPICS)]
+        pages.append([f"({i + 1}) {topic}"] + [
+            f"{topic}に関する記載事項 {rng.randint(1, 9999):,} 百万円 前期比 {rng.uniform(-10, 10):.1f}%"
+            for _ in range(LINES_PER_PAGE - 1)
+        ])
+        i += 1
+    return pages[:max(page_count, 1)]
+
+def generate_universe(input_dir: str, companies: int, page_count: int, year: int = 2025,
+                      quarter: str = "1Q", seed: int = 0) -> List[str]:
+    """
+    Writes {code}_{year}_{quarter}.pdf plus the prior-year filing for `companies` codes.
+    Returns the generated stock codes.
+    """
+    os.makedirs(input_dir, exist_ok=True)
+    codes = [str(1000 + i) for i in range(companies)]
+    for code in codes:
+        for y in (year - 1, year):
+            write_pdf(os.path.join(input_dir, f"{code}_{y}_{quarter}.pdf"),
+                      filing_pages(code, y, quarter, page_count, seed))
+    return codes
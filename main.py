@@ -1,11 +1,68 @@
 import sys
 import os
+import json
+import argparse
+from typing import Optional
 from src.pdf_loader import find_financial_reports, extract_text_from_pdf
 from src.ai_analyzer import AIAnalyzer
 from src.evaluator import Evaluator
+from src.keyword_scanner import KeywordSignals
 from src.reporter import Reporter
+from src.extraction_cache import ExtractionCache
+from src.response_cache import ResponseCache, SQLiteBackend
+from src.pipeline import select_periods
+from src.store import FinancialStore
+from src.file_index import FileIndex
+from src.instrumentation import (Tracer, JsonLinesExporter, PrometheusTextfileExporter, SummaryTableExporter,
+                                 get_tracer, set_tracer)
+
+STORE_PATH = "data/financials.sqlite3"
+FILE_INDEX_PATH = ".cache/file_index.json"
+RESPONSE_CACHE_PATH = ".cache/responses.sqlite3"
+RESPONSE_CACHE_TTL = 30 * 24 * 3600
+
+def open_response_cache(args) -> Optional[ResponseCache]:
+    """The shared AI response cache, or None with --no-cache (responses are neither read nor stored)."""
+    if args.no_cache:
+        return None
+    return ResponseCache(SQLiteBackend(RESPONSE_CACHE_PATH), ttl_seconds=RESPONSE_CACHE_TTL)
+
+def analyzer_options(args) -> dict:
+    """Keyword arguments shared by AIAnalyzer and AsyncAIAnalyzer for the --split/--numeric-* flags."""
+    return {"split": args.split, "numeric_model": args.numeric_model, "qualitative": not args.numeric_only}
+
+def extract_options(args) -> dict:
+    """Keyword arguments for extract_text_guarded from the --page-workers/--page-timeout/--memory-limit-mb flags."""
+    return {"page_workers": args.page_workers, "page_timeout": args.page_timeout,
+            "memory_limit_mb": args.memory_limit_mb}
+
+async def analyze_periods(response_cache, current_text, prev_text, fast_path=True, options=None):
+    import asyncio
+    from src.async_analyzer import AsyncAIAnalyzer
+
+    analyzer = AsyncAIAnalyzer(cache=response_cache, **(options or {}))
+    try:
+        tasks = [analyzer.analyze(current_text, fast_path=fast_path)]
+        if prev_text:
+            tasks.append(analyzer.analyze(prev_text, fast_path=fast_path))
+        results = await asyncio.gather(*tasks)
+    finally:
+        await analyzer.aclose()
+    return results[0], (results[1] if prev_text else None)
+
+def print_provenance(analysis_json):
+    provenance = analysis_json.get("provenance")
+    if not provenance:
+        return
+    parser_fields = sorted(k for k, v in provenance.items() if v == "parser")
+    llm_fields = sorted(k for k, v in provenance.items() if v == "llm")
+    print(f"  パーサー抽出: {len(parser_fields)} 項目 ({', '.join(parser_fields)})")
+    print(f"  AI抽出: {len(llm_fields)} 項目")
+
+def run_interactive(sections_only: bool = True, fast_path: bool = True, options=None,
+                    response_cache: Optional[ResponseCache] = None):
+    import asyncio
 
-def main():
     print("=== 10倍株発掘ツール ===")
 
     # 1. User Input
@@ -19,62 +76,499 @@ def main():
         return
 
     # 2. Find Files
-    reports_map = find_financial_reports("input", stock_code)
+    reports_map = find_financial_reports("input", stock_code, index=FileIndex("input", FILE_INDEX_PATH))
     if not reports_map:
         print(f"エラー: inputディレクトリにコード {stock_code} のPDFが見つかりません。")
         print("命名規則: {code}_{year}_{quarter}.pdf (例: 8035_2024_1Q.pdf)")
         return
 
-    # Sort years to find the latest and previous
-    years = sorted(reports_map.keys(), reverse=True)
-    latest_year = years[0]
-    # Assuming we want to compare same quarter of latest year vs previous year
-    # Let's ask user or pick the latest available quarter in the latest year
-    latest_quarters = sorted(reports_map[latest_year].keys(), reverse=True)
-    target_quarter = latest_quarters[0]
-
-    current_pdf_path = reports_map[latest_year][target_quarter]
+    latest_year, target_quarter, current_pdf_path, prev_year, prev_pdf_path = select_periods(reports_map)
     print(f"最新のレポート: {current_pdf_path} ({latest_year} {target_quarter}) を読み込み中...")
 
-    # Find Previous Year Same Quarter
-    prev_year = str(int(latest_year) - 1)
-    prev_pdf_path = None
-    if prev_year in reports_map and target_quarter in reports_map[prev_year]:
-        prev_pdf_path = reports_map[prev_year][target_quarter]
+    # Prior periods that were analyzed before are loaded from the store instead of re-analyzed
+    store = FinancialStore(STORE_PATH)
+    last_year_data = store.get(stock_code, prev_year, target_quarter)
+    if last_year_data:
+        print(f"昨年のデータを保存済みデータから読み込みました ({prev_year} {target_quarter})。")
+        prev_pdf_path = None
+    elif prev_pdf_path:
         print(f"昨年のレポート: {prev_pdf_path} ({prev_year} {target_quarter}) を読み込み中...")
     else:
         print(f"昨年のレポートが見つかりません ({prev_year} {target_quarter})。YoY分析はスキップされます。")
 
     # 3. Processing
-    analyzer = AIAnalyzer()
     evaluator = Evaluator("config/criteria.yaml")
     reporter = Reporter("output")
+    extraction_cache = ExtractionCache(".cache/extraction")
 
-    # Extract & Analyze Current
-    current_text = extract_text_from_pdf(current_pdf_path)
-    if not current_text:
-        print("PDFからテキストを抽出できませんでした。")
-        return
+    tracer = get_tracer()
 
-    print("AIによる解析を実行中 (最新)...")
-    current_json = analyzer.analyze_text(current_text)
-    current_data = evaluator.map_json_to_model(current_json)
+    # Extract Current & Previous (if exists)
+    with tracer.span("extract", code=stock_code):
+        current_text = extract_text_from_pdf(current_pdf_path, cache=extraction_cache, sections_only=sections_only)
+        if not current_text:
+            print("PDFからテキストを抽出できませんでした。")
+            return
+        prev_text = extract_text_from_pdf(prev_pdf_path, cache=extraction_cache, sections_only=sections_only) if prev_pdf_path else ""
 
-    # Extract & Analyze Previous (if exists)
-    last_year_data = None
-    if prev_pdf_path:
-        prev_text = extract_text_from_pdf(prev_pdf_path)
-        if prev_text:
-            print("AIによる解析を実行中 (昨年)...")
-            prev_json = analyzer.analyze_text(prev_text)
-            last_year_data = evaluator.map_json_to_model(prev_json)
+    # Analyze both periods concurrently
+    print("AIによる解析を実行中 (最新" + (" + 昨年" if prev_text else "") + ")...")
+    with tracer.span("analyze", code=stock_code):
+        current_json, prev_json = asyncio.run(analyze_periods(response_cache, current_text, prev_text, fast_path, options))
+    print_provenance(current_json)
+    # Keyword signals are counted locally over the extracted text and kept with the analysis
+    signals = evaluator.scan(current_text)
+    signals.attach(current_json)
+    current_data = evaluator.map_json_to_model(current_json)
+    store.put(stock_code, latest_year, target_quarter, current_data, current_json, current_pdf_path)
+    if prev_json is not None:
+        last_year_data = evaluator.map_json_to_model(prev_json)
+        store.put(stock_code, prev_year, target_quarter, last_year_data, prev_json, prev_pdf_path)
 
     # 4. Evaluate & Report
     print("データを評価中...")
-    report = evaluator.evaluate(current_data, last_year_data, stock_price)
+    with tracer.span("evaluate", code=stock_code):
+        report = evaluator.evaluate(current_data, last_year_data, stock_price, signals)
 
-    reporter.generate_markdown_report(report)
+    with tracer.span("report", code=stock_code):
+        reporter.submit(stock_code, latest_year, target_quarter, report)
+
+    stats = extraction_cache.stats()
+    print(f"抽出キャッシュ: ヒット {stats['hits']} / ミス {stats['misses']}")
+    if response_cache is not None:
+        stats = response_cache.stats()
+        print(f"AI応答キャッシュ: ヒット {stats['hits']} / ミス {stats['misses']}")
     print("\n完了しました。outputフォルダを確認してください。")
 
+def run_batch(args):
+    from src.batch import BatchScreener, load_universe
+    from src.batch_report import BatchReportWriter
+
+    universe = load_universe(args.universe)
+    if not universe:
+        print(f"エラー: {args.universe} に銘柄がありません。")
+        return
+    print(f"=== ユニバーススクリーニング: {len(universe)} 銘柄 ===")
+
+    response_cache = open_response_cache(args)
+    report_writer = BatchReportWriter(args.output, sort_by=args.rank_by.split(","))
+    screener = BatchScreener(
+        args.input,
+        AIAnalyzer(cache=response_cache, **analyzer_options(args)),
+        Evaluator(args.criteria),
+        report_writer,
+        extraction_cache=ExtractionCache(".cache/extraction"),
+        extract_workers=args.extract_workers,
+        llm_workers=args.llm_workers,
+        sections_only=not args.full_text,
+        fast_path=not args.llm_only,
+        store=FinancialStore(STORE_PATH),
+        file_index=FileIndex(args.input, FILE_INDEX_PATH),
+        extract_options=extract_options(args),
+    )
+    try:
+        screener.run(universe)
+    finally:
+        report_writer.close()
+
+def run_timeseries(args):
+    from src.timeseries import QuarterlySeries, period_label, to_period
+
+    index = FileIndex(args.input, FILE_INDEX_PATH)
+    reports_map = find_financial_reports(args.input, args.code, index=index)
+    store = FinancialStore(STORE_PATH)
+
+    # Every filed period plus any period only kept in the store, oldest first
+    periods = {(y, q): path for y, quarters in reports_map.items() for q, path in quarters.items()}
+    for y, q in store.periods(args.code):
+        periods.setdefault((y, q), None)
+    periods = {k: v for k, v in periods.items() if to_period(*k) is not None}
+    if not periods:
+        print(f"エラー: コード {args.code} の決算データが見つかりません。")
+        return
+    print(f"=== 時系列分析: {args.code} ({len(periods)} 期間) ===")
+
+    analyzer = None
+    extraction_cache = ExtractionCache(".cache/extraction")
+    evaluator = Evaluator(args.criteria)
+    series = QuarterlySeries()
+    company_name = args.code
+    for (year, quarter) in sorted(periods, key=lambda k: to_period(*k)):
+        # Only periods never analyzed before are extracted; the rest come from the store
+        data = store.get(args.code, year, quarter)
+        if data is None:
+            path = periods[(year, quarter)]
+            text = extract_text_from_pdf(path, cache=extraction_cache, sections_only=not args.full_text)
+            if not text:
+                print(f"  {year} {quarter}: テキストを抽出できませんでした。スキップします。")
+                continue
+            print(f"  {year} {quarter}: AIによる解析を実行中...")
+            if analyzer is None:
+                analyzer = AIAnalyzer(cache=open_response_cache(args), **analyzer_options(args))
+            result = analyzer.analyze(text, fast_path=not args.llm_only)
+            evaluator.scan(text).attach(result)
+            data = evaluator.map_json_to_model(result)
+            store.put(args.code, year, quarter, data, result, path)
+        series.add(year, quarter, data)
+        company_name = data.company_name or company_name
+
+    latest = series.periods()[-1] if series.periods() else None
+    if latest is None:
+        print("解析できた期間がありません。")
+        return
+    m = series.metrics(latest)
+    print(f"最新期間: {period_label(latest)}")
+    if m.ttm_margin is not None:
+        print(f"  営業利益率 (TTM): {m.ttm_margin:.1f}%")
+    for metric in ("net_sales", "operating_profit", "eps"):
+        cagr = series.cagr(metric)
+        if cagr:
+            print(f"  {metric} CAGR: {cagr[1]:+.1f}% ({cagr[0]}年)")
+
+    Reporter(args.output).generate_timeseries_report(args.code, company_name, series)
+
+def run_watch(args):
+    from src.watcher import FilingWatcher
+
+    response_cache = open_response_cache(args)
+    watcher = FilingWatcher(
+        args.input,
+        AIAnalyzer(cache=response_cache, **analyzer_options(args)),
+        Evaluator(args.criteria),
+        Reporter(args.output),
+        args.prices,
+        extraction_cache=ExtractionCache(".cache/extraction"),
+        store=FinancialStore(STORE_PATH),
+        file_index=FileIndex(args.input, FILE_INDEX_PATH),
+        workers=args.workers,
+        queue_size=args.queue_size,
+        poll_interval=args.poll_interval,
+        sections_only=not args.full_text,
+        fast_path=not args.llm_only,
+        latency_target=args.latency_target,
+        metrics_interval=args.metrics_interval,
+        extract_options=extract_options(args),
+    )
+    print(f"=== 監視モード: {args.input} に追加される決算短信を処理します (Ctrl+C で終了) ===")
+    watcher.run()
+
+def _report_key(path: str):
+    """(code, year, quarter) from a {code}_{year}_{quarter}.pdf/.txt/.json path, or None."""
+    from src.file_index import parse_report_filename
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return parse_report_filename(stem + ".pdf")
+
+def _extract(path: str, args, extraction_cache) -> str:
+    """extract_text_from_pdf, or the page-parallel extraction with per-page errors when --page-workers is set."""
+    from src.parallel_extract import extract_text_guarded
+
+    return extract_text_guarded(path, cache=extraction_cache, sections_only=not args.full_text, **extract_options(args))
+
+def run_extract(args):
+    extraction_cache = ExtractionCache(".cache/extraction")
+    os.makedirs(args.out, exist_ok=True)
+    for path in args.paths:
+        with get_tracer().span("extract", path=path):
+            text = _extract(path, args, extraction_cache)
+        if not text:
+            print(f"{path}: テキストを抽出できませんでした。")
+            continue
+        out_path = os.path.join(args.out, os.path.splitext(os.path.basename(path))[0] + ".txt")
+        with open(out_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"{path} -> {out_path} ({len(text):,} 文字)")
+
+def run_analyze(args):
+    analyzer = store = evaluator = None
+    extraction_cache = ExtractionCache(".cache/extraction")
+    os.makedirs(args.json_out, exist_ok=True)
+    for path in args.paths:
+        if path.endswith(".pdf"):
+            text = _extract(path, args, extraction_cache)
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        if not text:
+            print(f"{path}: テキストがありません。")
+            continue
+
+        if args.dry_run:
+            from src.prompt_builder import PromptBuilder
+            built = PromptBuilder().build(text)
+            print(f"{path}: {built.tokens} tokens (document {built.source_tokens} tokens)")
+            continue
+
+        if analyzer is None:
+            analyzer = AIAnalyzer(cache=open_response_cache(args), **analyzer_options(args))
+            store = FinancialStore(STORE_PATH)
+            evaluator = Evaluator("config/criteria.yaml")
+        with get_tracer().span("analyze", path=path):
+            result = analyzer.analyze(text, fast_path=not args.llm_only)
+        evaluator.scan(text).attach(result)
+        out_path = os.path.join(args.json_out, os.path.splitext(os.path.basename(path))[0] + ".json")
+        with open(out_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"{path} -> {out_path}")
+
+        key = _report_key(path)
+        if key is not None:
+            store.put(*key, evaluator.map_json_to_model(result), result, path)
+
+def _load_for_evaluation(args, evaluator):
+    """
+    (current_data, last_year_data, keyword_signals, (code, year, quarter)) from --json files or from
+    the store, or None. A --json file not named {code}_{year}_{quarter}.json is keyed by its name.
+    """
+    if args.json:
+        with open(args.json, 'r', encoding='utf-8') as f:
+            current_json = json.load(f)
+        last_year_data = None
+        if args.prev_json:
+            with open(args.prev_json, 'r', encoding='utf-8') as f:
+                last_year_data = evaluator.map_json_to_model(json.load(f))
+        key = _report_key(args.json) or (args.code or os.path.splitext(os.path.basename(args.json))[0],
+                                         args.year or "", args.quarter or "")
+        return (evaluator.map_json_to_model(current_json), last_year_data, KeywordSignals.from_result(current_json),
+                key)
+
+    if not args.code:
+        print("エラー: 証券コードか --json を指定してください。")
+        return None
+    store = FinancialStore(STORE_PATH)
+    if args.year and args.quarter:
+        year, quarter = args.year, args.quarter
+        current_data = store.get(args.code, year, args.quarter)
+    else:
+        latest = store.latest(args.code)
+        year, quarter, current_data = latest if latest else (None, None, None)
+    if current_data is None:
+        print(f"エラー: コード {args.code} の解析済みデータがありません。先に analyze を実行してください。")
+        return None
+    print(f"{args.code} {year} {quarter} の保存済みデータを評価します。")
+    return (current_data, store.get(args.code, str(int(year) - 1), quarter),
+            KeywordSignals.from_result(store.get_raw(args.code, year, quarter)), (args.code, year, quarter))
+
+def run_evaluate(args):
+    evaluator = Evaluator(args.criteria)
+    loaded = _load_for_evaluation(args, evaluator)
+    if loaded is None:
+        return
+    with get_tracer().span("evaluate"):
+        report = evaluator.evaluate(*loaded[:2], args.price, loaded[2])
+
+    print(f"{report.company_name} {report.fiscal_period} (株価 {args.price:,.0f} 円)")
+    for k, v in report.valuations.items():
+        print(f"  {k}: {v}")
+    for ev in report.evaluations:
+        print(f"  {ev.metric_name}: {ev.value} [{ev.assessment}]")
+
+    if args.command == "report":
+        with get_tracer().span("report"):
+            Reporter(args.output).submit(*loaded[3], report)
+
+def run_revalue(args):
+    from src.batch import load_universe
+    from src.batch_report import BatchReportWriter
+    from src.revaluation import Revaluer
+
+    universe = load_universe(args.prices)
+    if not universe:
+        print(f"エラー: {args.prices} に銘柄がありません。")
+        return
+    print(f"=== 株価更新による再評価: {len(universe)} 銘柄 (PDF抽出・AI解析なし) ===")
+    revaluer = Revaluer(Evaluator(args.criteria), FinancialStore(STORE_PATH))
+    with BatchReportWriter(args.output, sort_by=args.rank_by.split(","),
+                           write_reports=not args.summary_only) as report_writer:
+        with get_tracer().span("revalue", companies=len(universe)):
+            revaluer.run(universe, report_writer)
+
+def run_backfill(args):
+    from openai import OpenAI
+    from src.batch_api import BatchSubmitter
+
+    index = FileIndex(args.input, FILE_INDEX_PATH)
+    codes = args.codes or index.codes()
+    jobs = [(code, year, quarter, path)
+            for code in codes
+            for year, quarters in sorted(index.lookup(code).items())
+            for quarter, path in sorted(quarters.items())]
+    print(f"=== Batch API による一括解析: {len(codes)} 銘柄 / {len(jobs)} ファイル ===")
+    submitter = BatchSubmitter(
+        OpenAI(api_key=os.environ.get("OPENAI_API_KEY")),
+        Evaluator(args.criteria),
+        FinancialStore(STORE_PATH),
+        state_path=args.state,
+        model=args.model,
+        cache=open_response_cache(args),
+        extraction_cache=ExtractionCache(".cache/extraction"),
+        sections_only=not args.full_text,
+        fast_path=not args.llm_only,
+    )
+    if submitter.run(jobs, wait=not args.no_wait, poll_interval=args.poll_interval):
+        print("すべてのバッチが完了しました。")
+    else:
+        print(f"未完了のバッチがあります。再度 backfill を実行すると {args.state} から再開します。")
+
+def run_serve(args):
+    import asyncio
+    from src.server import AnalysisServer
+    from src.async_analyzer import AsyncAIAnalyzer
+
+    response_cache = open_response_cache(args)
+    server = AnalysisServer(
+        Evaluator(args.criteria),
+        FinancialStore(STORE_PATH),
+        AsyncAIAnalyzer(cache=response_cache, max_concurrency=args.max_concurrency, **analyzer_options(args)),
+        input_dir=args.input,
+        file_index=FileIndex(args.input, FILE_INDEX_PATH),
+        extraction_cache=ExtractionCache(".cache/extraction"),
+        host=args.host,
+        port=args.port,
+        max_concurrency=args.max_concurrency,
+        max_waiting=args.max_waiting,
+        extract_workers=args.extract_workers,
+        sections_only=not args.full_text,
+        fast_path=not args.llm_only,
+        extract_options=extract_options(args),
+    )
+    print("=== サーバーモード (Ctrl+C で終了) ===")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n停止しました。")
+
+def dispatch(args):
+    if args.command == "batch":
+        run_batch(args)
+    elif args.command == "timeseries":
+        run_timeseries(args)
+    elif args.command == "watch":
+        run_watch(args)
+    elif args.command == "extract":
+        run_extract(args)
+    elif args.command == "analyze":
+        run_analyze(args)
+    elif args.command in ("evaluate", "report"):
+        run_evaluate(args)
+    elif args.command == "revalue":
+        run_revalue(args)
+    elif args.command == "backfill":
+        run_backfill(args)
+    elif args.command == "serve":
+        run_serve(args)
+    else:
+        run_interactive(sections_only=not args.full_text, fast_path=not args.llm_only, options=analyzer_options(args),
+                        response_cache=open_response_cache(args))
+
+def main():
+    parser = argparse.ArgumentParser(description="10倍株発掘ツール")
+    parser.add_argument("--full-text", action="store_true", help="財務諸表ページに絞らず全ページを抽出する")
+    parser.add_argument("--llm-only", action="store_true", help="サマリー情報のローカル解析を使わず全項目をAIで抽出する")
+    parser.add_argument("--split", action="store_true",
+                        help="数値項目と定性項目を別々のリクエストで並列に抽出する (数値は --numeric-model で)")
+    parser.add_argument("--numeric-model", default="gpt-4o-mini", help="--split 時に数値項目の抽出に使うモデル")
+    parser.add_argument("--numeric-only", action="store_true", help="定性項目の抽出を省き数値項目だけを抽出する (--split を含む)")
+    parser.add_argument("--no-cache", action="store_true", help="AI応答キャッシュを使わず毎回APIに問い合わせる")
+    parser.add_argument("--trace", metavar="PATH", help="処理時間・トークン使用量をJSON Lines形式で記録する")
+    parser.add_argument("--metrics-file", metavar="PATH", help="Prometheus textfile形式のメトリクスを書き出す")
+    parser.add_argument("--summary", action="store_true", help="終了時に処理時間・トークン・コストの集計を表示する")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="CSV (code,price) の銘柄リストを一括スクリーニング")
+    batch_parser.add_argument("universe", help="code,price 形式のCSVファイル")
+    batch_parser.add_argument("--input", default="input")
+    batch_parser.add_argument("--output", default="output")
+    batch_parser.add_argument("--criteria", default="config/criteria.yaml")
+    batch_parser.add_argument("--extract-workers", type=int, default=None, help="PDF抽出プロセス数 (既定: CPU数)")
+    batch_parser.add_argument("--llm-workers", type=int, default=8, help="同時AI解析数")
+    batch_parser.add_argument("--rank-by", default="-score,PEG,PER",
+                              help="サマリーの並び順 (カンマ区切りの列名、先頭に - で降順。例: -score,PEG,売上高成長率(YoY))")
+
+    ts_parser = subparsers.add_parser("timeseries", help="1銘柄の全期間からTTM・QoQ・CAGRを算出")
+    ts_parser.add_argument("code", help="証券コード")
+    ts_parser.add_argument("--input", default="input")
+    ts_parser.add_argument("--output", default="output")
+    ts_parser.add_argument("--criteria", default="config/criteria.yaml")
+
+    watch_parser = subparsers.add_parser("watch", help="inputディレクトリを監視し、新着PDFを自動で解析")
+    watch_parser.add_argument("prices", help="code,price 形式のCSVファイル (変更時に再読込)")
+    watch_parser.add_argument("--input", default="input")
+    watch_parser.add_argument("--output", default="output")
+    watch_parser.add_argument("--criteria", default="config/criteria.yaml")
+    watch_parser.add_argument("--workers", type=int, default=4, help="同時処理数")
+    watch_parser.add_argument("--queue-size", type=int, default=256, help="作業キューの上限")
+    watch_parser.add_argument("--poll-interval", type=float, default=2.0, help="inotify非対応時のポーリング間隔 (秒)")
+    watch_parser.add_argument("--latency-target", type=float, default=None, help="検知からレポート出力までの目標秒数")
+    watch_parser.add_argument("--metrics-interval", type=float, default=60.0, help="メトリクス表示間隔 (秒)")
+
+    extract_parser = subparsers.add_parser("extract", help="PDFからテキストを抽出して保存 (AI解析なし)")
+    extract_parser.add_argument("paths", nargs="+", help="PDFファイル")
+    extract_parser.add_argument("--out", default=".cache/text", help="テキストの出力先")
+
+    analyze_parser = subparsers.add_parser("analyze", help="PDFまたは抽出済みテキストをAIで解析し保存")
+    analyze_parser.add_argument("paths", nargs="+", help="PDFまたは .txt ファイル ({code}_{year}_{quarter} 形式なら保存データにも登録)")
+    analyze_parser.add_argument("--json-out", default="data/analysis", help="解析結果JSONの出力先")
+    analyze_parser.add_argument("--dry-run", action="store_true", help="APIを呼ばずにプロンプトのトークン数だけ表示する")
+
+    for name, help_text in (("evaluate", "解析済みデータを株価・基準で再評価 (PDF抽出・AI解析なし)"),
+                            ("report", "解析済みデータを再評価しMarkdownレポートを出力")):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("code", nargs="?", help="証券コード (保存済みデータを使う場合)")
+        sub.add_argument("--price", type=float, required=True, help="株価")
+        sub.add_argument("--year", help="決算年度 (既定: 最新)")
+        sub.add_argument("--quarter", help="四半期 (既定: 最新)")
+        sub.add_argument("--json", help="解析結果JSONファイル (保存データの代わりに使う)")
+        sub.add_argument("--prev-json", help="前年同期の解析結果JSONファイル")
+        sub.add_argument("--criteria", default="config/criteria.yaml")
+        sub.add_argument("--output", default="output")
+
+    revalue_parser = subparsers.add_parser("revalue", help="保存済みの解析結果を新しい株価で一括再評価 (PDF抽出・AI解析なし)")
+    revalue_parser.add_argument("prices", help="code,price 形式のCSVファイル (例: 当日終値)")
+    revalue_parser.add_argument("--output", default="output")
+    revalue_parser.add_argument("--criteria", default="config/criteria.yaml")
+    revalue_parser.add_argument("--rank-by", default="-score,PEG,PER", help="サマリーの並び順 (batch と同じ形式)")
+    revalue_parser.add_argument("--summary-only", action="store_true", help="銘柄ごとのレポートを書かずサマリーだけ出力する")
+
+    backfill_parser = subparsers.add_parser("backfill", help="過去の決算短信をOpenAI Batch APIでまとめて解析し保存 (中断後は再開)")
+    backfill_parser.add_argument("codes", nargs="*", help="証券コード (省略時はinputの全銘柄)")
+    backfill_parser.add_argument("--input", default="input")
+    backfill_parser.add_argument("--criteria", default="config/criteria.yaml")
+    backfill_parser.add_argument("--model", default="gpt-4o")
+    backfill_parser.add_argument("--state", default=".cache/batch_state.json", help="進捗を記録するファイル")
+    backfill_parser.add_argument("--poll-interval", type=float, default=60.0, help="完了確認の間隔 (秒)")
+    backfill_parser.add_argument("--no-wait", action="store_true", help="投入・確認を1回だけ行い、完了を待たずに終了する")
+
+    serve_parser = subparsers.add_parser("serve", help="常駐HTTPサーバーとして解析・評価APIを提供")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    serve_parser.add_argument("--input", default="input")
+    serve_parser.add_argument("--criteria", default="config/criteria.yaml")
+    serve_parser.add_argument("--max-concurrency", type=int, default=4, help="同時に実行する解析 (抽出+AI) の数")
+    serve_parser.add_argument("--max-waiting", type=int, default=16, help="待機できる解析リクエスト数 (超過分は503)")
+    serve_parser.add_argument("--extract-workers", type=int, default=None, help="PDF抽出プロセス数 (既定: CPU数)")
+
+    for sub in (extract_parser, analyze_parser, batch_parser, watch_parser, serve_parser):
+        sub.add_argument("--page-workers", type=int, default=0,
+                         help="ページ範囲ごとに並列抽出するプロセス数 (大きなPDFや無人実行向け、0で通常の逐次抽出)")
+        sub.add_argument("--page-timeout", type=float, default=120.0,
+                         help="並列抽出の1プロセスあたりの制限時間 (秒)。超過したプロセスは停止される")
+        sub.add_argument("--memory-limit-mb", type=int, default=None, help="並列抽出の1プロセスあたりのメモリ上限 (MB)")
+
+    args = parser.parse_args()
+    exporters = []
+    if args.trace:
+        exporters.append(JsonLinesExporter(args.trace))
+    if args.metrics_file:
+        exporters.append(PrometheusTextfileExporter(args.metrics_file))
+    if args.summary:
+        exporters.append(SummaryTableExporter())
+    if exporters:
+        set_tracer(Tracer(exporters))
+    try:
+        dispatch(args)
+    finally:
+        get_tracer().close()
+
 if __name__ == "__main__":
     main()
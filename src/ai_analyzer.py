@@ -1,18 +1,16 @@
 import os
+import re
 import json
-from openai import OpenAI
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from .response_cache import ResponseCache
+from .prompt_builder import PromptBuilder
+from .summary_parser import parse_summary_page, missing_fields, merge_results
+from .instrumentation import get_tracer
 
-class AIAnalyzer:
-    def __init__(self, api_key: str = None):
-        self.client = OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+SYSTEM_PROMPT = "You are a helpful financial analyst assistant who outputs valid JSON."
 
-    def analyze_text(self, text: str) -> Dict[str, Any]:
-        """
-        Sends the extracted text to OpenAI API and asks it to extract
-        key financial figures and qualitative information based on the criteria.
-        """
-        prompt = """
+ANALYSIS_PROMPT = """
         あなたは熟練した証券アナリストです。以下の決算短信（または四半期報告書）のテキストデータから、
         投資分析に必要な定量的データと定性的情報を抽出し、JSON形式で出力してください。
 
@@ -61,28 +59,195 @@ class AIAnalyzer:
         ## テキストデータ
         """
 
-        # Truncate text if it's too long to fit in context (rough handling)
-        # 128k tokens is a lot, but let's be safe.
-        truncated_text = text[:100000]
-
-        response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a helpful financial analyst assistant who outputs valid JSON."},
-                {"role": "user", "content": prompt + "\n\n" + truncated_text}
-            ],
-            response_format={"type": "json_object"}
-        )
-
-        content = response.choices[0].message.content
-        # Clean up potential markdown code blocks if response_format is not strictly enforced or behaves oddly
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.endswith("```"):
-            content = content[:-3]
-
-        try:
-            return json.loads(content)
-        except json.JSONDecodeError:
-            print("Failed to decode JSON from AI response.")
-            return {}
+RESPONSE_FORMAT = {"type": "json_object"}
+# Contradicts a json_schema response_format, which only allows the bare JSON object
+_CODE_BLOCK_INSTRUCTION = "マークダウンのコードブロック（```json ... ```）で囲ってください。"
+
+def build_messages(prepared_text: str, prompt: str = ANALYSIS_PROMPT) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt + "\n\n" + prepared_text}
+    ]
+
+def narrow_prompt(fields: List[str], qualitative: bool = True, schema: bool = False) -> str:
+    """
+    Returns ANALYSIS_PROMPT reduced to the given 'section.field' items plus, unless qualitative
+    is False, the qualitative section. Sections with nothing left to extract are dropped entirely.
+    With schema (the request sends a json_schema response_format) the code block instruction is left out.
+    """
+    wanted = set(fields)
+    lines = []
+    section = None
+    section_lines: List[str] = []
+    keep_section = False
+
+    def flush():
+        if section is None or keep_section:
+            lines.extend(section_lines)
+
+    for line in ANALYSIS_PROMPT.split("\n"):
+        m = re.search(r"\((basic_info|pl|bs|cf|qualitative)\)", line)
+        if m:
+            flush()
+            section = m.group(1)
+            section_lines = [line]
+            keep_section = qualitative and section == "qualitative"
+            continue
+        if line.strip().startswith("## "):
+            flush()
+            section = None
+            section_lines = [line]
+            continue
+        if section is not None:
+            fm = re.match(r"\s*- (\w+):", line)
+            if fm and section != "qualitative":
+                if f"{section}.{fm.group(1)}" not in wanted:
+                    continue
+                keep_section = True
+        section_lines.append(line)
+    flush()
+    prompt = "\n".join(lines)
+    return prompt.replace(_CODE_BLOCK_INSTRUCTION, "") if schema else prompt
+
+# All numeric and basic_info fields, as 'section.field'
+ALL_FIELDS = missing_fields({})
+QUALITATIVE_PROMPT = narrow_prompt([])
+
+def numeric_response_format(fields: List[str]) -> Dict[str, Any]:
+    """
+    Strict JSON schema for the given 'section.field' items: every field is required and may be null,
+    numbers are numbers and nothing else is allowed, so the reply needs no free text at all.
+    """
+    sections: Dict[str, List[str]] = {}
+    for item in fields:
+        section, name = item.split(".", 1)
+        sections.setdefault(section, []).append(name)
+    properties = {}
+    for section, names in sections.items():
+        value_type = "string" if section == "basic_info" else "number"
+        properties[section] = {
+            "type": "object",
+            "properties": {name: {"type": [value_type, "null"]} for name in names},
+            "required": names,
+            "additionalProperties": False,
+        }
+    return {"type": "json_schema", "json_schema": {
+        "name": "financial_figures", "strict": True,
+        "schema": {"type": "object", "properties": properties, "required": list(properties),
+                   "additionalProperties": False},
+    }}
+
+def merge_split(parsed: Dict[str, Any], numeric: Dict[str, Any], qualitative: Dict[str, Any]) -> Dict[str, Any]:
+    """Combines parser output with the numeric and qualitative responses in the layout of merge_results."""
+    llm = {k: v for k, v in numeric.items() if k != "qualitative"}
+    llm["qualitative"] = qualitative.get("qualitative") or {}
+    return merge_results(parsed, llm)
+
+def parse_response_content(content: str) -> Dict[str, Any]:
+    # Clean up potential markdown code blocks if response_format is not strictly enforced or behaves oddly
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.endswith("```"):
+        content = content[:-3]
+
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        print("Failed to decode JSON from AI response.")
+        return {}
+
+class AIAnalyzer:
+    """
+    With split=True, analyze_with_fast_path sends the numeric fields (strict JSON schema, numeric_model)
+    and the qualitative section (model) as two concurrent requests; qualitative=False skips the latter.
+    """
+
+    def __init__(self, api_key: str = None, model: str = "gpt-4o", cache: Optional[ResponseCache] = None,
+                 prompt_builder: Optional[PromptBuilder] = None, split: bool = False,
+                 numeric_model: str = "gpt-4o-mini", qualitative: bool = True):
+        # Imported here because the openai package takes most of the CLI's startup time
+        from openai import OpenAI
+        self.client = OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+        self.model = model
+        self.cache = cache
+        self.prompt_builder = prompt_builder or PromptBuilder()
+        self.split = split or not qualitative
+        self.numeric_model = numeric_model
+        self.qualitative = qualitative
+
+    def analyze_text(self, text: str, use_cache: bool = True, prompt: str = ANALYSIS_PROMPT,
+                     model: Optional[str] = None, response_format: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Sends the extracted text to OpenAI API and asks it to extract
+        key financial figures and qualitative information based on the criteria.
+        Responses are served from the cache when one is configured, unless use_cache is False.
+        """
+        model = model or self.model
+        response_format = response_format or RESPONSE_FORMAT
+        tracer = get_tracer()
+        built = self.prompt_builder.build(text)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(model, prompt, built.text, response_format)
+            if use_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    tracer.count("response_cache.hit")
+                    return cached
+            tracer.count("response_cache.miss")
+
+        with tracer.span("llm", model=model, prompt_tokens=built.tokens, document_tokens=built.source_tokens,
+                         truncated=built.truncated):
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=build_messages(built.text, prompt),
+                response_format=response_format
+            )
+            tracer.record_llm(model, getattr(response, "usage", None))
+
+        result = parse_response_content(response.choices[0].message.content)
+        # Only successful parses are cached, so a bad response is retried next time
+        if cache_key is not None and result:
+            self.cache.put(cache_key, result)
+        return result
+
+    def analyze(self, text: str, use_cache: bool = True, fast_path: bool = True) -> Dict[str, Any]:
+        """
+        analyze_with_fast_path, or with fast_path=False (--llm-only) every field from the LLM.
+        The split/numeric-only settings apply either way.
+        """
+        if self.split:
+            return self.analyze_split(text, use_cache=use_cache, use_parser=fast_path)
+        if fast_path:
+            return self.analyze_with_fast_path(text, use_cache=use_cache)
+        return self.analyze_text(text, use_cache=use_cache)
+
+    def analyze_with_fast_path(self, text: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Fills what it can from the サマリー情報 page with the local parser and asks the LLM
+        only for the remaining fields and the qualitative section.
+        The result carries a 'provenance' map of which source supplied each field.
+        """
+        if self.split:
+            return self.analyze_split(text, use_cache=use_cache)
+        parsed = parse_summary_page(text)
+        llm = self.analyze_text(text, use_cache=use_cache, prompt=narrow_prompt(missing_fields(parsed)))
+        return merge_results(parsed, llm)
+
+    def analyze_split(self, text: str, use_cache: bool = True, use_parser: bool = True) -> Dict[str, Any]:
+        """
+        Asks numeric_model for the fields the parser could not fill (all of them when use_parser is False)
+        and model for the qualitative section, concurrently, so the scored figures do not wait for the
+        free-text summaries. Either request is skipped when it has nothing to ask for.
+        """
+        parsed = parse_summary_page(text) if use_parser else {}
+        missing = missing_fields(parsed) if use_parser else ALL_FIELDS
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            numeric = pool.submit(self.analyze_text, text, use_cache=use_cache,
+                                  prompt=narrow_prompt(missing, qualitative=False, schema=True), model=self.numeric_model,
+                                  response_format=numeric_response_format(missing)) if missing else None
+            qualitative = pool.submit(self.analyze_text, text, use_cache=use_cache,
+                                      prompt=QUALITATIVE_PROMPT) if self.qualitative else None
+            return merge_split(parsed, numeric.result() if numeric else {},
+                               qualitative.result() if qualitative else {})
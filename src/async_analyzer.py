@@ -0,0 +1,143 @@
+import os
+import asyncio
+import openai
+from openai import AsyncOpenAI
+from typing import Dict, Any, Optional
+from .ai_analyzer import (ANALYSIS_PROMPT, SYSTEM_PROMPT, RESPONSE_FORMAT, QUALITATIVE_PROMPT, ALL_FIELDS,
+                          build_messages, parse_response_content, narrow_prompt, numeric_response_format, merge_split)
+from .summary_parser import parse_summary_page, missing_fields, merge_results
+from .rate_limiter import RateLimiter, backoff_delay
+from .response_cache import ResponseCache
+from .prompt_builder import PromptBuilder
+from .instrumentation import get_tracer
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class AsyncAIAnalyzer:
+    """
+    asyncio variant of AIAnalyzer built on AsyncOpenAI.
+    At most max_concurrency requests are in flight, requests and tokens per minute are
+    throttled with token buckets, and 429/5xx responses are retried with exponential backoff and jitter.
+    """
+
+    def __init__(self, api_key: str = None, model: str = "gpt-4o", cache: Optional[ResponseCache] = None,
+                 max_concurrency: int = 4, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, max_retries: int = 5,
+                 base_url: Optional[str] = None, prompt_builder: Optional[PromptBuilder] = None,
+                 split: bool = False, numeric_model: str = "gpt-4o-mini", qualitative: bool = True):
+        # Retries are handled here so that they respect the shared rate limiter
+        self.client = AsyncOpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"),
+                                  base_url=base_url, max_retries=0)
+        self.model = model
+        self.cache = cache
+        self.max_retries = max_retries
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.prompt_builder = prompt_builder or PromptBuilder()
+        self._instruction_tokens = self.prompt_builder.tokenizer.count(SYSTEM_PROMPT + ANALYSIS_PROMPT)
+        self.split = split or not qualitative
+        self.numeric_model = numeric_model
+        self.qualitative = qualitative
+
+    async def analyze_text(self, text: str, use_cache: bool = True, prompt: str = ANALYSIS_PROMPT,
+                           model: Optional[str] = None, response_format: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        model = model or self.model
+        response_format = response_format or RESPONSE_FORMAT
+        tracer = get_tracer()
+        built = self.prompt_builder.build(text)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(model, prompt, built.text, response_format)
+            if use_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    tracer.count("response_cache.hit")
+                    return cached
+            tracer.count("response_cache.miss")
+
+        messages = build_messages(built.text, prompt)
+        with tracer.span("llm", model=model, prompt_tokens=built.tokens, document_tokens=built.source_tokens,
+                         truncated=built.truncated):
+            content = await self._complete(messages, built.tokens + self._instruction_tokens, model, response_format)
+
+        result = parse_response_content(content)
+        if cache_key is not None and result:
+            self.cache.put(cache_key, result)
+        return result
+
+    async def analyze(self, text: str, use_cache: bool = True, fast_path: bool = True) -> Dict[str, Any]:
+        """Async counterpart of AIAnalyzer.analyze."""
+        if self.split:
+            return await self.analyze_split(text, use_cache=use_cache, use_parser=fast_path)
+        if fast_path:
+            return await self.analyze_with_fast_path(text, use_cache=use_cache)
+        return await self.analyze_text(text, use_cache=use_cache)
+
+    async def analyze_with_fast_path(self, text: str, use_cache: bool = True) -> Dict[str, Any]:
+        """Async counterpart of AIAnalyzer.analyze_with_fast_path."""
+        if self.split:
+            return await self.analyze_split(text, use_cache=use_cache)
+        parsed = parse_summary_page(text)
+        llm = await self.analyze_text(text, use_cache=use_cache, prompt=narrow_prompt(missing_fields(parsed)))
+        return merge_results(parsed, llm)
+
+    async def analyze_split(self, text: str, use_cache: bool = True, use_parser: bool = True) -> Dict[str, Any]:
+        """Async counterpart of AIAnalyzer.analyze_split."""
+        parsed = parse_summary_page(text) if use_parser else {}
+        missing = missing_fields(parsed) if use_parser else ALL_FIELDS
+
+        async def nothing() -> Dict[str, Any]:
+            return {}
+
+        numeric, qualitative = await asyncio.gather(
+            self.analyze_text(text, use_cache=use_cache, prompt=narrow_prompt(missing, qualitative=False, schema=True),
+                              model=self.numeric_model, response_format=numeric_response_format(missing))
+            if missing else nothing(),
+            self.analyze_text(text, use_cache=use_cache, prompt=QUALITATIVE_PROMPT) if self.qualitative else nothing(),
+        )
+        return merge_split(parsed, numeric, qualitative)
+
+    async def _complete(self, messages, estimated_tokens: int, model: Optional[str] = None,
+                        response_format: Optional[Dict[str, Any]] = None) -> str:
+        model = model or self.model
+        tracer = get_tracer()
+        async with self.semaphore:
+            attempt = 0
+            while True:
+                await self.limiter.acquire(estimated_tokens)
+                try:
+                    response = await self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        response_format=response_format or RESPONSE_FORMAT
+                    )
+                    tracer.record_llm(model, getattr(response, "usage", None))
+                    return response.choices[0].message.content
+                except Exception as e:
+                    if attempt >= self.max_retries or not _is_retryable(e):
+                        raise
+                    tracer.count("llm.retry")
+                    delay = max(backoff_delay(attempt), _retry_after(e) or 0.0)
+                    print(f"OpenAI request failed ({e.__class__.__name__}), retrying in {delay:.1f}s...")
+                    attempt += 1
+                    await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self.client.close()
@@ -0,0 +1,164 @@
+import csv
+import time
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Tuple, Optional
+from .pdf_loader import find_financial_reports
+from .parallel_extract import extract_text_guarded
+from .extraction_cache import ExtractionCache
+from .pipeline import select_periods
+from .models import AnalysisReport
+from .store import FinancialStore
+from .file_index import FileIndex
+from .instrumentation import get_tracer
+
+@dataclass
+class BatchResult:
+    stock_code: str
+    stock_price: float
+    year: str = ""
+    quarter: str = ""
+    report: Optional[AnalysisReport] = None
+    error: str = ""
+
+def load_universe(path: str) -> List[Tuple[str, float]]:
+    """
+    Reads a CSV of stock codes and prices.
+    Each row is `code,price`; a header row, blank lines and lines starting with '#' are skipped.
+    """
+    universe = []
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].strip().startswith('#'):
+                continue
+            code = row[0].strip()
+            try:
+                price = float(row[1])
+            except (IndexError, ValueError):
+                if not universe and code.lower() in ("code", "証券コード"):
+                    continue  # header
+                print(f"Skipping invalid universe row: {row}")
+                continue
+            universe.append((code, price))
+    return universe
+
+def _extract_company(current_path: str, prev_path: Optional[str], cache: Optional[ExtractionCache],
+                     sections_only: bool, options: Dict[str, Any]) -> Tuple[str, str, float]:
+    """Runs in a worker process. Also returns the time spent, since spans cannot leave the worker."""
+    started = time.perf_counter()
+    current_text = extract_text_guarded(current_path, cache=cache, sections_only=sections_only, **options)
+    prev_text = extract_text_guarded(prev_path, cache=cache, sections_only=sections_only,
+                                     **options) if prev_path else ""
+    return current_text, prev_text, time.perf_counter() - started
+
+class BatchScreener:
+    """
+    Screens a universe of stock codes without user interaction.
+    PDF text extraction runs in a process pool, the LLM stage runs concurrently in a thread pool,
+    and evaluation runs in the calling thread with a single shared Evaluator. Reports go to
+    reporter.submit: a Reporter writes them directly, a BatchReportWriter on its background thread.
+    A failure for one company is recorded in its BatchResult and does not stop the run.
+    extract_options are passed to extract_text_guarded (page_workers, page_timeout, memory_limit_mb).
+    """
+
+    def __init__(self, input_dir: str, analyzer, evaluator, reporter,
+                 extraction_cache: Optional[ExtractionCache] = None,
+                 extract_workers: Optional[int] = None, llm_workers: int = 8, sections_only: bool = True,
+                 fast_path: bool = True, store: Optional[FinancialStore] = None,
+                 file_index: Optional[FileIndex] = None, extract_options: Optional[Dict[str, Any]] = None):
+        self.input_dir = input_dir
+        self.analyzer = analyzer
+        self.evaluator = evaluator
+        self.reporter = reporter
+        self.extraction_cache = extraction_cache
+        self.extract_workers = extract_workers
+        self.llm_workers = llm_workers
+        self.sections_only = sections_only
+        self.fast_path = fast_path
+        self.store = store
+        self.file_index = file_index
+        self.extract_options = extract_options or {}
+
+    def _analyze(self, code: str, current_text: str, prev_text: str):
+        with get_tracer().span("analyze", code=code):
+            current_json = self.analyzer.analyze(current_text, fast_path=self.fast_path)
+            prev_json = self.analyzer.analyze(prev_text, fast_path=self.fast_path) if prev_text else None
+        return current_json, prev_json
+
+    def run(self, universe: List[Tuple[str, float]]) -> List[BatchResult]:
+        tracer = get_tracer()
+        start = time.perf_counter()
+        results = []
+
+        with ProcessPoolExecutor(max_workers=self.extract_workers) as extract_pool, \
+                ThreadPoolExecutor(max_workers=self.llm_workers) as llm_pool:
+            extract_futures = {}
+            for code, price in universe:
+                result = BatchResult(stock_code=code, stock_price=price)
+                results.append(result)
+
+                reports_map = find_financial_reports(self.input_dir, code, index=self.file_index)
+                if not reports_map:
+                    result.error = "no PDF found"
+                    continue
+                year, quarter, current_path, prev_year, prev_path = select_periods(reports_map)
+                result.year, result.quarter = year, quarter
+                # Prior periods already in the store are not extracted or analyzed again
+                last_year_data = self.store.get(code, prev_year, quarter) if self.store else None
+                if last_year_data is not None:
+                    prev_path = None
+                job = {"prev_year": prev_year, "current_path": current_path, "prev_path": prev_path,
+                       "last_year_data": last_year_data}
+                future = extract_pool.submit(_extract_company, current_path, prev_path,
+                                             self.extraction_cache, self.sections_only, self.extract_options)
+                extract_futures[future] = (result, job)
+
+            llm_futures = {}
+            for future in as_completed(extract_futures):
+                result, job = extract_futures[future]
+                try:
+                    current_text, prev_text, elapsed = future.result()
+                    tracer.record_span("extract", elapsed, code=result.stock_code)
+                except Exception as e:
+                    result.error = f"extraction failed: {e}"
+                    continue
+                if not current_text:
+                    result.error = "no text extracted"
+                    continue
+                # Local keyword counts take milliseconds; done here so the LLM threads only wait on the API
+                job["signals"] = self.evaluator.scan(current_text)
+                llm_futures[llm_pool.submit(self._analyze, result.stock_code, current_text, prev_text)] = (result, job)
+
+            for future in as_completed(llm_futures):
+                result, job = llm_futures[future]
+                try:
+                    current_json, prev_json = future.result()
+                    job["signals"].attach(current_json)
+                    current_data = self.evaluator.map_json_to_model(current_json)
+                    last_year_data = job["last_year_data"]
+                    if prev_json:
+                        last_year_data = self.evaluator.map_json_to_model(prev_json)
+                    if self.store is not None:
+                        records = [(result.stock_code, result.year, result.quarter, current_data,
+                                    current_json, job["current_path"])]
+                        if prev_json:
+                            records.append((result.stock_code, job["prev_year"], result.quarter, last_year_data,
+                                            prev_json, job["prev_path"]))
+                        self.store.put_many(records)
+                    with tracer.span("evaluate", code=result.stock_code):
+                        result.report = self.evaluator.evaluate(current_data, last_year_data, result.stock_price,
+                                                               job["signals"])
+                    with tracer.span("report", code=result.stock_code):
+                        self.reporter.submit(result.stock_code, result.year, result.quarter, result.report)
+                except Exception as e:
+                    result.error = f"analysis failed: {e}"
+                    result.report = None
+
+        elapsed = time.perf_counter() - start
+        succeeded = sum(1 for r in results if r.report is not None)
+        throughput = succeeded / elapsed * 60 if elapsed > 0 else 0.0
+        print(f"Batch finished: {succeeded}/{len(results)} companies in {elapsed:.1f}s ({throughput:.1f} companies/min)")
+        for r in results:
+            if r.error:
+                print(f"  {r.stock_code}: {r.error}")
+        return results
@@ -0,0 +1,225 @@
+import os
+import json
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from .ai_analyzer import RESPONSE_FORMAT, build_messages, narrow_prompt, parse_response_content, ANALYSIS_PROMPT
+from .summary_parser import parse_summary_page, missing_fields, merge_results
+from .prompt_builder import PromptBuilder
+from .pdf_loader import extract_text_from_pdf
+from .extraction_cache import ExtractionCache
+from .response_cache import ResponseCache
+from .store import FinancialStore
+from .keyword_scanner import SIGNALS_KEY
+from .instrumentation import get_tracer
+
+ENDPOINT = "/v1/chat/completions"
+# Per-file limit of the Batch API
+MAX_REQUESTS_PER_BATCH = 50000
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+BatchJob = Tuple[str, str, str, str]  # (code, year, quarter, pdf_path)
+
+def request_id(code: str, year: str, quarter: str) -> str:
+    return f"{code}_{year}_{quarter}"
+
+class BatchState:
+    """
+    Batches of one backfill, persisted to a JSON file after every step (file written, uploaded,
+    batch created, results collected), so an interrupted run resumes where it stopped without
+    uploading or paying for anything twice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.batches: List[Dict[str, Any]] = []
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.batches = json.load(f).get("batches", [])
+
+    def save(self):
+        state_dir = os.path.dirname(self.path)
+        if state_dir and not os.path.exists(state_dir):
+            os.makedirs(state_dir)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"batches": self.batches}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        return [b for b in self.batches if not b.get("collected")]
+
+    def pending_requests(self) -> set:
+        return {rid for b in self.unfinished() for rid in b["requests"]}
+
+class BatchSubmitter:
+    """
+    Analyzes many filings through the OpenAI Batch API instead of one chat completion each.
+    prepare() extracts each PDF and writes the same request AIAnalyzer would send (fast path:
+    only the fields the summary parser missed) as one line of a JSONL file. submit() uploads the
+    file and creates the batch; poll() checks unfinished batches and, once a batch is done,
+    merges each response with its parser output, maps it with map_json_to_model and stores it
+    under (code, year, quarter). Results also go to the response cache, so a later synchronous
+    run of the same filing is a cache hit.
+
+    `client` is an openai.OpenAI or anything with the same files/batches methods.
+    """
+
+    def __init__(self, client, evaluator, store: FinancialStore, state_path: str = ".cache/batch_state.json",
+                 work_dir: str = ".cache/batch", model: str = "gpt-4o", cache: Optional[ResponseCache] = None,
+                 prompt_builder: Optional[PromptBuilder] = None, extraction_cache: Optional[ExtractionCache] = None,
+                 sections_only: bool = True, fast_path: bool = True,
+                 max_requests: int = MAX_REQUESTS_PER_BATCH, completion_window: str = "24h"):
+        self.client = client
+        self.evaluator = evaluator
+        self.store = store
+        self.state = BatchState(state_path)
+        self.work_dir = work_dir
+        self.model = model
+        self.cache = cache
+        self.prompt_builder = prompt_builder or PromptBuilder()
+        self.extraction_cache = extraction_cache
+        self.sections_only = sections_only
+        self.fast_path = fast_path
+        self.max_requests = max_requests
+        self.completion_window = completion_window
+
+    def prepare(self, jobs: List[BatchJob]) -> List[Dict[str, Any]]:
+        """
+        Writes JSONL files for the jobs not already stored or waiting in an unfinished batch.
+        Filings whose response is in the cache are stored right away instead.
+        """
+        tracer = get_tracer()
+        pending = self.state.pending_requests()
+        lines: List[str] = []
+        requests: Dict[str, Dict[str, Any]] = {}
+        for code, year, quarter, path in jobs:
+            rid = request_id(code, year, quarter)
+            if rid in pending or rid in requests or self.store.get(code, year, quarter) is not None:
+                continue
+            text = extract_text_from_pdf(path, cache=self.extraction_cache, sections_only=self.sections_only)
+            if not text:
+                print(f"{path}: no text extracted, skipped")
+                continue
+            parsed = parse_summary_page(text) if self.fast_path else {}
+            # Counted now, while the text is at hand; stored with the batch result later
+            signals = self.evaluator.scan(text).to_dict()
+            prompt = narrow_prompt(missing_fields(parsed)) if self.fast_path else ANALYSIS_PROMPT
+            built = self.prompt_builder.build(text)
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(self.model, prompt, built.text, RESPONSE_FORMAT)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    tracer.count("response_cache.hit")
+                    self._store(code, year, quarter, path, parsed, cached, signals)
+                    continue
+            lines.append(json.dumps({
+                "custom_id": rid, "method": "POST", "url": ENDPOINT,
+                "body": {"model": self.model, "messages": build_messages(built.text, prompt),
+                         "response_format": RESPONSE_FORMAT},
+            }, ensure_ascii=False))
+            requests[rid] = {"code": code, "year": year, "quarter": quarter, "path": path,
+                             "parsed": parsed, "cache_key": cache_key, "signals": signals}
+
+        batches = []
+        if lines:
+            os.makedirs(self.work_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        ids = list(requests)
+        for n, start in enumerate(range(0, len(lines), self.max_requests)):
+            input_path = os.path.join(self.work_dir, f"batch_{stamp}_{n}.jsonl")
+            with open(input_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(lines[start:start + self.max_requests]) + "\n")
+            chunk = ids[start:start + self.max_requests]
+            batch = {"input_path": input_path, "input_file_id": None, "batch_id": None, "status": "prepared",
+                     "collected": False, "requests": {rid: requests[rid] for rid in chunk}, "errors": {}}
+            self.state.batches.append(batch)
+            batches.append(batch)
+        self.state.save()
+        return batches
+
+    def submit(self, batch: Dict[str, Any]):
+        """Uploads and creates one batch, skipping whichever step already happened."""
+        if batch["input_file_id"] is None:
+            with open(batch["input_path"], 'rb') as f:
+                batch["input_file_id"] = self.client.files.create(file=f, purpose="batch").id
+            self.state.save()
+        if batch["batch_id"] is None:
+            created = self.client.batches.create(input_file_id=batch["input_file_id"], endpoint=ENDPOINT,
+                                                 completion_window=self.completion_window)
+            batch["batch_id"], batch["status"] = created.id, created.status
+            self.state.save()
+            print(f"Submitted batch {created.id} ({len(batch['requests'])} requests)")
+
+    def poll(self) -> bool:
+        """Advances every unfinished batch by one step. Returns True when none is left."""
+        for batch in self.state.unfinished():
+            if batch["batch_id"] is None:
+                self.submit(batch)
+                continue
+            remote = self.client.batches.retrieve(batch["batch_id"])
+            if remote.status != batch["status"]:
+                batch["status"] = remote.status
+                self.state.save()
+            if remote.status in TERMINAL_STATUSES:
+                self.collect(batch, remote)
+        return not self.state.unfinished()
+
+    def collect(self, batch: Dict[str, Any], remote):
+        """Stores the results of a finished batch. Expired batches can still carry partial output."""
+        tracer = get_tracer()
+        stored = 0
+        for file_id in (getattr(remote, "output_file_id", None), getattr(remote, "error_file_id", None)):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                rid = item.get("custom_id")
+                request = batch["requests"].get(rid)
+                if request is None:
+                    continue
+                response = item.get("response") or {}
+                if item.get("error") or response.get("status_code") != 200:
+                    batch["errors"][rid] = item.get("error") or response.get("body", {}).get("error") or "failed"
+                    continue
+                result = parse_response_content(response["body"]["choices"][0]["message"]["content"])
+                if not result:
+                    batch["errors"][rid] = "invalid JSON in response"
+                    continue
+                if self.cache is not None and request["cache_key"]:
+                    self.cache.put(request["cache_key"], result)
+                self._store(request["code"], request["year"], request["quarter"], request["path"],
+                            request["parsed"], result, request.get("signals"))
+                stored += 1
+        missing = [rid for rid in batch["requests"] if rid not in batch["errors"]
+                   and self.store.get(*(batch["requests"][rid][k] for k in ("code", "year", "quarter"))) is None]
+        for rid in missing:
+            batch["errors"][rid] = f"no result (batch {remote.status})"
+        tracer.count("batch.stored", stored)
+        tracer.count("batch.failed", len(batch["errors"]))
+        batch["collected"] = True
+        self.state.save()
+        print(f"Batch {batch['batch_id']} {remote.status}: {stored} stored, {len(batch['errors'])} failed")
+
+    def _store(self, code: str, year: str, quarter: str, path: str, parsed: Dict[str, Any], llm: Dict[str, Any],
+               signals: Optional[Dict[str, Any]] = None):
+        result = merge_results(parsed, llm) if self.fast_path else dict(llm)
+        if signals:
+            result[SIGNALS_KEY] = signals
+        self.store.put(code, year, quarter, self.evaluator.map_json_to_model(result), result, path)
+
+    def run(self, jobs: List[BatchJob], wait: bool = True, poll_interval: float = 60.0) -> bool:
+        """
+        Resumes unfinished batches, submits the new jobs and, with wait, polls until everything is
+        collected. Returns True when no batch is left unfinished.
+        """
+        for batch in self.prepare(jobs):
+            self.submit(batch)
+        done = self.poll()
+        while wait and not done:
+            time.sleep(poll_interval)
+            done = self.poll()
+        return done
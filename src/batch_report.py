@@ -0,0 +1,161 @@
+import os
+import re
+import csv
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence
+from .models import AnalysisReport
+from .reporter import Reporter, report_filename
+
+# Assessments counted against a company in the summary score; "Neutral" and "OK" count as zero
+NEGATIVE_ASSESSMENTS = {"Fail", "Declining", "Attention", "Danger", "Caution", "Bad"}
+NEUTRAL_ASSESSMENTS = {"Neutral", "OK"}
+
+DEFAULT_SORT = ("-score", "PEG", "PER")
+
+_NUMBER = re.compile(r"[-+]?\d[\d,]*(?:\.\d+)?")
+
+def parse_number(value: Any) -> Optional[float]:
+    """Numeric part of a formatted metric value such as '+12.30%', '1,234百万円' or '15.20倍'."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    m = _NUMBER.search(str(value))
+    return float(m.group(0).replace(",", "")) if m else None
+
+def summary_row(code: str, year: str, quarter: str, report: AnalysisReport) -> Dict[str, Any]:
+    row: Dict[str, Any] = {
+        "code": code, "company_name": report.company_name, "fiscal_period": report.fiscal_period,
+        "year": year, "quarter": quarter, "stock_price": report.stock_price, "score": 0,
+    }
+    for ev in report.evaluations:
+        row[ev.metric_name] = parse_number(ev.value)
+        if ev.assessment in NEGATIVE_ASSESSMENTS:
+            row["score"] -= 1
+        elif ev.assessment not in NEUTRAL_ASSESSMENTS:
+            row["score"] += 1
+    for k in ("PER", "PBR", "PEG"):
+        row[k] = parse_number(report.valuations[k]) if k in report.valuations else None
+    return row
+
+def rank_rows(rows: List[Dict[str, Any]], sort_by: Sequence[str] = DEFAULT_SORT) -> List[Dict[str, Any]]:
+    """
+    Sorts summary rows by the given columns; a leading '-' sorts that column in descending order.
+    Rows missing a sort column always come after the rows that have it.
+    """
+    ranked = list(rows)
+    # Stable sorts applied from the least to the most significant key
+    for spec in reversed(list(sort_by)):
+        descending = spec.startswith("-")
+        column = spec.lstrip("-")
+        present = [r for r in ranked if r.get(column) is not None]
+        missing = [r for r in ranked if r.get(column) is None]
+        present.sort(key=lambda r: r[column], reverse=descending)
+        ranked = present + missing
+    return ranked
+
+class BatchReportWriter:
+    """
+    Writes per-company reports from a single background thread, so the analysis loop only renders
+    and enqueues. Files are named {code}_{year}_{quarter}.md. close() waits for the queue to drain
+    and writes a ranked universe summary as Markdown and CSV. With write_reports=False only the
+    summary is written.
+    """
+
+    def __init__(self, output_dir: str, sort_by: Sequence[str] = DEFAULT_SORT, max_pending: int = 1024,
+                 write_reports: bool = True):
+        self.output_dir = output_dir
+        self.write_reports = write_reports
+        os.makedirs(output_dir, exist_ok=True)
+        self.renderer = Reporter(output_dir)
+        self.sort_by = list(sort_by)
+        self.rows: List[Dict[str, Any]] = []
+        self.errors: List[str] = []
+        self.written = 0
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="report-writer", daemon=True)
+        self._thread.start()
+        self._closed = False
+
+    def submit(self, code: str, year: str, quarter: str, report: AnalysisReport):
+        """Queues one report. Blocks only when max_pending reports are waiting to be written."""
+        self.rows.append(summary_row(code, year, quarter, report))
+        if self.write_reports:
+            self._queue.put((report_filename(code, year, quarter), report))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            filename, report = item
+            path = os.path.join(self.output_dir, filename)
+            # A failing report must not stop the thread, or submit() blocks once the queue fills
+            try:
+                content = self.renderer.render_markdown(report)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                self.written += 1
+            except Exception as e:
+                self.errors.append(f"{path}: {e.__class__.__name__}: {e}")
+
+    def close(self) -> Optional[str]:
+        """Flushes pending reports and writes the summary. Returns the summary Markdown path."""
+        if self._closed:
+            return None
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        for error in self.errors:
+            print(f"Failed to write report {error}")
+        print(f"Reports written: {self.written} ({self.output_dir})")
+        return self.write_summary() if self.rows else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_summary(self) -> str:
+        ranked = rank_rows(self.rows, self.sort_by)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        md_path = os.path.join(self.output_dir, f"summary_{stamp}.md")
+        csv_path = os.path.join(self.output_dir, f"summary_{stamp}.csv")
+
+        base = ["code", "company_name", "fiscal_period", "year", "quarter", "stock_price", "score", "PER", "PBR", "PEG"]
+        metrics = []
+        for row in ranked:
+            metrics.extend(k for k in row if k not in base and k not in metrics)
+        with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["rank"] + base + metrics)
+            for rank, row in enumerate(ranked, start=1):
+                writer.writerow([rank] + [_csv_value(row.get(k)) for k in base + metrics])
+
+        sort_columns = [s.lstrip("-") for s in self.sort_by if s.lstrip("-") not in base]
+        md = []
+        md.append(f"# ユニバース・サマリー ({len(ranked)} 銘柄)")
+        md.append(f"**作成日**: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+        md.append(f"**並び順**: {', '.join(self.sort_by)}")
+        md.append("")
+        headers = ["順位", "コード", "会社名", "決算期", "株価", "スコア", "PER", "PBR", "PEG"] + sort_columns
+        md.append("| " + " | ".join(headers) + " |")
+        md.append("|" + "---|" * len(headers))
+        for rank, row in enumerate(ranked, start=1):
+            cells = [str(rank), row["code"], row["company_name"], row["fiscal_period"], f"{row['stock_price']:,.0f}",
+                     f"{row['score']:+d}"] + [_md_value(row.get(k)) for k in ["PER", "PBR", "PEG"] + sort_columns]
+            md.append("| " + " | ".join(cells) + " |")
+        with open(md_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(md))
+
+        print(f"Summary generated: {md_path}, {csv_path}")
+        return md_path
+
+def _csv_value(value: Any) -> Any:
+    return "" if value is None else value
+
+def _md_value(value: Any) -> str:
+    if value is None:
+        return "-"
+    return f"{value:,.2f}" if isinstance(value, float) else str(value)
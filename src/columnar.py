@@ -0,0 +1,124 @@
+import sys
+from array import array
+from dataclasses import fields, make_dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .models import FinancialData
+
+NUMERIC_FIELDS = [f.name for f in fields(FinancialData) if f.default is None]
+TEXT_FIELDS = [f.name for f in fields(FinancialData) if f.default == ""]
+# Short, highly repetitive across quarters and companies
+META_FIELDS = ["company_name", "fiscal_period"]
+QUALITATIVE_FIELDS = [name for name in TEXT_FIELDS if name not in META_FIELDS]
+
+RowKey = Tuple[str, str, str]  # (code, year, quarter)
+
+def _intern(value: str) -> str:
+    return sys.intern(value) if value else ""
+
+def _record_from_data(cls, data: FinancialData) -> "FinancialRecord":
+    values = {name: getattr(data, name) for name in NUMERIC_FIELDS}
+    values.update({name: _intern(getattr(data, name)) for name in TEXT_FIELDS})
+    return cls(**values)
+
+def _record_to_data(self) -> FinancialData:
+    return FinancialData(**{name: getattr(self, name) for name in NUMERIC_FIELDS + TEXT_FIELDS})
+
+# Same fields as FinancialData, generated from it so the two cannot drift apart, but with
+# __slots__ instead of a per-instance __dict__ and interned text.
+FinancialRecord = make_dataclass(
+    "FinancialRecord",
+    [(f.name, f.type, field(default=f.default)) for f in fields(FinancialData)],
+    slots=True,
+    namespace={"from_data": classmethod(_record_from_data), "to_data": _record_to_data,
+               "__module__": __name__},
+)
+FinancialRecord.__doc__ = "Slotted, text-interned counterpart of FinancialData."
+
+class FinancialTable:
+    """
+    Columnar container of FinancialData rows.
+    Each numeric field is an array('d') (8 bytes per value) with a bytearray validity mask,
+    so None survives the round trip. company_name and fiscal_period are interned.
+    The qualitative comments are either kept (interned, so identical texts are stored once) or,
+    with a text_loader, dropped and fetched again by row key when a row is materialized.
+    """
+
+    def __init__(self, text_loader: Optional[Callable[[RowKey], Optional[FinancialData]]] = None):
+        self.text_loader = text_loader
+        self.keys: List[Optional[RowKey]] = []
+        self._index: Dict[RowKey, int] = {}
+        self._values: Dict[str, array] = {name: array('d') for name in NUMERIC_FIELDS}
+        self._valid: Dict[str, bytearray] = {name: bytearray() for name in NUMERIC_FIELDS}
+        self._meta: Dict[str, List[str]] = {name: [] for name in META_FIELDS}
+        self._text: Dict[str, List[str]] = {name: [] for name in QUALITATIVE_FIELDS} if text_loader is None else {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def append(self, data: FinancialData, key: Optional[RowKey] = None) -> int:
+        for name in NUMERIC_FIELDS:
+            value = getattr(data, name)
+            self._values[name].append(value if value is not None else 0.0)
+            self._valid[name].append(value is not None)
+        for name in META_FIELDS:
+            self._meta[name].append(_intern(getattr(data, name)))
+        for name, column in self._text.items():
+            column.append(_intern(getattr(data, name)))
+        if key is not None:
+            self._index[key] = len(self.keys)
+        self.keys.append(key)
+        return len(self.keys) - 1
+
+    def extend(self, rows: Iterable[Tuple[Optional[RowKey], FinancialData]]):
+        for key, data in rows:
+            self.append(data, key)
+
+    @classmethod
+    def from_records(cls, records: Iterable[FinancialData], **kwargs) -> "FinancialTable":
+        table = cls(**kwargs)
+        for data in records:
+            table.append(data)
+        return table
+
+    def index_of(self, key: RowKey) -> Optional[int]:
+        return self._index.get(key)
+
+    def value(self, i: int, name: str) -> Optional[float]:
+        return self._values[name][i] if self._valid[name][i] else None
+
+    def column(self, name: str) -> List[Optional[float]]:
+        return [v if ok else None for v, ok in zip(self._values[name], self._valid[name])]
+
+    def row(self, i: int) -> FinancialData:
+        values = {name: self.value(i, name) for name in NUMERIC_FIELDS}
+        values.update({name: column[i] for name, column in self._meta.items()})
+        if self._text:
+            values.update({name: column[i] for name, column in self._text.items()})
+        elif self.keys[i] is not None:
+            loaded = self.text_loader(self.keys[i])
+            if loaded is not None:
+                values.update({name: getattr(loaded, name) for name in QUALITATIVE_FIELDS})
+        return FinancialData(**values)
+
+    def get(self, key: RowKey) -> Optional[FinancialData]:
+        i = self._index.get(key)
+        return self.row(i) if i is not None else None
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def to_numpy_columns(self):
+        """Same layout as vectorized.to_columns (float64 arrays, NaN for missing) without copying per row."""
+        import numpy as np
+
+        columns = {}
+        for name in NUMERIC_FIELDS:
+            col = np.frombuffer(self._values[name], dtype=np.float64).copy()
+            col[np.frombuffer(bytes(self._valid[name]), dtype=np.uint8) == 0] = np.nan
+            columns[name] = col
+        return columns
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the numeric columns and masks."""
+        return sum(a.itemsize * len(a) for a in self._values.values()) + sum(len(m) for m in self._valid.values())
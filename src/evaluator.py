@@ -1,160 +1,38 @@
-import yaml
-from typing import Dict, Any, Optional
-from .models import FinancialData, EvaluationResult, AnalysisReport
+from dataclasses import replace
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from .models import FinancialData, AnalysisReport
+from .rule_engine import RuleEngine
+from .keyword_scanner import KeywordSignals
 
 class Evaluator:
     def __init__(self, config_path: str):
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = yaml.safe_load(f)
+        self.rule_engine = RuleEngine(config_path)
 
-    def evaluate(self, current_data: FinancialData, last_year_data: Optional[FinancialData], stock_price: float) -> AnalysisReport:
+    @property
+    def config(self) -> Dict[str, Any]:
+        return self.rule_engine.config
+
+    def scan(self, text: str) -> KeywordSignals:
+        """Keyword counts of the full extracted text, for evaluate(signals=...). Local, no API call."""
+        return self.rule_engine.scanner.scan(text)
+
+    def evaluate(self, current_data: FinancialData, last_year_data: Optional[FinancialData], stock_price: float,
+                 signals: Optional[KeywordSignals] = None) -> AnalysisReport:
         evaluations = []
-        criteria = self.config['analysis']
-
-        # --- P/L Analysis ---
-        # YoY Sales Growth
-        if current_data.net_sales and last_year_data and last_year_data.net_sales:
-            growth = ((current_data.net_sales - last_year_data.net_sales) / last_year_data.net_sales) * 100
-
-            assessment = "Fail"
-            if growth >= criteria['pl']['revenue_growth_yoy']['thresholds']['top_class']:
-                assessment = "Top Class"
-            elif growth >= criteria['pl']['revenue_growth_yoy']['thresholds']['excellent']:
-                assessment = "Excellent"
-            elif growth >= criteria['pl']['revenue_growth_yoy']['thresholds']['pass']:
-                assessment = "Pass"
-
-            evaluations.append(EvaluationResult(
-                metric_name="売上高成長率(YoY)",
-                value=f"{growth:.2f}%",
-                assessment=assessment
-            ))
-
-        # Operating Margin
-        if current_data.net_sales and current_data.operating_profit:
-            margin = (current_data.operating_profit / current_data.net_sales) * 100
-
-            assessment = "Fail"
-            if margin >= criteria['pl']['operating_margin']['thresholds']['top_class']:
-                assessment = "Top Class"
-            elif margin >= criteria['pl']['operating_margin']['thresholds']['excellent']:
-                assessment = "Excellent"
-            elif margin >= criteria['pl']['operating_margin']['thresholds']['pass']:
-                assessment = "Pass"
-
-            evaluations.append(EvaluationResult(
-                metric_name="営業利益率",
-                value=f"{margin:.2f}%",
-                assessment=assessment
-            ))
-
-        # Operating Margin Improvement (YoY)
-        if (current_data.net_sales and current_data.operating_profit and
-            last_year_data and last_year_data.net_sales and last_year_data.operating_profit):
-            current_margin = (current_data.operating_profit / current_data.net_sales) * 100
-            last_year_margin = (last_year_data.operating_profit / last_year_data.net_sales) * 100
-            margin_change = current_margin - last_year_margin
-
-            assessment = "Improving" if margin_change > 0 else "Declining"
-            evaluations.append(EvaluationResult(
-                metric_name="営業利益率の改善(YoY)",
-                value=f"{margin_change:+.2f}%pt",
-                assessment=assessment,
-                details=f"前年同期: {last_year_margin:.2f}% → 今期: {current_margin:.2f}%"
-            ))
-
-        # Progress Rate (Quarter-specific)
         quarter = self._extract_quarter(current_data.fiscal_period)
-        if quarter and current_data.operating_profit and current_data.operating_profit_forecast:
-            progress_rate = (current_data.operating_profit / current_data.operating_profit_forecast) * 100
-            thresholds = criteria['pl']['progress_rate'].get(quarter, {})
-
-            if thresholds:
-                good_threshold = thresholds.get('good')
-                bad_threshold = thresholds.get('bad')
-
-                assessment = "Attention"
-                if good_threshold and progress_rate >= good_threshold:
-                    assessment = "Good"
-                elif bad_threshold and progress_rate <= bad_threshold:
-                    assessment = "Bad"
-
-                evaluations.append(EvaluationResult(
-                    metric_name=f"進捗率({quarter})",
-                    value=f"{progress_rate:.1f}%",
-                    assessment=assessment,
-                    details=f"営業利益: {current_data.operating_profit:.0f}百万円 / 通期予想: {current_data.operating_profit_forecast:.0f}百万円"
-                ))
-
-        # --- B/S Analysis ---
-        # Equity Ratio
-        if current_data.equity_ratio:
-            ratio = current_data.equity_ratio
-            assessment = "Attention"
-            if ratio >= criteria['bs']['capital_adequacy_ratio']['ironclad']:
-                assessment = "Ironclad"
-            elif ratio >= criteria['bs']['capital_adequacy_ratio']['safe']:
-                assessment = "Safe"
-
-            evaluations.append(EvaluationResult(
-                metric_name="自己資本比率",
-                value=f"{ratio:.2f}%",
-                assessment=assessment
-            ))
-
-        # Current Ratio
-        if current_data.current_assets and current_data.current_liabilities:
-            ratio = (current_data.current_assets / current_data.current_liabilities) * 100
-            assessment = "Danger"
-            if ratio >= criteria['bs']['current_ratio']['very_safe']:
-                assessment = "Very Safe"
-            elif ratio >= criteria['bs']['current_ratio']['safe']:
-                assessment = "Safe"
-            elif ratio >= criteria['bs']['current_ratio']['danger']:
-                assessment = "OK"
-
-            evaluations.append(EvaluationResult(
-                metric_name="流動比率",
-                value=f"{ratio:.2f}%",
-                assessment=assessment
-            ))
-
-        # D/E Ratio
-        if current_data.interest_bearing_debt is not None and current_data.total_net_assets:
-            # Approximating Equity as Total Net Assets for simplicity, though technically Equity = Net Assets - Minority Interests
-            ratio = current_data.interest_bearing_debt / current_data.total_net_assets
-            assessment = "Danger"
-            if ratio <= criteria['bs']['de_ratio']['very_safe']:
-                assessment = "Very Safe"
-            elif ratio <= criteria['bs']['de_ratio']['healthy']:
-                assessment = "Healthy"
-            elif ratio <= criteria['bs']['de_ratio']['danger']:
-                assessment = "Caution"
-
-            evaluations.append(EvaluationResult(
-                metric_name="D/Eレシオ",
-                value=f"{ratio:.2f}倍",
-                assessment=assessment
-            ))
-
-        # --- Valuation ---
-        vals = {}
-        if current_data.eps:
-            per = stock_price / current_data.eps
-            vals['PER'] = f"{per:.2f}倍"
 
-        if current_data.bps:
-            pbr = stock_price / current_data.bps
-            vals['PBR'] = f"{pbr:.2f}倍"
+        # P/L, B/S and C/F metrics are driven by the compiled criteria table; its keyword rules use
+        # the full-text counts in signals when the caller scanned the text
+        for rule in self.rule_engine.rules:
+            result = rule.evaluate(current_data, last_year_data, quarter, signals)
+            if result is not None:
+                evaluations.append(result)
 
-        # PEG Ratio (PER / Growth Rate)
-        if current_data.eps and last_year_data and last_year_data.eps and last_year_data.eps > 0:
-             eps_growth = ((current_data.eps - last_year_data.eps) / last_year_data.eps) * 100
-             if eps_growth > 0 and 'PER' in vals:
-                 # Recalculate PER numerical value
-                 per_val = stock_price / current_data.eps
-                 peg = per_val / eps_growth
-                 vals['PEG'] = f"{peg:.2f}倍"
+        # Qualitative keyword lexicons, scored only from full-text counts
+        if signals is not None:
+            evaluations.extend(self.rule_engine.scanner.evaluate(signals))
+
+        vals = self.compute_valuations(current_data, last_year_data, stock_price)
 
         qual_analysis = {
             "progress_comment": current_data.progress_comment,
@@ -173,6 +51,74 @@ class Evaluator:
             valuations=vals
         )
 
+    def compute_valuations(self, current_data: FinancialData, last_year_data: Optional[FinancialData],
+                           stock_price: float) -> Dict[str, str]:
+        """PER/PBR/PEG, the only part of evaluate() that depends on the stock price."""
+        vals = {}
+        if current_data.eps:
+            per = stock_price / current_data.eps
+            vals['PER'] = f"{per:.2f}倍"
+
+        if current_data.bps:
+            pbr = stock_price / current_data.bps
+            vals['PBR'] = f"{pbr:.2f}倍"
+
+        # PEG Ratio (PER / Growth Rate)
+        if current_data.eps and last_year_data and last_year_data.eps and last_year_data.eps > 0:
+             eps_growth = ((current_data.eps - last_year_data.eps) / last_year_data.eps) * 100
+             if eps_growth > 0 and 'PER' in vals:
+                 # Recalculate PER numerical value
+                 per_val = stock_price / current_data.eps
+                 peg = per_val / eps_growth
+                 vals['PEG'] = f"{peg:.2f}倍"
+        return vals
+
+    def revalue(self, report: AnalysisReport, current_data: FinancialData, last_year_data: Optional[FinancialData],
+                stock_price: float) -> AnalysisReport:
+        """
+        Copy of a report from evaluate() at a new stock price. The rule evaluations and qualitative
+        analysis do not depend on the price and are reused; only the valuations are recomputed.
+        """
+        return replace(report, stock_price=stock_price, evaluations=list(report.evaluations),
+                       valuations=self.compute_valuations(current_data, last_year_data, stock_price))
+
+    def evaluate_batch(self, items: Sequence[Tuple[FinancialData, Optional[FinancialData], float]]) -> List[AnalysisReport]:
+        """
+        Evaluates many (current_data, last_year_data, stock_price) triples at once.
+        Metrics are computed on columnar NumPy arrays; the reports are identical to calling
+        evaluate() on each triple without keyword signals.
+        """
+        from .vectorized import build_reports
+
+        rules = self.rule_engine.rules
+        metrics, quarters = self._batch_metrics(items, rules)
+        return build_reports(metrics, rules, [c for c, _, _ in items], [l for _, l, _ in items],
+                             [p for _, _, p in items], quarters)
+
+    def batch_metrics(self, items: Sequence[Tuple[FinancialData, Optional[FinancialData], float]]) -> Dict[str, Any]:
+        """
+        Columnar form of evaluate_batch: a dict of NumPy arrays with each metric's value,
+        validity mask and assessment label. Skips building report objects, which dominates
+        the cost when screening a whole universe under many price scenarios.
+        """
+        return self._batch_metrics(items, self.rule_engine.rules)[0]
+
+    def _batch_metrics(self, items, rules):
+        # numpy is only needed for batch evaluation
+        import numpy as np
+        from .vectorized import to_columns, compute_metrics
+
+        currents = [c for c, _, _ in items]
+        quarters = [self._extract_quarter(c.fiscal_period) for c in currents]
+        metrics = compute_metrics(
+            rules,
+            to_columns(currents),
+            to_columns([l for _, l, _ in items]),
+            np.asarray([p for _, _, p in items], dtype=float),
+            quarters,
+        )
+        return metrics, quarters
+
     def _extract_quarter(self, fiscal_period: str) -> Optional[str]:
         """決算期から四半期を抽出 (例: '2024年12月期 第1四半期' -> '1Q')"""
         if not fiscal_period:
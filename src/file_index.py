@@ -0,0 +1,134 @@
+import os
+import re
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# {code}_{year}_{quarter}.pdf, e.g. 8035_2024_1Q.pdf or 130A_2025_通期.pdf
+REPORT_FILENAME = re.compile(r"^(?P<code>\d[0-9A-Z]{3})_(?P<year>(?:19|20)\d{2})_(?P<quarter>[1-4]Q|通期)\.pdf$")
+
+def parse_report_filename(filename: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Strict variant of pdf_loader.parse_filename.
+    Returns (code, year, quarter) only for names matching REPORT_FILENAME.
+    """
+    m = REPORT_FILENAME.match(filename)
+    if not m:
+        return None
+    return m.group("code"), m.group("year"), m.group("quarter")
+
+class FileIndex:
+    """
+    Index of the input directory mapping code -> year -> quarter -> (path, size, mtime_ns).
+    It is built once with os.scandir and persisted to index_path. On later runs the directory
+    is rescanned only when its mtime changed, and unchanged entries are carried over.
+    Files rewritten in place (without adding or removing entries) are picked up by refresh(force=True).
+    """
+
+    def __init__(self, input_dir: str, index_path: Optional[str] = None):
+        self.input_dir = input_dir
+        self.index_path = index_path
+        self.dir_mtime_ns: Optional[int] = None
+        # filename -> [code, year, quarter, size, mtime_ns]
+        self.entries: Dict[str, list] = {}
+        self.by_code: Dict[str, Dict[str, Dict[str, Tuple[str, int, int]]]] = {}
+        self.ignored: List[str] = []
+        self._load()
+        # Entries as persisted by the previous run, before this run's first refresh
+        self.loaded_entries: Dict[str, list] = dict(self.entries)
+        self.refresh()
+
+    def _load(self):
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if saved.get("input_dir") != os.path.abspath(self.input_dir):
+            return
+        self.dir_mtime_ns = saved.get("dir_mtime_ns")
+        self.entries = saved.get("entries", {})
+        self.ignored = saved.get("ignored", [])
+        self._rebuild()
+
+    def _save(self):
+        if not self.index_path:
+            return
+        index_dir = os.path.dirname(self.index_path)
+        if index_dir and not os.path.exists(index_dir):
+            os.makedirs(index_dir)
+        tmp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "input_dir": os.path.abspath(self.input_dir),
+                "dir_mtime_ns": self.dir_mtime_ns,
+                "entries": self.entries,
+                "ignored": self.ignored,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def _rebuild(self):
+        by_code: Dict[str, Dict[str, Dict[str, Tuple[str, int, int]]]] = {}
+        for filename, (code, year, quarter, size, mtime_ns) in self.entries.items():
+            path = os.path.join(self.input_dir, filename)
+            by_code.setdefault(code, {}).setdefault(year, {})[quarter] = (path, size, mtime_ns)
+        self.by_code = by_code
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Brings the index up to date with the directory. Returns True when anything changed.
+        """
+        try:
+            dir_mtime_ns = os.stat(self.input_dir).st_mtime_ns
+        except FileNotFoundError:
+            changed = bool(self.entries)
+            self.entries, self.by_code, self.dir_mtime_ns = {}, {}, None
+            return changed
+
+        if not force and dir_mtime_ns == self.dir_mtime_ns:
+            return False
+
+        entries: Dict[str, list] = {}
+        ignored = []
+        changed = False
+        with os.scandir(self.input_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".pdf") or not entry.is_file():
+                    continue
+                parsed = parse_report_filename(entry.name)
+                if parsed is None:
+                    ignored.append(entry.name)
+                    continue
+                st = entry.stat()
+                old = self.entries.get(entry.name)
+                if old is not None and old[3] == st.st_size and old[4] == st.st_mtime_ns:
+                    entries[entry.name] = old
+                else:
+                    entries[entry.name] = [*parsed, st.st_size, st.st_mtime_ns]
+                    changed = True
+
+        changed = changed or entries.keys() != self.entries.keys()
+        new_ignored = sorted(set(ignored) - set(self.ignored))
+        if new_ignored:
+            print(f"Ignoring {len(new_ignored)} PDF(s) not named {{code}}_{{year}}_{{quarter}}.pdf: {', '.join(new_ignored[:5])}")
+
+        self.entries = entries
+        self.ignored = sorted(ignored)
+        self.dir_mtime_ns = dir_mtime_ns
+        self._rebuild()
+        self._save()
+        return changed
+
+    def lookup(self, code: str) -> Dict[str, Dict[str, str]]:
+        """Same structure as find_financial_reports: {year: {quarter: path}}."""
+        return {year: {q: entry[0] for q, entry in quarters.items()}
+                for year, quarters in self.by_code.get(code, {}).items()}
+
+    def stat(self, code: str, year: str, quarter: str) -> Optional[Tuple[str, int, int]]:
+        """(path, size, mtime_ns) of one filing, or None."""
+        return self.by_code.get(code, {}).get(year, {}).get(quarter)
+
+    def codes(self) -> List[str]:
+        return sorted(self.by_code)
@@ -0,0 +1,319 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional, TextIO, Tuple
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICING: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+}
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> Optional[float]:
+    """Cost in USD, or None for models missing from MODEL_PRICING. Dated snapshots match by prefix."""
+    matches = [name for name in MODEL_PRICING if model == name or model.startswith(name + "-")]
+    if not matches:
+        return None
+    price_in, price_cached, price_out = MODEL_PRICING[max(matches, key=len)]
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    return (uncached * price_in + cached_tokens * price_cached + completion_tokens * price_out) / 1_000_000
+
+@dataclass
+class Span:
+    name: str
+    span_id: int
+    parent_id: Optional[int]
+    start: float  # wall clock (time.time)
+    duration: float = 0.0
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    error: str = ""
+
+class Exporter:
+    """
+    Receives the tracer it is attached to, every finished span and the final tracer state.
+    Subclasses override what they need.
+    """
+
+    def attach(self, tracer: "Tracer"):
+        pass
+
+    def on_span(self, span: Span):
+        pass
+
+    def close(self, tracer: "Tracer"):
+        pass
+
+class SpanCollector(Exporter):
+    """Keeps every finished span in memory. Meant for tests and short runs, not for long-lived processes."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def on_span(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+class _NullSpan:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class NullTracer:
+    """The tracer installed by default. Every call is a no-op so instrumented code pays almost nothing."""
+
+    enabled = False
+
+    def span(self, name: str, **attrs):
+        return _NULL_SPAN
+
+    def record_span(self, name: str, duration: float, **attrs):
+        pass
+
+    def record_llm(self, model: str, usage: Any):
+        pass
+
+    def count(self, name: str, n: int = 1):
+        pass
+
+    def close(self):
+        pass
+
+class Tracer(NullTracer):
+    """
+    Collects timing spans, LLM token usage and cost, and event counters (cache hits, retries).
+    Spans nest through a context variable, so parents are tracked across asyncio tasks as well.
+    Finished spans are streamed to the exporters as they complete and are not kept; the tracer
+    only keeps running per-name totals, so long-lived watch and serve processes stay bounded.
+    close() hands the totals over to the exporters.
+    """
+
+    enabled = True
+
+    def __init__(self, exporters: Optional[List[Exporter]] = None):
+        self.exporters = exporters or []
+        # span name -> {"count", "total", "max", "errors"}
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+        # model -> {"calls", "prompt_tokens", "completion_tokens", "cached_tokens", "cost"}
+        self.llm_usage: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._current: contextvars.ContextVar = contextvars.ContextVar(f"span_{id(self)}", default=None)
+        for exporter in self.exporters:
+            exporter.attach(self)
+
+    def _new_span(self, name: str, attrs: Dict[str, Any], start: float) -> Span:
+        with self._lock:
+            self._next_id += 1
+            span_id = self._next_id
+        parent = self._current.get()
+        return Span(name, span_id, parent.span_id if parent else None, start, attrs=attrs)
+
+    def _finish(self, span: Span):
+        with self._lock:
+            t = self._stages.setdefault(span.name, {"count": 0, "total": 0.0, "max": 0.0, "errors": 0})
+            t["count"] += 1
+            t["total"] += span.duration
+            t["max"] = max(t["max"], span.duration)
+            t["errors"] += 1 if span.error else 0
+        for exporter in self.exporters:
+            exporter.on_span(span)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        span = self._new_span(name, attrs, time.time())
+        token = self._current.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = e.__class__.__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            self._current.reset(token)
+            self._finish(span)
+
+    def record_span(self, name: str, duration: float, **attrs):
+        """Adds a span timed elsewhere, e.g. in a worker process."""
+        span = self._new_span(name, attrs, time.time() - duration)
+        span.duration = duration
+        self._finish(span)
+
+    def record_llm(self, model: str, usage: Any):
+        """Records the `usage` object of a chat completion response."""
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+        cost = estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+
+        with self._lock:
+            totals = self.llm_usage.setdefault(model, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                                                       "cached_tokens": 0, "cost": 0.0})
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens
+            totals["completion_tokens"] += completion_tokens
+            totals["cached_tokens"] += cached_tokens
+            totals["cost"] += cost or 0.0
+
+        span = self._current.get()
+        if span is not None:
+            span.attrs.update(model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                              cached_tokens=cached_tokens, cost_usd=cost)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def stage_totals(self) -> Dict[str, Dict[str, float]]:
+        """Per span name: count, total and max seconds, and the number of spans that raised."""
+        with self._lock:
+            return {name: dict(t) for name, t in self._stages.items()}
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close(self)
+
+_tracer: NullTracer = NullTracer()
+
+def get_tracer() -> NullTracer:
+    return _tracer
+
+def set_tracer(tracer: Optional[NullTracer]) -> NullTracer:
+    """Installs a tracer process-wide (None restores the no-op tracer) and returns the previous one."""
+    global _tracer
+    previous = _tracer
+    _tracer = tracer if tracer is not None else NullTracer()
+    return previous
+
+class JsonLinesExporter(Exporter):
+    """Appends one JSON object per span to path, then a final record with counters and LLM usage."""
+
+    def __init__(self, path: str):
+        trace_dir = os.path.dirname(path)
+        if trace_dir and not os.path.exists(trace_dir):
+            os.makedirs(trace_dir)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def on_span(self, span: Span):
+        line = json.dumps({"type": "span", **asdict(span)}, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self, tracer: Tracer):
+        with self._lock:
+            self._file.write(json.dumps({"type": "summary", "time": time.time(), "counters": dict(tracer.counters),
+                                         "llm_usage": tracer.llm_usage}, ensure_ascii=False) + "\n")
+            self._file.close()
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class PrometheusTextfileExporter(Exporter):
+    """
+    Writes the run totals in the Prometheus text format, for node_exporter's textfile collector.
+    The file is rewritten as spans finish, at most every `interval` seconds, so long-lived watch
+    and serve processes publish while they run, and once more on close(). It is replaced
+    atomically so the collector never reads a partial write.
+    """
+
+    def __init__(self, path: str, prefix: str = "finsight", interval: float = 15.0):
+        self.path = path
+        self.prefix = prefix
+        self.interval = interval
+        self._tracer: Optional[Tracer] = None
+        self._last_write: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def attach(self, tracer: Tracer):
+        self._tracer = tracer
+
+    def on_span(self, span: Span):
+        if self._tracer is None:
+            return
+        if self._last_write is not None and time.monotonic() - self._last_write < self.interval:
+            return
+        # Another thread writing now covers this span too
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self.write(self._tracer)
+        finally:
+            self._lock.release()
+
+    def close(self, tracer: Tracer):
+        with self._lock:
+            self.write(tracer)
+
+    def write(self, tracer: Tracer):
+        self._last_write = time.monotonic()
+        with tracer._lock:
+            counters = dict(tracer.counters)
+            llm_usage = {model: dict(u) for model, u in tracer.llm_usage.items()}
+        p = self.prefix
+        lines = [f"# TYPE {p}_stage_seconds summary"]
+        for name, t in sorted(tracer.stage_totals().items()):
+            lines.append(f'{p}_stage_seconds_sum{{stage="{_label(name)}"}} {t["total"]:.6f}')
+            lines.append(f'{p}_stage_seconds_count{{stage="{_label(name)}"}} {t["count"]}')
+        lines.append(f"# TYPE {p}_stage_errors_total counter")
+        for name, t in sorted(tracer.stage_totals().items()):
+            lines.append(f'{p}_stage_errors_total{{stage="{_label(name)}"}} {t["errors"]}')
+        lines.append(f"# TYPE {p}_events_total counter")
+        for name, n in sorted(counters.items()):
+            lines.append(f'{p}_events_total{{event="{_label(name)}"}} {n}')
+        lines.append(f"# TYPE {p}_llm_tokens_total counter")
+        for model, u in sorted(llm_usage.items()):
+            for kind in ("prompt", "completion", "cached"):
+                lines.append(f'{p}_llm_tokens_total{{model="{_label(model)}",type="{kind}"}} {u[kind + "_tokens"]}')
+        lines.append(f"# TYPE {p}_llm_cost_usd_total counter")
+        for model, u in sorted(llm_usage.items()):
+            lines.append(f'{p}_llm_cost_usd_total{{model="{_label(model)}"}} {u["cost"]:.6f}')
+        lines.append(f"# TYPE {p}_last_run_timestamp_seconds gauge")
+        lines.append(f"{p}_last_run_timestamp_seconds {time.time():.0f}")
+
+        metrics_dir = os.path.dirname(self.path)
+        if metrics_dir and not os.path.exists(metrics_dir):
+            os.makedirs(metrics_dir)
+        fd, tmp_path = tempfile.mkstemp(dir=metrics_dir or ".", prefix=os.path.basename(self.path) + ".",
+                                        suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, self.path)
+
+class SummaryTableExporter(Exporter):
+    """Prints per-stage timings, counters and LLM usage when the run ends."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+
+    def close(self, tracer: Tracer):
+        out = self.stream or sys.stdout
+        print("\n=== 実行サマリー ===", file=out)
+        print(f"{'stage':<20}{'count':>8}{'total s':>12}{'avg ms':>12}{'max ms':>12}", file=out)
+        for name, t in sorted(tracer.stage_totals().items(), key=lambda kv: -kv[1]["total"]):
+            avg = t["total"] / t["count"] * 1000 if t["count"] else 0.0
+            print(f"{name:<20}{t['count']:>8}{t['total']:>12.3f}{avg:>12.1f}{t['max'] * 1000:>12.1f}", file=out)
+        for model, u in sorted(tracer.llm_usage.items()):
+            print(f"LLM {model}: {u['calls']} calls, prompt {u['prompt_tokens']:,} / completion "
+                  f"{u['completion_tokens']:,} tokens (cached {u['cached_tokens']:,}), ${u['cost']:.4f}", file=out)
+        if tracer.counters:
+            print("events: " + ", ".join(f"{k}={v}" for k, v in sorted(tracer.counters.items())), file=out)
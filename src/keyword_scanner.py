@@ -0,0 +1,189 @@
+import operator
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .models import EvaluationResult
+
+SIGNALS_KEY = "keyword_signals"
+_OPS = {">=": operator.ge, "<=": operator.le, ">": operator.gt, "<": operator.lt}
+
+def normalize(text: str) -> str:
+    """Removes all whitespace, so keywords split by pdfminer line breaks still match."""
+    return "".join(text.split())
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over a fixed set of patterns. find() reports leftmost-longest,
+    non-overlapping matches in one pass over the text: "当社グループ" is one match, not also "当社".
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = sorted({p for p in patterns if p})
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Length of the longest pattern ending at each state, following failure links
+        self._longest: List[int] = [0]
+        for pattern in self.patterns:
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._longest.append(0)
+                state = nxt
+            self._longest[state] = len(pattern)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._longest[nxt] = max(self._longest[nxt], self._longest[self._fail[nxt]])
+                queue.append(nxt)
+
+    def find(self, text: str) -> List[Tuple[int, str]]:
+        """(start, pattern) of each match, leftmost first, longest at each start, never overlapping."""
+        goto, fail, longest = self._goto, self._fail, self._longest
+        # Longest match starting at each position where any match starts
+        best: Dict[int, int] = {}
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            # Every pattern ending here is a suffix; walk the failure chain for all of them
+            s = state
+            while s and longest[s]:
+                length = longest[s]
+                start = i - length + 1
+                if best.get(start, 0) < length:
+                    best[start] = length
+                s = fail[s]
+        matches = []
+        end = 0
+        for start in sorted(best):
+            if start >= end:
+                matches.append((start, text[start:start + best[start]]))
+                end = start + best[start]
+        return matches
+
+    def count(self, text: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for _, pattern in self.find(text):
+            counts[pattern] = counts.get(pattern, 0) + 1
+        return counts
+
+@dataclass(frozen=True)
+class KeywordLexicon:
+    """
+    Positive and negative keywords scored as the positive share of all hits, in percent, or with
+    measure="density" as positive hits per 10,000 characters (negative keywords are not used).
+    """
+    key: str
+    metric_name: str
+    positive: Tuple[str, ...]
+    negative: Tuple[str, ...]
+    steps: Tuple[Tuple[str, float, str], ...]
+    default: str = "Neutral"
+    min_hits: int = 1
+    measure: str = "share"
+
+@dataclass
+class KeywordSignals:
+    """Keyword counts for one filing. Stored with the analysis JSON so stored filings keep them."""
+    counts: Dict[str, int] = field(default_factory=dict)
+    chars: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"counts": self.counts, "chars": self.chars}
+
+    @classmethod
+    def from_result(cls, result: Optional[Dict[str, Any]]) -> Optional["KeywordSignals"]:
+        """Signals saved in an analysis JSON (see attach), or None."""
+        saved = (result or {}).get(SIGNALS_KEY)
+        if not saved:
+            return None
+        return cls(dict(saved.get("counts", {})), int(saved.get("chars", 0)))
+
+    def attach(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        result[SIGNALS_KEY] = self.to_dict()
+        return result
+
+def _step_ops(node: Dict[str, Any]) -> Tuple[Tuple[str, float, str], ...]:
+    if "good" in node or "bad" in node:
+        steps = []
+        if "good" in node:
+            steps.append((">=", float(node["good"]), "Good"))
+        if "bad" in node:
+            steps.append(("<=", float(node["bad"]), "Bad"))
+        return tuple(steps)
+    # More positive than negative hits
+    return ((">", 50.0, "Good"), ("<", 50.0, "Bad"))
+
+def compile_lexicons(config: Dict[str, Any]) -> List[KeywordLexicon]:
+    """
+    Every lexicon under qualitative.keyword_signals. Keywords are normalized like the scanned text.
+    """
+    analysis = config.get("analysis", {})
+    lexicons = []
+    for name, node in ((analysis.get("qualitative") or {}).get("keyword_signals") or {}).items():
+        lexicons.append(KeywordLexicon(
+            f"qualitative.{name}", node.get("description", name),
+            tuple(normalize(k) for k in node.get("positive", [])),
+            tuple(normalize(k) for k in node.get("negative", [])),
+            _step_ops(node), min_hits=int(node.get("min_hits", 1)), measure=node.get("measure", "share"),
+        ))
+    return lexicons
+
+class KeywordScanner:
+    """
+    Counts the keywords of every lexicon with a single automaton, in one pass over the full
+    extracted text, and turns the counts into scored EvaluationResults. No API calls.
+    patterns are counted too but scored elsewhere (the keyword rules of the rule table).
+    """
+
+    def __init__(self, lexicons: List[KeywordLexicon], patterns: Iterable[str] = ()):
+        self.lexicons = lexicons
+        self.automaton = AhoCorasick([k for lex in lexicons for k in lex.positive + lex.negative]
+                                     + [normalize(k) for k in patterns])
+
+    def scan(self, text: str) -> KeywordSignals:
+        text = normalize(text)
+        return KeywordSignals(self.automaton.count(text), len(text))
+
+    def evaluate(self, signals: KeywordSignals) -> List[EvaluationResult]:
+        results = []
+        for lex in self.lexicons:
+            pos = {k: signals.counts[k] for k in lex.positive if signals.counts.get(k)}
+            neg = {} if lex.measure == "density" else {k: signals.counts[k] for k in lex.negative if signals.counts.get(k)}
+            hits = sum(pos.values()) + sum(neg.values())
+            if hits < lex.min_hits or hits == 0:
+                continue
+            density = hits / signals.chars * 10000 if signals.chars else 0.0
+            if lex.measure == "density":
+                score, value = density, f"{density:.2f}件/万字"
+            else:
+                score = sum(pos.values()) / hits * 100
+                value = f"{score:.1f}%"
+            assessment = lex.default
+            for op, threshold, label in lex.steps:
+                if _OPS[op](score, threshold):
+                    assessment = label
+                    break
+            details = " / ".join(
+                f"{label}: " + ", ".join(f"{k}×{n}" for k, n in found.items())
+                for label, found in (("良", pos), ("悪", neg)) if found
+            )
+            results.append(EvaluationResult(
+                metric_name=lex.metric_name,
+                value=value,
+                assessment=assessment,
+                details=details if lex.measure == "density" else f"{details} (1万字あたり {density:.1f}件)",
+            ))
+        return results
@@ -0,0 +1,221 @@
+import os
+import math
+import time
+import multiprocessing
+from io import StringIO
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing.connection import wait
+from typing import Dict, List, Optional, TYPE_CHECKING
+from .extraction_cache import ExtractionCache
+from .sections import SectionPageSelector
+from .pdf_loader import _extraction_params, extract_text_from_pdf
+from .instrumentation import get_tracer
+
+if TYPE_CHECKING:
+    from pdfminer.layout import LAParams
+
+@dataclass
+class PageError:
+    page: Optional[int]  # 0-based; None when the document itself could not be read
+    error: str
+
+@dataclass
+class ExtractionResult:
+    path: str
+    text: str
+    # None when served from a sections_only cache entry, which only holds the selected pages
+    page_count: Optional[int]
+    errors: List[PageError] = field(default_factory=list)
+    from_cache: bool = False
+    # Text of each page, None where it failed; empty when served from the cache
+    pages: List[Optional[str]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+@dataclass
+class _Worker:
+    process: multiprocessing.Process
+    start: int
+    end: int
+    deadline: float
+
+def count_pages(filepath: str) -> int:
+    """Number of pages, from the page tree only (no content streams are parsed)."""
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfpage import PDFPage
+
+    with open(filepath, 'rb') as f:
+        return sum(1 for _ in PDFPage.create_pages(PDFDocument(PDFParser(f))))
+
+def _extract_range(filepath: str, start: int, end: int, laparams: Optional["LAParams"],
+                   memory_limit: Optional[int], conn):
+    """
+    Worker process: sends (page_no, text, None) or (page_no, None, error) for each page in
+    [start, end) as soon as it is done, or (None, None, error) if the document cannot be opened.
+    """
+    if memory_limit:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    try:
+        from pdfminer.layout import LAParams
+        from pdfminer.converter import TextConverter
+        from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfpage import PDFPage
+
+        rsrcmgr = PDFResourceManager()
+        output = StringIO()
+        device = TextConverter(rsrcmgr, output, laparams=laparams if laparams is not None else LAParams())
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        with open(filepath, 'rb') as f:
+            for page_no, page in enumerate(PDFPage.create_pages(PDFDocument(PDFParser(f)))):
+                if page_no < start:
+                    continue
+                if page_no >= end:
+                    break
+                try:
+                    interpreter.process_page(page)
+                    conn.send((page_no, output.getvalue(), None))
+                except Exception as e:
+                    conn.send((page_no, None, f"{e.__class__.__name__}: {e}"))
+                output.seek(0)
+                output.truncate(0)
+        device.close()
+    except Exception as e:
+        conn.send((None, None, f"{e.__class__.__name__}: {e}"))
+    finally:
+        conn.close()
+
+def extract_pages_parallel(filepath: str, laparams: Optional["LAParams"] = None, workers: Optional[int] = None,
+                           pages_per_worker: Optional[int] = None, timeout: float = 120.0,
+                           memory_limit_mb: Optional[int] = None) -> ExtractionResult:
+    """
+    Splits the document into page ranges, parses each range in its own process and reassembles
+    the text in page order. A worker that runs past `timeout` seconds is killed, and with
+    memory_limit_mb its address space is capped with RLIMIT_AS (this includes what the process
+    inherits from the parent, so leave room for it). Pages that fail, time out or are lost with
+    a crashed worker are listed in `errors`; the text of every other page is still returned.
+    """
+    try:
+        page_count = count_pages(filepath)
+    except Exception as e:
+        return ExtractionResult(filepath, "", 0, [PageError(None, f"{e.__class__.__name__}: {e}")])
+    workers = max(1, workers or os.cpu_count() or 1)
+    size = pages_per_worker or max(1, math.ceil(page_count / workers))
+    pending = deque((start, min(start + size, page_count)) for start in range(0, page_count, size))
+    memory_limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+
+    pages: List[Optional[str]] = [None] * page_count
+    errors: Dict[int, str] = {}
+    running: Dict[object, _Worker] = {}
+
+    def finish(conn, reason: str):
+        worker = running.pop(conn)
+        conn.close()
+        missing = [p for p in range(worker.start, worker.end) if pages[p] is None and p not in errors]
+        for p in missing:
+            errors[p] = reason if p == missing[0] else f"not extracted: {reason} on page {missing[0] + 1}"
+
+    ctx = multiprocessing.get_context()
+    while pending or running:
+        while pending and len(running) < workers:
+            start, end = pending.popleft()
+            recv, send = ctx.Pipe(duplex=False)
+            process = ctx.Process(target=_extract_range, args=(filepath, start, end, laparams, memory_limit, send),
+                                  daemon=True)
+            process.start()
+            send.close()
+            running[recv] = _Worker(process, start, end, time.monotonic() + timeout)
+
+        next_deadline = min(w.deadline for w in running.values())
+        for conn in wait(list(running), timeout=max(0.0, next_deadline - time.monotonic())):
+            worker = running[conn]
+            try:
+                page_no, text, error = conn.recv()
+            except EOFError:
+                worker.process.join()
+                code = worker.process.exitcode
+                finish(conn, "worker ran out of memory or crashed" if code else "worker stopped early")
+                continue
+            if page_no is None:
+                finish(conn, error)
+            elif error is not None:
+                errors[page_no] = error
+            else:
+                pages[page_no] = text
+
+        now = time.monotonic()
+        for conn, worker in list(running.items()):
+            if now >= worker.deadline:
+                worker.process.kill()
+                worker.process.join()
+                finish(conn, f"timed out after {timeout:g}s")
+
+    text = "".join(p for p in pages if p is not None)
+    return ExtractionResult(filepath, text, page_count,
+                            [PageError(p, errors[p]) for p in sorted(errors)], pages=pages)
+
+def extract_text_parallel(filepath: str, cache: Optional[ExtractionCache] = None, laparams: Optional["LAParams"] = None,
+                          sections_only: bool = False, workers: Optional[int] = None,
+                          pages_per_worker: Optional[int] = None, timeout: float = 120.0,
+                          memory_limit_mb: Optional[int] = None) -> ExtractionResult:
+    """
+    Parallel counterpart of extract_text_from_pdf that reports failures per page instead of
+    returning "". The text, and therefore the cache entry, is the same as the serial extraction;
+    results with page errors are not cached.
+    """
+    tracer = get_tracer()
+    key = None
+    if cache is not None:
+        with open(filepath, 'rb') as f:
+            key = cache.make_key(f.read(), _extraction_params(laparams, sections_only))
+        cached = cache.get(key)
+        if cached is not None:
+            tracer.count("extraction_cache.hit")
+            # Every page ends with a form feed, so a full-text entry still tells the page count
+            page_count = None if sections_only else cached.count("\f")
+            return ExtractionResult(filepath, cached, page_count, from_cache=True)
+        tracer.count("extraction_cache.miss")
+
+    with tracer.span("extract_parallel", path=os.path.basename(filepath)):
+        result = extract_pages_parallel(filepath, laparams, workers, pages_per_worker, timeout, memory_limit_mb)
+    if sections_only and result.text:
+        # Same selection as extract_relevant_pages, applied after the fact
+        selector = SectionPageSelector()
+        selected = []
+        for page_no, page_text in enumerate(result.pages):
+            if page_text is None:
+                continue
+            if selector.feed(page_no, page_text):
+                selected.append(page_text)
+            if selector.done:
+                break
+        if selected:
+            result.text = "".join(selected)
+    if key is not None and result.ok:
+        cache.put(key, result.text)
+    return result
+
+def extract_text_guarded(filepath: str, cache: Optional[ExtractionCache] = None, sections_only: bool = False,
+                         page_workers: int = 0, page_timeout: float = 120.0,
+                         memory_limit_mb: Optional[int] = None) -> str:
+    """
+    extract_text_from_pdf, or with page_workers the page-parallel extraction, whose worker processes
+    are killed after page_timeout seconds so one pathological PDF cannot hang a long unattended run.
+    Page errors are printed and counted as extract.page_error; the text of the other pages is returned.
+    """
+    if not page_workers:
+        return extract_text_from_pdf(filepath, cache=cache, sections_only=sections_only)
+    result = extract_text_parallel(filepath, cache=cache, sections_only=sections_only, workers=page_workers,
+                                   timeout=page_timeout, memory_limit_mb=memory_limit_mb)
+    if result.errors:
+        get_tracer().count("extract.page_error", len(result.errors))
+        for error in result.errors:
+            page = "document" if error.page is None else f"page {error.page + 1}"
+            print(f"Error extracting text from {filepath}: {page}: {error.error}")
+    return result.text
@@ -1,17 +1,104 @@
 import os
 import re
-from typing import List, Tuple, Optional
-from pdfminer.high_level import extract_text
+from io import StringIO
+from typing import Iterator, List, Tuple, Optional, TYPE_CHECKING
+from .extraction_cache import ExtractionCache
+from .sections import SectionPageSelector
+from .file_index import FileIndex
+from .instrumentation import get_tracer
 
-def extract_text_from_pdf(filepath: str) -> str:
+# pdfminer is imported inside the functions that parse PDFs, so commands that only
+# look up files or re-evaluate stored data do not pay for loading it
+if TYPE_CHECKING:
+    from pdfminer.layout import LAParams
+
+def _extraction_params(laparams: Optional["LAParams"], sections_only: bool = False) -> str:
+    """
+    Describes everything besides the PDF bytes that affects extracted text.
+    """
+    import pdfminer
+    from pdfminer.layout import LAParams
+
+    params = vars(laparams if laparams is not None else LAParams())
+    items = ",".join(f"{k}={params[k]!r}" for k in sorted(params))
+    mode = "sections" if sections_only else "full"
+    return f"pdfminer={pdfminer.__version__};laparams={items};mode={mode}"
+
+def iter_page_texts(filepath: str, laparams: Optional["LAParams"] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Yields (page_number, text) one page at a time, so callers can stop parsing early.
+    Page numbers are 0-based, matching pdfminer's page_numbers argument.
+    """
+    from pdfminer.layout import LAParams
+    from pdfminer.converter import TextConverter
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+    from pdfminer.pdfpage import PDFPage
+
+    rsrcmgr = PDFResourceManager()
+    output = StringIO()
+    device = TextConverter(rsrcmgr, output, laparams=laparams if laparams is not None else LAParams())
+    try:
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        with open(filepath, 'rb') as f:
+            for page_no, page in enumerate(PDFPage.get_pages(f)):
+                interpreter.process_page(page)
+                yield page_no, output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+    finally:
+        device.close()
+
+def extract_relevant_pages(filepath: str, laparams: Optional["LAParams"] = None) -> str:
+    """
+    Extracts only the pages holding the サマリー情報, 損益計算書, 貸借対照表 and
+    キャッシュ・フロー計算書 sections (plus qualitative commentary seen on the way),
+    and stops parsing once all of them have been found.
+    Falls back to the whole document when no section heading is recognised.
+    """
+    selector = SectionPageSelector()
+    pages = []
+    selected = []
+    for page_no, text in iter_page_texts(filepath, laparams):
+        pages.append(text)
+        if selector.feed(page_no, text):
+            selected.append(text)
+        if selector.done:
+            break
+
+    if not selected:
+        return "".join(pages)
+    return "".join(selected)
+
+def extract_text_from_pdf(filepath: str, cache: Optional[ExtractionCache] = None, laparams: Optional["LAParams"] = None,
+                          sections_only: bool = False) -> str:
     """
     Extracts text from a PDF file using pdfminer.six.
+    If a cache is given, unchanged files are served from it instead of being parsed again.
+    With sections_only, only the pages relevant to the analysis are returned (see extract_relevant_pages).
     """
     try:
-        text = extract_text(filepath)
+        key = None
+        if cache is not None:
+            with open(filepath, 'rb') as f:
+                key = cache.make_key(f.read(), _extraction_params(laparams, sections_only))
+            cached = cache.get(key)
+            if cached is not None:
+                get_tracer().count("extraction_cache.hit")
+                return cached
+            get_tracer().count("extraction_cache.miss")
+
+        if sections_only:
+            text = extract_relevant_pages(filepath, laparams=laparams)
+        else:
+            from pdfminer.high_level import extract_text
+            text = extract_text(filepath, laparams=laparams)
+        if key is not None:
+            cache.put(key, text)
         return text
     except Exception as e:
-        print(f"Error extracting text from {filepath}: {e}")
+        # Callers only see "" here; extract_text_parallel reports failures per page instead
+        get_tracer().count("extract.error")
+        print(f"Error extracting text from {filepath}: {e.__class__.__name__}: {e}")
         return ""
 
 def parse_filename(filename: str) -> Optional[Tuple[str, str, str]]:
@@ -27,7 +114,7 @@ def parse_filename(filename: str) -> Optional[Tuple[str, str, str]]:
         return parts[0], parts[1], parts[2]
     return None
 
-def find_financial_reports(input_dir: str, target_code: str) -> dict:
+def find_financial_reports(input_dir: str, target_code: str, index: Optional[FileIndex] = None) -> dict:
     """
     Scans the input directory for files matching the target code.
     Returns a dictionary organized by year/quarter.
@@ -36,7 +123,11 @@ def find_financial_reports(input_dir: str, target_code: str) -> dict:
         '2024': {'1Q': 'path/to/file', ...},
         ...
     }
+    With a FileIndex of input_dir the lookup is served from the index instead of listing the directory.
     """
+    if index is not None:
+        return index.lookup(target_code)
+
     reports = {}
     if not os.path.exists(input_dir):
         return reports
@@ -0,0 +1,19 @@
+from typing import Dict, Optional, Tuple
+
+def select_periods(reports_map: Dict[str, Dict[str, str]]) -> Tuple[str, str, str, str, Optional[str]]:
+    """
+    Picks the latest available quarter of the latest year and the same quarter of the prior year.
+    Returns (latest_year, quarter, current_path, prev_year, prev_path); prev_path is None
+    when the prior-year filing is not available.
+    """
+    # Sort years to find the latest and previous
+    years = sorted(reports_map.keys(), reverse=True)
+    latest_year = years[0]
+    # Compare the latest available quarter of the latest year against the same quarter last year
+    latest_quarters = sorted(reports_map[latest_year].keys(), reverse=True)
+    target_quarter = latest_quarters[0]
+    current_path = reports_map[latest_year][target_quarter]
+
+    prev_year = str(int(latest_year) - 1)
+    prev_path = reports_map.get(prev_year, {}).get(target_quarter)
+    return latest_year, target_quarter, current_path, prev_year, prev_path
@@ -0,0 +1,161 @@
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from .sections import detect_sections, TOC_LINE
+
+# Order in which sections are packed into the token budget
+SECTION_PRIORITY = ["summary", "bs", "pl", "cf", "qualitative"]
+
+_CJK = re.compile(r"[　-ヿ㐀-鿿豈-﫿＀-￯]")
+_WHITESPACE = re.compile(r"[ \t　\xa0]+")
+_PAGE_NUMBER = re.compile(r"^[-－―]?\s*\d{1,4}\s*[-－―]?$")
+_DIGIT = re.compile(r"\d")
+# Lines without figures at least this long (or ending a sentence) are prose, not row labels
+_PROSE_MIN_CHARS = 20
+
+class Tokenizer:
+    """
+    Counts tokens with tiktoken's o200k_base encoding (used by gpt-4o) when it is available locally.
+    Otherwise falls back to an estimate of one token per CJK character and four other characters per token.
+    """
+
+    def __init__(self, encoding_name: str = "o200k_base"):
+        self.encoding = None
+        try:
+            import tiktoken
+            self.encoding = tiktoken.get_encoding(encoding_name)
+        except Exception:
+            self.encoding = None
+
+    def count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        cjk = len(_CJK.findall(text))
+        return cjk + (len(text) - cjk + 3) // 4
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return self.encoding.decode(tokens[:max_tokens])
+        # Binary search on the character length for the estimating fallback
+        lo, hi = 0, len(text)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.count(text[:mid]) <= max_tokens:
+                lo = mid
+            else:
+                hi = mid - 1
+        return text[:lo]
+
+@dataclass
+class BuiltPrompt:
+    text: str
+    tokens: int
+    # Tokens of the normalized document before packing, to show what the budget cut
+    source_tokens: int
+    sections: Dict[str, int] = field(default_factory=dict)
+    truncated: bool = False
+
+def _repeated_edge_lines(pages: List[List[str]], edge: int = 2) -> set:
+    """Lines that appear at the top or bottom of most pages are running headers/footers."""
+    if len(pages) < 3:
+        return set()
+    counts = Counter()
+    for lines in pages:
+        counts.update(set(lines[:edge] + lines[-edge:]))
+    return {line for line, n in counts.items() if n >= max(3, len(pages) // 2)}
+
+def normalize_pages(text: str) -> List[str]:
+    """
+    Cleans pdfminer output page by page: collapses whitespace, drops blank lines, page numbers,
+    table-of-contents lines and repeated page headers/footers. Within a page, a line without figures
+    is dropped when it repeats the line before it, and prose is dropped when it already appeared on
+    that page. Lines with figures and row labels in other positions are always kept, since
+    identical figures and labels recur across the P/L, B/S and C/F tables.
+    """
+    pages = []
+    for page in text.split("\f"):
+        lines = [_WHITESPACE.sub(" ", line).strip() for line in page.splitlines()]
+        pages.append([line for line in lines if line])
+
+    boilerplate = _repeated_edge_lines(pages)
+    result = []
+    for lines in pages:
+        kept = []
+        prose = set()
+        for line in lines:
+            if line in boilerplate or _PAGE_NUMBER.match(line) or TOC_LINE.search(line):
+                continue
+            if not _DIGIT.search(line):
+                if kept and kept[-1] == line:
+                    continue
+                if line.endswith("。") or len(line) >= _PROSE_MIN_CHARS:
+                    if line in prose:
+                        continue
+                    prose.add(line)
+            kept.append(line)
+        if kept:
+            result.append("\n".join(kept))
+    return result
+
+class PromptBuilder:
+    """
+    Turns extracted filing text into the document part of the analysis prompt.
+    Pages are normalized, ranked by the section they belong to (SECTION_PRIORITY, then the rest
+    in document order) and packed into max_tokens; the packed pages keep their original order.
+    """
+
+    def __init__(self, max_tokens: int = 40000, tokenizer: Optional[Tokenizer] = None):
+        self.max_tokens = max_tokens
+        self.tokenizer = tokenizer or Tokenizer()
+
+    def build(self, text: str) -> BuiltPrompt:
+        pages = normalize_pages(text)
+        page_tokens = [self.tokenizer.count(p) for p in pages]
+        page_sections = [detect_sections(p) for p in pages]
+
+        other = len(SECTION_PRIORITY)
+
+        def rank(i: int) -> float:
+            ranks = [SECTION_PRIORITY.index(s) for s in page_sections[i] if s in SECTION_PRIORITY]
+            return min(ranks) if ranks else other
+
+        ranks = []
+        for i in range(len(pages)):
+            r = rank(i)
+            if r == other and i > 0 and page_sections[i - 1]:
+                # A page right after a section heading usually continues it (e.g. the liabilities half of a B/S)
+                r = rank(i - 1) + 0.5
+            ranks.append(r)
+
+        budget = self.max_tokens
+        chosen: Dict[int, str] = {}
+        truncated = False
+        for i in sorted(range(len(pages)), key=lambda i: (ranks[i], i)):
+            if budget <= 0:
+                truncated = True
+                break
+            if page_tokens[i] <= budget:
+                chosen[i] = pages[i]
+                budget -= page_tokens[i]
+            else:
+                chosen[i] = self.tokenizer.truncate(pages[i], budget)
+                budget = 0
+                truncated = True
+
+        sections: Dict[str, int] = {}
+        for i in chosen:
+            for s in page_sections[i]:
+                sections[s] = sections.get(s, 0) + 1
+
+        body = "\n\n".join(chosen[i] for i in sorted(chosen))
+        return BuiltPrompt(
+            text=body,
+            tokens=self.max_tokens - budget,
+            source_tokens=sum(page_tokens),
+            sections=sections,
+            truncated=truncated,
+        )
@@ -1,6 +1,15 @@
 import os
+import re
 from datetime import datetime
 from .models import AnalysisReport
+from .timeseries import QuarterlySeries, period_label
+
+_UNSAFE_FILENAME = re.compile(r"[^0-9A-Za-z_\-.぀-ヿ一-鿿]")
+
+def report_filename(code: str, year: str, quarter: str) -> str:
+    """{code}_{year}_{quarter}.md, unique per filing regardless of company name or run date."""
+    stem = "_".join(part for part in (code, year, quarter) if part)
+    return _UNSAFE_FILENAME.sub("_", stem) + ".md"
 
 class Reporter:
     def __init__(self, output_dir: str):
@@ -8,10 +17,22 @@ class Reporter:
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
+    def submit(self, code: str, year: str, quarter: str, report: AnalysisReport):
+        """Same interface and file names as BatchReportWriter.submit; the report is written right away."""
+        self._write(report_filename(code, year, quarter), report)
+
     def generate_markdown_report(self, report: AnalysisReport):
-        filename = f"{report.company_name}_{datetime.now().strftime('%Y-%m-%d')}.md"
+        self._write(f"{report.company_name}_{datetime.now().strftime('%Y-%m-%d')}.md", report)
+
+    def _write(self, filename: str, report: AnalysisReport):
         filepath = os.path.join(self.output_dir, filename)
+        content = self.render_markdown(report)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(content)
 
+        print(f"Report generated: {filepath}")
+
+    def render_markdown(self, report: AnalysisReport) -> str:
         md = []
         md.append(f"# 企業分析レポート: {report.company_name}")
         md.append(f"**決算期**: {report.fiscal_period}")
@@ -46,8 +67,43 @@ class Reporter:
         md.append(qa.get('management_attitude', ''))
         md.append("### コスト効率性")
         md.append(qa.get('cost_efficiency', ''))
+        return "\n".join(md)
+
+    def generate_timeseries_report(self, stock_code: str, company_name: str, series: QuarterlySeries):
+        filename = f"{stock_code}_timeseries_{datetime.now().strftime('%Y-%m-%d')}.md"
+        filepath = os.path.join(self.output_dir, filename)
+
+        md = []
+        md.append(f"# 時系列分析レポート: {company_name} ({stock_code})")
+        md.append(f"**分析日**: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+        md.append("")
+
+        md.append("## 1. 成長率 (TTM CAGR)")
+        for metric, label in TIMESERIES_LABELS.items():
+            cagr = series.cagr(metric)
+            md.append(f"- **{label}**: " + (f"{cagr[1]:+.1f}% ({cagr[0]}年)" if cagr else "算出不能"))
+        trend = series.margin_trend()
+        md.append("- **営業利益率トレンド (TTM)**: " + (f"{trend:+.2f}pt/四半期" if trend is not None else "算出不能"))
+        md.append("")
+
+        md.append("## 2. 四半期推移")
+        md.append("| 期間 | 売上高 (単独) | 営業利益 (単独) | EPS (単独) | 売上高 QoQ | 営業利益率 | 売上高 TTM | 営業利益 TTM | EPS TTM | 営業利益率 TTM |")
+        md.append("|---|---|---|---|---|---|---|---|---|---|")
+        for period in series.periods():
+            m = series.metrics(period)
+            md.append(
+                f"| {period_label(period)} | {_fmt(m.quarter['net_sales'])} | {_fmt(m.quarter['operating_profit'])} "
+                f"| {_fmt(m.quarter['eps'], '{:,.2f}')} | {_fmt(m.qoq['net_sales'], '{:+.1f}%')} "
+                f"| {_fmt(m.quarter_margin, '{:.1f}%')} | {_fmt(m.ttm['net_sales'])} "
+                f"| {_fmt(m.ttm['operating_profit'])} | {_fmt(m.ttm['eps'], '{:,.2f}')} | {_fmt(m.ttm_margin, '{:.1f}%')} |"
+            )
 
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write("\n".join(md))
 
         print(f"Report generated: {filepath}")
+
+TIMESERIES_LABELS = {"net_sales": "売上高", "operating_profit": "営業利益", "eps": "EPS"}
+
+def _fmt(value, pattern: str = "{:,.0f}") -> str:
+    return pattern.format(value) if value is not None else "-"
@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+class DirectoryBackend:
+    """
+    Stores each cached response as a JSON file in a local directory.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry["created_at"], entry["value"]
+
+    def put(self, key: str, created_at: float, value: Dict[str, Any]):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"created_at": created_at, "value": value}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict_to(self, max_entries: int) -> int:
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    entries.append((entry.stat().st_mtime, entry.path))
+        excess = len(entries) - max_entries
+        if excess <= 0:
+            return 0
+        for _, path in sorted(entries)[:excess]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return excess
+
+class SQLiteBackend:
+    """
+    Stores cached responses in a single SQLite database file.
+    """
+
+    def __init__(self, db_path: str):
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, created_at REAL NOT NULL, value TEXT NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_created ON responses(created_at)")
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT created_at, value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def put(self, key: str, created_at: float, value: Dict[str, Any]):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, created_at, value) VALUES (?, ?, ?)",
+                (key, created_at, json.dumps(value, ensure_ascii=False))
+            )
+            self.conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def evict_to(self, max_entries: int) -> int:
+        with self._lock:
+            cur = self.conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (max_entries,)
+            )
+            self.conn.commit()
+        return cur.rowcount
+
+class ResponseCache:
+    """
+    Caches parsed analyzer responses keyed on
+    (model, prompt template hash, input text hash, response_format).
+    Entries older than ttl_seconds are treated as misses, and the oldest entries
+    are evicted once the backend holds more than max_entries.
+    """
+
+    def __init__(self, backend, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, prompt: str, text: str, response_format: Optional[Dict[str, Any]]) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        fmt = json.dumps(response_format, sort_keys=True)
+        return hashlib.sha256(f"{model}\0{prompt_hash}\0{text_hash}\0{fmt}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        created_at, value = entry
+        if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+            self.backend.delete(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]):
+        self.backend.put(key, time.time(), value)
+        if self.max_entries is not None:
+            self.backend.evict_to(self.max_entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,77 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from .models import FinancialData, AnalysisReport
+from .evaluator import Evaluator
+from .keyword_scanner import KeywordSignals
+from .store import FinancialStore
+from .batch import BatchResult
+
+@dataclass
+class _Baseline:
+    year: str
+    quarter: str
+    current: FinancialData
+    last_year: Optional[FinancialData]
+    report: AnalysisReport
+
+class Revaluer:
+    """
+    Re-screens analyzed filings at new prices using only the FinancialStore: no PDF extraction
+    and no API calls. Each code's latest filing is evaluated once; every later price for that
+    code only recomputes PER/PBR/PEG via Evaluator.revalue.
+    """
+
+    def __init__(self, evaluator: Evaluator, store: FinancialStore):
+        self.evaluator = evaluator
+        self.store = store
+        self._baselines: Dict[str, Optional[_Baseline]] = {}
+
+    def _baseline(self, code: str, price: float) -> Optional[_Baseline]:
+        if code not in self._baselines:
+            latest = self.store.latest(code)
+            if latest is None:
+                self._baselines[code] = None
+            else:
+                year, quarter, current = latest
+                last_year = self.store.get(code, str(int(year) - 1), quarter)
+                signals = KeywordSignals.from_result(self.store.get_raw(code, year, quarter))
+                report = self.evaluator.evaluate(current, last_year, price, signals)
+                self._baselines[code] = _Baseline(year, quarter, current, last_year, report)
+        return self._baselines[code]
+
+    def report(self, code: str, price: float) -> Optional[AnalysisReport]:
+        """Report for the latest stored filing of code at price, or None when nothing is stored."""
+        baseline = self._baseline(code, price)
+        if baseline is None:
+            return None
+        if baseline.report.stock_price == price:
+            return baseline.report
+        return self.evaluator.revalue(baseline.report, baseline.current, baseline.last_year, price)
+
+    def run(self, universe: List[Tuple[str, float]], reporter=None) -> List[BatchResult]:
+        """
+        Revalues every (code, price) in the universe. Reports go to reporter.submit
+        (a BatchReportWriter) when one is given. Codes without stored data are reported as errors.
+        """
+        start = time.perf_counter()
+        results = []
+        for code, price in universe:
+            result = BatchResult(stock_code=code, stock_price=price)
+            results.append(result)
+            result.report = self.report(code, price)
+            if result.report is None:
+                result.error = "no analyzed filing in the store"
+                continue
+            baseline = self._baselines[code]
+            result.year, result.quarter = baseline.year, baseline.quarter
+            if reporter is not None:
+                reporter.submit(code, result.year, result.quarter, result.report)
+
+        elapsed = time.perf_counter() - start
+        succeeded = sum(1 for r in results if r.report is not None)
+        print(f"Revaluation finished: {succeeded}/{len(results)} companies in {elapsed:.2f}s")
+        for r in results:
+            if r.error:
+                print(f"  {r.stock_code}: {r.error}")
+        return results
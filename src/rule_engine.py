@@ -0,0 +1,277 @@
+import os
+import operator
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import yaml
+from .models import FinancialData, EvaluationResult
+from .keyword_scanner import KeywordScanner, KeywordSignals, compile_lexicons, normalize
+
+OPS = {">=": operator.ge, "<=": operator.le, ">": operator.gt, "<": operator.lt}
+
+@dataclass(frozen=True)
+class MetricSpec:
+    """
+    Code-side definition of a metric configured in criteria.yaml.
+    compute(cur, last) must only use arithmetic so that it works both on FinancialData
+    and on namespaces of NumPy columns. requires lists (side, field, allow_zero) inputs that
+    must be present; with allow_zero False a value of 0 also counts as missing.
+    labels maps YAML threshold keys to assessment labels.
+    """
+    section: str
+    name: str
+    metric_name: str
+    compute: Callable[[Any, Any], Any]
+    requires: Tuple[Tuple[str, str, bool], ...]
+    op: str
+    labels: Tuple[Tuple[str, str], ...]
+    default: str
+    fmt: str
+    details: Optional[Callable[[Any, Any], str]] = None
+    # Fixed (op, threshold, label) steps for checks that have no numeric thresholds in the YAML
+    fixed_steps: Tuple[Tuple[str, float, str], ...] = ()
+
+@dataclass(frozen=True)
+class Rule:
+    """One compiled row of the rule table."""
+    key: str
+    metric_name: str
+    compute: Callable[[Any, Any], Any]
+    requires: Tuple[Tuple[str, str, bool], ...]
+    steps: Tuple[Tuple[str, float, str], ...]
+    default: str
+    fmt: str
+    details: Optional[Callable[[Any, Any], str]] = None
+    # Only applies to filings of this quarter (progress rate thresholds are per quarter)
+    quarter: Optional[str] = None
+    # (good, bad) keyword lists for text rules, counted over the full text when it was scanned
+    # and over cost_efficiency_comment otherwise
+    keywords: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]] = None
+
+    def applies(self, cur: FinancialData, last: Optional[FinancialData], quarter: Optional[str]) -> bool:
+        if self.quarter is not None and quarter != self.quarter:
+            return False
+        for side, field, allow_zero in self.requires:
+            data = cur if side == "cur" else last
+            if data is None:
+                return False
+            value = getattr(data, field)
+            if value is None or (not allow_zero and not value):
+                return False
+        return True
+
+    def assess(self, value) -> str:
+        for op, threshold, label in self.steps:
+            if OPS[op](value, threshold):
+                return label
+        return self.default
+
+    def evaluate(self, cur: FinancialData, last: Optional[FinancialData], quarter: Optional[str],
+                 signals: Optional[KeywordSignals] = None) -> Optional[EvaluationResult]:
+        if self.keywords is not None:
+            return self._evaluate_keywords(cur, signals)
+        if not self.applies(cur, last, quarter):
+            return None
+        value = self.compute(cur, last)
+        return EvaluationResult(
+            metric_name=self.metric_name,
+            value=self.fmt.format(value),
+            assessment=self.assess(value),
+            details=self.details(cur, last) if self.details else ""
+        )
+
+    def _evaluate_keywords(self, cur: FinancialData, signals: Optional[KeywordSignals]) -> Optional[EvaluationResult]:
+        good, bad = self.keywords
+        if signals is not None and any(signals.counts.get(normalize(k)) for k in good + bad):
+            count, source = (lambda k: signals.counts.get(normalize(k), 0)), " (本文)"
+        else:
+            text = cur.cost_efficiency_comment
+            if not text:
+                return None
+            count, source = text.count, ""
+        good_hits = {k: count(k) for k in good if count(k)}
+        bad_hits = {k: count(k) for k in bad if count(k)}
+        if not good_hits and not bad_hits:
+            return None
+        value = sum(good_hits.values()) - sum(bad_hits.values())
+        details = " / ".join(
+            f"{label}: " + ", ".join(f"{k}×{n}" for k, n in hits.items())
+            for label, hits in (("良", good_hits), ("悪", bad_hits)) if hits
+        )
+        return EvaluationResult(
+            metric_name=self.metric_name,
+            value=self.fmt.format(value),
+            assessment=self.assess(value),
+            details=details + source
+        )
+
+def _margin_details(c, l) -> str:
+    current_margin = (c.operating_profit / c.net_sales) * 100
+    last_year_margin = (l.operating_profit / l.net_sales) * 100
+    return f"前年同期: {last_year_margin:.2f}% → 今期: {current_margin:.2f}%"
+
+HIGH = (("top_class", "Top Class"), ("excellent", "Excellent"), ("pass", "Pass"))
+
+# Evaluation order follows this table
+METRIC_SPECS: List[MetricSpec] = [
+    MetricSpec("pl", "revenue_growth_yoy", "売上高成長率(YoY)",
+               lambda c, l: ((c.net_sales - l.net_sales) / l.net_sales) * 100,
+               (("cur", "net_sales", False), ("last", "net_sales", False)),
+               ">=", HIGH, "Fail", "{:.2f}%"),
+    MetricSpec("pl", "operating_margin", "営業利益率",
+               lambda c, l: (c.operating_profit / c.net_sales) * 100,
+               (("cur", "net_sales", False), ("cur", "operating_profit", False)),
+               ">=", HIGH, "Fail", "{:.2f}%"),
+    MetricSpec("pl", "operating_margin_improvement", "営業利益率の改善(YoY)",
+               lambda c, l: (c.operating_profit / c.net_sales) * 100 - (l.operating_profit / l.net_sales) * 100,
+               (("cur", "net_sales", False), ("cur", "operating_profit", False),
+                ("last", "net_sales", False), ("last", "operating_profit", False)),
+               ">", (), "Declining", "{:+.2f}%pt", _margin_details,
+               fixed_steps=((">", 0.0, "Improving"),)),
+    # progress_rate is expanded into one rule per quarter by compile_rules
+    MetricSpec("pl", "progress_rate", "進捗率",
+               lambda c, l: (c.operating_profit / c.operating_profit_forecast) * 100,
+               (("cur", "operating_profit", False), ("cur", "operating_profit_forecast", False)),
+               ">=", (), "Attention", "{:.1f}%",
+               lambda c, l: f"営業利益: {c.operating_profit:.0f}百万円 / 通期予想: {c.operating_profit_forecast:.0f}百万円"),
+    MetricSpec("bs", "capital_adequacy_ratio", "自己資本比率",
+               lambda c, l: c.equity_ratio,
+               (("cur", "equity_ratio", False),),
+               ">=", (("ironclad", "Ironclad"), ("safe", "Safe")), "Attention", "{:.2f}%"),
+    MetricSpec("bs", "current_ratio", "流動比率",
+               lambda c, l: (c.current_assets / c.current_liabilities) * 100,
+               (("cur", "current_assets", False), ("cur", "current_liabilities", False)),
+               ">=", (("very_safe", "Very Safe"), ("safe", "Safe"), ("danger", "OK")), "Danger", "{:.2f}%"),
+    MetricSpec("bs", "quick_ratio", "当座比率",
+               lambda c, l: (c.quick_assets / c.current_liabilities) * 100,
+               (("cur", "quick_assets", False), ("cur", "current_liabilities", False)),
+               ">=", (("safe", "Safe"), ("caution", "OK")), "Caution", "{:.2f}%"),
+    # Approximating Equity as Total Net Assets for simplicity, though technically Equity = Net Assets - Minority Interests
+    MetricSpec("bs", "de_ratio", "D/Eレシオ",
+               lambda c, l: c.interest_bearing_debt / c.total_net_assets,
+               (("cur", "interest_bearing_debt", True), ("cur", "total_net_assets", False)),
+               "<=", (("very_safe", "Very Safe"), ("healthy", "Healthy"), ("danger", "Caution")), "Danger", "{:.2f}倍"),
+    # CF statements are often omitted (null or 0) in quarterly filings, so 0 counts as missing
+    MetricSpec("cf", "operating_cf_vs_profit", "営業CF > 営業利益",
+               lambda c, l: c.operating_cf - c.operating_profit,
+               (("cur", "operating_cf", False), ("cur", "operating_profit", False)),
+               ">", (), "Fail", "{:+,.0f}百万円",
+               lambda c, l: f"営業CF: {c.operating_cf:,.0f}百万円 / 営業利益: {c.operating_profit:,.0f}百万円",
+               fixed_steps=((">", 0.0, "Pass"),)),
+    MetricSpec("cf", "operating_cf_margin_vs_operating_margin", "営業CFマージン > 営業利益率",
+               lambda c, l: (c.operating_cf / c.net_sales) * 100 - (c.operating_profit / c.net_sales) * 100,
+               (("cur", "operating_cf", False), ("cur", "operating_profit", False), ("cur", "net_sales", False)),
+               ">", (), "Fail", "{:+.2f}%pt", None,
+               fixed_steps=((">", 0.0, "Pass"),)),
+    MetricSpec("cf", "investment_cf", "投資CF",
+               lambda c, l: c.investment_cf,
+               (("cur", "investment_cf", False),),
+               "<", (), "Fail", "{:,.0f}百万円"),
+    MetricSpec("cf", "fcf", "フリーキャッシュフロー",
+               lambda c, l: c.operating_cf + c.investment_cf,
+               (("cur", "operating_cf", False), ("cur", "investment_cf", False)),
+               ">", (), "Fail", "{:,.0f}百万円"),
+]
+
+def _threshold_steps(spec: MetricSpec, node: Dict[str, Any]) -> Tuple[Tuple[str, float, str], ...]:
+    if spec.fixed_steps:
+        return spec.fixed_steps
+    expected = node.get("expected")
+    if expected == "negative":
+        return (("<", 0.0, "Pass"),)
+    if expected == "positive":
+        return ((">", 0.0, "Pass"),)
+
+    thresholds = node.get("thresholds", node)
+    steps = [(spec.op, float(thresholds[key]), label) for key, label in spec.labels if key in thresholds]
+    # Check the strictest threshold first, like the original if/elif ladders
+    descending = spec.op in (">=", ">")
+    return tuple(sorted(steps, key=lambda s: s[1], reverse=descending))
+
+def compile_rules(config: Dict[str, Any]) -> List[Rule]:
+    """Compiles the `analysis` section of criteria.yaml into an ordered rule table."""
+    analysis = config.get("analysis", {})
+    rules: List[Rule] = []
+    for spec in METRIC_SPECS:
+        node = analysis.get(spec.section, {}).get(spec.name)
+        if node is None:
+            continue
+        key = f"{spec.section}.{spec.name}"
+
+        if spec.name == "progress_rate":
+            for quarter, thresholds in node.items():
+                if not isinstance(thresholds, dict) or not thresholds:
+                    continue
+                steps = []
+                if thresholds.get("good"):
+                    steps.append((">=", float(thresholds["good"]), "Good"))
+                if thresholds.get("bad"):
+                    steps.append(("<=", float(thresholds["bad"]), "Bad"))
+                rules.append(Rule(f"{key}.{quarter}", f"{spec.metric_name}({quarter})", spec.compute, spec.requires,
+                                  tuple(steps), spec.default, spec.fmt, spec.details, quarter=quarter))
+            continue
+
+        rules.append(Rule(key, spec.metric_name, spec.compute, spec.requires, _threshold_steps(spec, node),
+                          spec.default, spec.fmt, spec.details))
+
+    sga = analysis.get("pl", {}).get("sga_efficiency")
+    if sga:
+        rules.append(Rule("pl.sga_efficiency", "販管費の効率性", None, (),
+                          ((">", 0.0, "Good"), ("<", 0.0, "Bad")), "Neutral", "{:+d}",
+                          keywords=(tuple(sga.get("good_keywords", [])), tuple(sga.get("bad_keywords", [])))))
+    return rules
+
+# Compiled tables shared by every RuleEngine, keyed by (path, mtime_ns, size)
+_compiled: Dict[Tuple[str, int, int], Tuple[Dict[str, Any], List[Rule], KeywordScanner]] = {}
+_compiled_lock = threading.Lock()
+
+class RuleEngine:
+    """
+    Loads criteria.yaml once and keeps its compiled rule table and keyword scanner.
+    The file is re-read only when its mtime or size changes, so a long-running process
+    picks up criteria edits without parsing YAML per company.
+    """
+
+    def __init__(self, config_path: str):
+        self.config_path = os.path.abspath(config_path)
+        self._stamp = None
+        self._config: Dict[str, Any] = {}
+        self._rules: List[Rule] = []
+        self._scanner: Optional[KeywordScanner] = None
+        self._refresh()
+
+    def _refresh(self):
+        st = os.stat(self.config_path)
+        stamp = (self.config_path, st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return
+
+        with _compiled_lock:
+            compiled = _compiled.get(stamp)
+            if compiled is None:
+                with open(self.config_path, 'r', encoding='utf-8') as f:
+                    config = yaml.safe_load(f)
+                rules = compile_rules(config)
+                rule_keywords = [k for rule in rules if rule.keywords for group in rule.keywords for k in group]
+                compiled = (config, rules, KeywordScanner(compile_lexicons(config), rule_keywords))
+                # Drop tables compiled from older versions of the same file
+                for old in [k for k in _compiled if k[0] == self.config_path]:
+                    del _compiled[old]
+                _compiled[stamp] = compiled
+        self._config, self._rules, self._scanner = compiled
+        self._stamp = stamp
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        self._refresh()
+        return self._config
+
+    @property
+    def rules(self) -> List[Rule]:
+        self._refresh()
+        return self._rules
+
+    @property
+    def scanner(self) -> KeywordScanner:
+        self._refresh()
+        return self._scanner
@@ -0,0 +1,66 @@
+import re
+from typing import Dict, List, Set, Tuple
+
+# Sections of a 決算短信 / 有価証券報告書 that the analysis needs.
+# Each entry is (pattern, required); extraction may stop once every required section has been seen.
+SECTION_PATTERNS: Dict[str, Tuple[str, bool]] = {
+    "summary": (r"サマリー情報|主要な経営指標等の推移|連結業績|経営成績（累計）|経営成績\(累計\)", True),
+    "qualitative": (r"経営成績等の概況|経営成績に関する説明|経営方針|事業等のリスク|対処すべき課題", False),
+    "pl": (r"損益(及び包括利益)?計算書", True),
+    "bs": (r"貸借対照表", True),
+    "cf": (r"キャッシュ[・･]?フロー計算書", True),
+}
+
+TOC_LINE = re.compile(r"(\.{3,}|…{2,}|・{3,}|‥{2,})\s*\d+\s*$")
+
+def looks_like_toc(page_text: str) -> bool:
+    """Table-of-contents pages mention every section name and must not count as the section itself."""
+    if "目次" in page_text:
+        return True
+    toc_lines = sum(1 for line in page_text.splitlines() if TOC_LINE.search(line.strip()))
+    return toc_lines >= 3
+
+def detect_sections(page_text: str) -> Set[str]:
+    if looks_like_toc(page_text):
+        return set()
+    return {name for name, (pattern, _) in SECTION_PATTERNS.items() if re.search(pattern, page_text)}
+
+class SectionPageSelector:
+    """
+    Decides page by page which pages of a filing to keep.
+    A page is kept when it opens one of SECTION_PATTERNS, and the next continuation_pages
+    pages are kept as well because statements usually span more than one page.
+    """
+
+    def __init__(self, continuation_pages: int = 1):
+        self.continuation_pages = continuation_pages
+        self.found: Dict[str, int] = {}
+        self.selected: List[int] = []
+        self._carry = 0
+
+    def feed(self, page_no: int, page_text: str) -> bool:
+        if looks_like_toc(page_text):
+            return False
+
+        sections = detect_sections(page_text)
+        for name in sections:
+            self.found.setdefault(name, page_no)
+
+        if sections:
+            self._carry = self.continuation_pages
+            keep = True
+        elif self._carry > 0:
+            self._carry -= 1
+            keep = True
+        else:
+            keep = False
+
+        if keep:
+            self.selected.append(page_no)
+        return keep
+
+    @property
+    def done(self) -> bool:
+        """True once every required section was found and its continuation pages were read."""
+        required = [name for name, (_, req) in SECTION_PATTERNS.items() if req]
+        return all(name in self.found for name in required) and self._carry == 0
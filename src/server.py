@@ -0,0 +1,403 @@
+import os
+import json
+import asyncio
+import tempfile
+import functools
+from contextlib import suppress, nullcontext
+from dataclasses import dataclass, asdict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qsl
+from typing import Dict, Any, Optional, Tuple
+from .models import FinancialData
+from .evaluator import Evaluator
+from .keyword_scanner import KeywordSignals
+from .store import FinancialStore
+from .file_index import FileIndex
+from .extraction_cache import ExtractionCache
+from .pdf_loader import find_financial_reports
+from .parallel_extract import extract_text_guarded
+from .pipeline import select_periods
+from .instrumentation import get_tracer
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes
+
+class ConcurrencyLimiter:
+    """
+    Admits `limit` requests at a time and lets at most `max_waiting` more queue behind them.
+    Anything beyond that is rejected immediately with 503 and Retry-After, instead of piling up
+    in memory while its client times out.
+    """
+
+    def __init__(self, limit: int, max_waiting: int, retry_after: int = 5):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def __aenter__(self):
+        if self._semaphore.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise HTTPError(503, "server busy, retry later", {"Retry-After": str(self.retry_after)})
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {"limit": self.limit, "active": self.active, "waiting": self.waiting, "rejected": self.rejected}
+
+def report_to_dict(report) -> Dict[str, Any]:
+    return asdict(report)
+
+def _json_body(request: Request) -> Dict[str, Any]:
+    try:
+        body = json.loads(request.body.decode('utf-8') or "{}")
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise HTTPError(400, f"invalid JSON body: {e}")
+    if not isinstance(body, dict):
+        raise HTTPError(400, "JSON body must be an object")
+    return body
+
+def _price(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, "price is required and must be a number")
+
+async def _readline(reader: asyncio.StreamReader) -> bytes:
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        # Longer than the StreamReader limit (64 KiB)
+        raise HTTPError(400, "request line or header too long")
+
+def _required(body: Dict[str, Any], name: str) -> str:
+    value = body.get(name)
+    if not value:
+        raise HTTPError(400, f"{name} is required")
+    return str(value)
+
+class AnalysisServer:
+    """
+    Long-lived asyncio HTTP/1.1 service (stdlib only) that keeps one Evaluator with its compiled
+    criteria, one FinancialStore, the caches and one AsyncAIAnalyzer, whose pooled HTTP client is
+    reused across requests.
+
+        GET  /health
+        POST /evaluate  {"code", "price", ["year", "quarter"]}  or  {"analysis", ["prev_analysis"], "price"}
+        POST /analyze   {"code", "price", ["refresh"]}, or a PDF body (Content-Type: application/pdf)
+                        with ?price=...[&code=&year=&quarter=]
+
+    /evaluate never extracts or calls the LLM. /analyze answers from the store when the latest filing
+    was analyzed before; otherwise PDF extraction runs in a process pool and the LLM call on the event
+    loop, behind a ConcurrencyLimiter that rejects excess work with 503. Concurrent requests for the
+    same filing share one analysis.
+    """
+
+    def __init__(self, evaluator: Evaluator, store: FinancialStore, analyzer=None, input_dir: str = "input",
+                 file_index: Optional[FileIndex] = None, extraction_cache: Optional[ExtractionCache] = None,
+                 host: str = "127.0.0.1", port: int = 8080, max_concurrency: int = 4, max_waiting: int = 16,
+                 extract_pool: Optional[Executor] = None, extract_workers: Optional[int] = None,
+                 sections_only: bool = True, fast_path: bool = True, max_body: int = 32 * 1024 * 1024,
+                 extract_options: Optional[Dict[str, Any]] = None):
+        self.evaluator = evaluator
+        self.store = store
+        self.analyzer = analyzer
+        self.input_dir = input_dir
+        self.file_index = file_index
+        self.extraction_cache = extraction_cache
+        self.host = host
+        self.port = port
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self.extract_pool = extract_pool
+        self.extract_workers = extract_workers
+        self.sections_only = sections_only
+        self.fast_path = fast_path
+        self.max_body = max_body
+        self.extract_options = extract_options or {}
+        self.limiter: Optional[ConcurrencyLimiter] = None
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._owns_pool = extract_pool is None
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        self._routes = {
+            ("GET", "/health"): self.health,
+            ("POST", "/evaluate"): self.evaluate,
+            ("POST", "/analyze"): self.analyze,
+        }
+
+    async def start(self):
+        # Created on the running loop
+        self.limiter = ConcurrencyLimiter(self.max_concurrency, self.max_waiting)
+        if self.extract_pool is None:
+            self.extract_pool = ProcessPoolExecutor(max_workers=self.extract_workers)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        print(f"Listening on http://{self.host}:{self.port}")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self.analyzer is not None and hasattr(self.analyzer, "aclose"):
+            await self.analyzer.aclose()
+        if self._owns_pool and self.extract_pool is not None:
+            self.extract_pool.shutdown(wait=False, cancel_futures=True)
+            self.extract_pool = None
+
+    # --- HTTP ---
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Request]:
+        line = await _readline(reader)
+        if not line:
+            return None
+        try:
+            method, target, _version = line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, "malformed request line")
+        headers = {}
+        while True:
+            line = await _readline(reader)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "invalid Content-Length")
+        if length > self.max_body:
+            raise HTTPError(413, f"request body exceeds {self.max_body} bytes")
+        body = await reader.readexactly(length) if length else b""
+        url = urlsplit(target)
+        return Request(method.upper(), url.path, dict(parse_qsl(url.query)), headers, body)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    # The rest of the request is unread, so the connection cannot be reused
+                    await self._respond(writer, e.status, {"error": e.message}, False, e.headers)
+                    break
+                if request is None:
+                    break
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                status, payload, headers = await self._dispatch(request)
+                await self._respond(writer, status, payload, keep_alive, headers)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
+
+    async def _dispatch(self, request: Request) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        self.requests += 1
+        handler = self._routes.get((request.method, request.path))
+        if handler is None:
+            known = any(path == request.path for _, path in self._routes)
+            return (405, {"error": "method not allowed"}, {}) if known else (404, {"error": "not found"}, {})
+        try:
+            with get_tracer().span("http", path=request.path):
+                return 200, await handler(request), {}
+        except HTTPError as e:
+            return e.status, {"error": e.message}, e.headers
+        except Exception as e:
+            print(f"{request.method} {request.path} failed: {e.__class__.__name__}: {e}")
+            return 500, {"error": f"{e.__class__.__name__}: {e}"}, {}
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                       keep_alive: bool, headers: Dict[str, str]):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                 "Content-Type: application/json; charset=utf-8",
+                 f"Content-Length: {len(body)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines.extend(f"{k}: {v}" for k, v in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+    # --- Endpoints ---
+
+    async def health(self, request: Request) -> Dict[str, Any]:
+        health = {"status": "ok", "requests": self.requests, "analyze": self.limiter.stats(),
+                  "inflight_filings": len(self._inflight)}
+        if self.extraction_cache is not None:
+            health["extraction_cache"] = self.extraction_cache.stats()
+        cache = getattr(self.analyzer, "cache", None)
+        if cache is not None:
+            health["response_cache"] = cache.stats()
+        return health
+
+    async def evaluate(self, request: Request) -> Dict[str, Any]:
+        body = _json_body(request)
+        price = _price(body.get("price"))
+        if "analysis" in body:
+            current = self.evaluator.map_json_to_model(body["analysis"])
+            prev = self.evaluator.map_json_to_model(body["prev_analysis"]) if body.get("prev_analysis") else None
+            return self._report(current, prev, price, signals=KeywordSignals.from_result(body["analysis"]))
+
+        code = _required(body, "code")
+        found = self._stored(code, body.get("year"), body.get("quarter"))
+        if found is None:
+            raise HTTPError(404, f"no analyzed filing for {code}; POST /analyze first")
+        year, quarter, current = found
+        prev = self.store.get(code, str(int(year) - 1), quarter)
+        return self._report(current, prev, price, code=code, year=year, quarter=quarter, source="store")
+
+    async def analyze(self, request: Request) -> Dict[str, Any]:
+        if request.headers.get("content-type", "").split(";")[0].strip() == "application/pdf":
+            return await self._analyze_upload(request)
+
+        body = _json_body(request)
+        code = _required(body, "code")
+        price = _price(body.get("price"))
+        if self.file_index is not None:
+            # Picks up PDFs added since the server started; only a stat when the directory is unchanged
+            self.file_index.refresh()
+        reports_map = find_financial_reports(self.input_dir, code, index=self.file_index)
+        if not reports_map:
+            found = None if body.get("refresh") else self._stored(code)
+            if found is None:
+                raise HTTPError(404, f"no PDF found for {code}")
+            year, quarter, current = found
+            prev = self.store.get(code, str(int(year) - 1), quarter)
+            return self._report(current, prev, price, code=code, year=year, quarter=quarter, source="store")
+
+        year, quarter, current_path, prev_year, prev_path = select_periods(reports_map)
+        current = None if body.get("refresh") else self.store.get(code, year, quarter)
+        prev = self.store.get(code, prev_year, quarter)
+        source = "store"
+        if current is None or (prev is None and prev_path):
+            source = "analyzed"
+            keys = [(code, year, quarter)] if current is None else []
+            if prev is None and prev_path:
+                keys.append((code, prev_year, quarter))
+            async with self._admission(keys):
+                jobs = [self._analyze_filing(current_path, (code, year, quarter)) if current is None else None,
+                        self._analyze_filing(prev_path, (code, prev_year, quarter)) if prev is None and prev_path else None]
+                results = await asyncio.gather(*(job for job in jobs if job is not None))
+            results = iter(results)
+            current = next(results) if jobs[0] is not None else current
+            prev = next(results) if jobs[1] is not None else prev
+        return self._report(current, prev, price, code=code, year=year, quarter=quarter, source=source)
+
+    async def _analyze_upload(self, request: Request) -> Dict[str, Any]:
+        price = _price(request.query.get("price"))
+        if not request.body:
+            raise HTTPError(400, "empty PDF body")
+        code, year, quarter = (request.query.get(k) for k in ("code", "year", "quarter"))
+        key = (code, year, quarter) if code and year and quarter else None
+
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(request.body)
+            async with self._admission([key] if key else []):
+                current = await self._analyze_filing(path, key, source_path="upload")
+        finally:
+            with suppress(OSError):
+                os.unlink(path)
+        prev = self.store.get(code, str(int(year) - 1), quarter) if key and year.isdigit() else None
+        return self._report(current, prev, price, code=code, year=year, quarter=quarter, source="analyzed")
+
+    # --- Helpers ---
+
+    def _admission(self, keys):
+        """
+        The limiter, unless every filing in keys is already being analyzed for another request:
+        those requests only wait for the shared result and must not take a slot from other filings.
+        """
+        if keys and all(key in self._inflight for key in keys):
+            return nullcontext()
+        return self.limiter
+
+    def _stored(self, code: str, year: Optional[str] = None,
+                quarter: Optional[str] = None) -> Optional[Tuple[str, str, FinancialData]]:
+        if year and quarter:
+            data = self.store.get(code, str(year), quarter)
+            return (str(year), quarter, data) if data is not None else None
+        return self.store.latest(code)
+
+    def _report(self, current: FinancialData, prev: Optional[FinancialData], price: float,
+                signals: Optional[KeywordSignals] = None, **meta) -> Dict[str, Any]:
+        if signals is None and all(meta.get(k) for k in ("code", "year", "quarter")):
+            signals = KeywordSignals.from_result(self.store.get_raw(meta["code"], meta["year"], meta["quarter"]))
+        with get_tracer().span("evaluate"):
+            report = self.evaluator.evaluate(current, prev, price, signals)
+        payload = {k: v for k, v in meta.items() if v is not None}
+        payload["has_prior_year"] = prev is not None
+        payload["report"] = report_to_dict(report)
+        return payload
+
+    async def _analyze_filing(self, path: str, key: Optional[Tuple[str, str, str]],
+                              source_path: Optional[str] = None) -> FinancialData:
+        """Extracts and analyzes one PDF; concurrent calls for the same filing share one run."""
+        if key is None:
+            return await self._extract_and_analyze(path, None, source_path)
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._extract_and_analyze(path, key, source_path))
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # One client disconnecting must not cancel the analysis the others are waiting for
+        return await asyncio.shield(pending)
+
+    async def _extract_and_analyze(self, path: str, key: Optional[Tuple[str, str, str]],
+                                   source_path: Optional[str] = None) -> FinancialData:
+        if self.analyzer is None:
+            raise HTTPError(503, "no analyzer configured")
+        tracer = get_tracer()
+        loop = asyncio.get_running_loop()
+        with tracer.span("extract", path=os.path.basename(path)):
+            text = await loop.run_in_executor(self.extract_pool, functools.partial(
+                extract_text_guarded, path, cache=self.extraction_cache, sections_only=self.sections_only,
+                **self.extract_options))
+        if not text:
+            raise HTTPError(400, f"no text could be extracted from {os.path.basename(path)}")
+        result = await self.analyzer.analyze(text, fast_path=self.fast_path)
+        self.evaluator.scan(text).attach(result)
+        data = self.evaluator.map_json_to_model(result)
+        if key is not None:
+            self.store.put(*key, data, result, source_path or path)
+        return data
@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from dataclasses import asdict, fields
+from typing import Dict, Any, List, Optional, Tuple
+from .models import FinancialData
+from .columnar import FinancialTable
+
+_FIELD_NAMES = {f.name for f in fields(FinancialData)}
+
+def _to_model(data_json: str) -> FinancialData:
+    data = json.loads(data_json)
+    # Ignore columns written by a newer FinancialData
+    return FinancialData(**{k: v for k, v in data.items() if k in _FIELD_NAMES})
+
+class FinancialStore:
+    """
+    SQLite store of extracted FinancialData and the raw analyzer JSON,
+    indexed by (stock code, fiscal year, quarter).
+    """
+
+    def __init__(self, db_path: str):
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS filings ("
+            "code TEXT NOT NULL, year TEXT NOT NULL, quarter TEXT NOT NULL, "
+            "company_name TEXT, fiscal_period TEXT, "
+            "data TEXT NOT NULL, raw TEXT, source_path TEXT, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (code, year, quarter))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_filings_period ON filings(year, quarter)")
+        self.conn.commit()
+
+    def put(self, code: str, year: str, quarter: str, data: FinancialData,
+            raw: Optional[Dict[str, Any]] = None, source_path: str = ""):
+        self.put_many([(code, year, quarter, data, raw, source_path)])
+
+    def put_many(self, records: List[Tuple[str, str, str, FinancialData, Optional[Dict[str, Any]], str]]):
+        now = time.time()
+        rows = [
+            (code, year, quarter, data.company_name, data.fiscal_period,
+             json.dumps(asdict(data), ensure_ascii=False),
+             json.dumps(raw, ensure_ascii=False) if raw is not None else None,
+             source_path, now)
+            for code, year, quarter, data, raw, source_path in records
+        ]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO filings "
+                "(code, year, quarter, company_name, fiscal_period, data, raw, source_path, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+
+    def get(self, code: str, year: str, quarter: str) -> Optional[FinancialData]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT data FROM filings WHERE code = ? AND year = ? AND quarter = ?", (code, year, quarter)
+            ).fetchone()
+        return _to_model(row[0]) if row else None
+
+    def get_raw(self, code: str, year: str, quarter: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT raw FROM filings WHERE code = ? AND year = ? AND quarter = ?", (code, year, quarter)
+            ).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def periods(self, code: str) -> List[Tuple[str, str]]:
+        """All stored (year, quarter) pairs for a code, oldest first."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT year, quarter FROM filings WHERE code = ? ORDER BY year, quarter", (code,)
+            ).fetchall()
+        return [(y, q) for y, q in rows]
+
+    def history(self, code: str) -> List[Tuple[str, str, FinancialData]]:
+        """Every stored period of a code as (year, quarter, data), oldest first."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT year, quarter, data FROM filings WHERE code = ? ORDER BY year, quarter", (code,)
+            ).fetchall()
+        return [(y, q, _to_model(d)) for y, q, d in rows]
+
+    def by_quarter(self, year: str, quarter: str) -> Dict[str, FinancialData]:
+        """All companies stored for one period, keyed by stock code."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT code, data FROM filings WHERE year = ? AND quarter = ? ORDER BY code", (year, quarter)
+            ).fetchall()
+        return {code: _to_model(d) for code, d in rows}
+
+    def latest(self, code: str) -> Optional[Tuple[str, str, FinancialData]]:
+        """The most recent stored period of a code as (year, quarter, data)."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT year, quarter, data FROM filings WHERE code = ? ORDER BY year DESC, quarter DESC LIMIT 1",
+                (code,)
+            ).fetchone()
+        return (row[0], row[1], _to_model(row[2])) if row else None
+
+    def table(self, codes: Optional[List[str]] = None, keep_text: bool = False) -> FinancialTable:
+        """
+        Loads stored filings (all of them, or only `codes`) into a FinancialTable keyed by (code, year, quarter).
+        Unless keep_text is set, the qualitative comments stay in the database and are read back per row on demand.
+        """
+        query = "SELECT code, year, quarter, data FROM filings"
+        params: Tuple = ()
+        if codes is not None:
+            query += f" WHERE code IN ({','.join('?' * len(codes))})"
+            params = tuple(codes)
+        with self._lock:
+            rows = self.conn.execute(query + " ORDER BY code, year, quarter", params).fetchall()
+        table = FinancialTable() if keep_text else FinancialTable(text_loader=lambda key: self.get(*key))
+        for code, year, quarter, data in rows:
+            table.append(_to_model(data), (code, year, quarter))
+        return table
+
+    def codes(self) -> List[str]:
+        with self._lock:
+            rows = self.conn.execute("SELECT DISTINCT code FROM filings ORDER BY code").fetchall()
+        return [r[0] for r in rows]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,189 @@
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+# Fields the parser can fill, in the analyzer's JSON layout
+NUMERIC_FIELDS = {
+    "pl": ["net_sales", "operating_profit", "ordinary_profit", "net_income", "eps", "operating_profit_forecast"],
+    "bs": ["total_assets", "total_net_assets", "current_assets", "current_liabilities",
+           "quick_assets", "interest_bearing_debt", "equity_ratio", "bps"],
+    "cf": ["operating_cf", "investment_cf", "financing_cf"],
+}
+BASIC_FIELDS = ["company_name", "fiscal_period"]
+
+_PERIOD_LABEL = r"(?:\d{4}年\d{1,2}月期(?:\s*第\s*\d\s*四半期|\s*中間期)?|\d{2}年\d{1,2}月期(?:\s*\d\s*Q)?)"
+_PERIOD_ROW = re.compile(rf"^\s*({_PERIOD_LABEL})\s*(.*)$")
+_NUMBER = re.compile(r"[△▲\-－]?\s?\d[\d,]*(?:\.\d+)?|[－―\-]{1,2}(?=\s|$)")
+_TITLE = re.compile(r"(\d{4}年\d{1,2}月期)\s*(第\s*(\d)\s*四半期|中間期)?\s*(?:決算短信|四半期決算短信|中間決算短信)")
+_COMPANY = re.compile(r"上場会社名\s*(\S+)")
+# Amounts are converted to 百万円, the unit the LLM prompt asks for
+_UNIT_SCALE = {"億円": 100.0, "百万円": 1.0, "千円": 0.001}
+_UNIT = re.compile(r"億円|百万円|千円|円")
+_UNIT_NOTE = re.compile(r"(億円|百万円|千円)未満")
+
+def _to_number(token: str) -> Optional[float]:
+    token = token.replace(" ", "").replace(",", "")
+    if not token or set(token) <= set("－―-"):
+        return None
+    negative = token[0] in "△▲-－"
+    if negative:
+        token = token[1:]
+    try:
+        value = float(token)
+    except ValueError:
+        return None
+    return -value if negative else value
+
+def _first_row(block: str, min_values: int) -> Optional[List[Optional[float]]]:
+    """
+    Returns the numbers of the first period row in a summary table block (the current period).
+    A label on its own line is joined with the following line, which is how pdfminer often splits rows.
+    """
+    lines = [line.strip() for line in block.splitlines() if line.strip()]
+    for i, line in enumerate(lines):
+        m = _PERIOD_ROW.match(line)
+        if not m:
+            continue
+        rest = m.group(2)
+        if not _NUMBER.search(rest) and i + 1 < len(lines):
+            rest = lines[i + 1]
+        values = [_to_number(tok) for tok in _NUMBER.findall(rest)]
+        if len(values) >= min_values:
+            return values
+        return None
+    return None
+
+def _amount_scale(block: str, default: Optional[float]) -> Optional[float]:
+    """
+    Multiplier from the unit line of a table block (the lines above its first period row) to 百万円.
+    Falls back to `default` when the block has no unit line; None for units the parser does not handle.
+    """
+    header = []
+    for line in block.splitlines():
+        if _PERIOD_ROW.match(line.strip()):
+            break
+        header.append(line)
+    m = _UNIT.search("\n".join(header))
+    if not m:
+        return default
+    return _UNIT_SCALE.get(m.group())
+
+def _scaled(value: float, scale: float) -> float:
+    return value if scale == 1.0 else round(value * scale, 6)
+
+def _block(text: str, heading: str, end_headings: Tuple[str, ...] = ()) -> Optional[str]:
+    m = re.search(heading, text)
+    if not m:
+        return None
+    rest = text[m.end():]
+    end = len(rest)
+    for h in end_headings:
+        e = re.search(h, rest)
+        if e:
+            end = min(end, e.start())
+    return rest[:end]
+
+def parse_summary_page(text: str) -> Dict[str, Any]:
+    """
+    Parses the standardized サマリー情報 page of a TDnet 決算短信 (Japanese GAAP layout).
+    Returns a dict in the analyzer's JSON layout holding only the fields that were found;
+    anything ambiguous is left out so the LLM can fill it instead.
+    """
+    result: Dict[str, Any] = {"basic_info": {}, "pl": {}, "bs": {}, "cf": {}}
+    # The summary takes up the first one or two pages
+    summary = "\f".join(text.split("\f")[:2])
+
+    m = _COMPANY.search(summary)
+    if m:
+        result["basic_info"]["company_name"] = m.group(1)
+    m = _TITLE.search(summary)
+    if m:
+        if m.group(3):
+            period = f"{m.group(1)} 第{m.group(3)}四半期"
+        elif m.group(2):
+            period = f"{m.group(1)} 中間期"
+        else:
+            period = f"{m.group(1)} 通期"
+        result["basic_info"]["fiscal_period"] = period
+
+    # The (百万円未満切捨て) note applies to tables that have no unit line of their own
+    m = _UNIT_NOTE.search(summary)
+    default_scale = _UNIT_SCALE[m.group(1)] if m else 1.0
+
+    # (1) 経営成績: amount and YoY % alternate for each of the four columns
+    block = _block(summary, r"経営成績", (r"1株当たり", r"財政状態"))
+    scale = _amount_scale(block, default_scale) if block else None
+    if block and "経常利益" in block and scale is not None:
+        row = _first_row(block, 8)
+        if row:
+            for field, idx in (("net_sales", 0), ("operating_profit", 2), ("ordinary_profit", 4), ("net_income", 6)):
+                if row[idx] is not None:
+                    result["pl"][field] = _scaled(row[idx], scale)
+
+    block = _block(summary, r"1株当たり(四半期|中間)?(当期)?純利益", (r"財政状態",))
+    if block:
+        row = _first_row(block, 1)
+        if row and row[0] is not None:
+            result["pl"]["eps"] = row[0]
+
+    # (2) 財政状態: 総資産, 純資産, 自己資本比率[, 1株当たり純資産]
+    block = _block(summary, r"財政状態", (r"キャッシュ・フロー", r"配当の状況", r"業績予想"))
+    if block:
+        scale = _amount_scale(block, default_scale)
+        row = _first_row(block, 3)
+        if row:
+            # Only the two amounts are scaled; the ratio is % and BPS is per share in 円
+            for field, idx, unit in (("total_assets", 0, scale), ("total_net_assets", 1, scale),
+                                     ("equity_ratio", 2, 1.0), ("bps", 3, 1.0)):
+                if idx < len(row) and row[idx] is not None and unit is not None:
+                    result["bs"][field] = _scaled(row[idx], unit)
+
+    # (3) キャッシュ・フローの状況 (annual filings only)
+    block = _block(summary, r"キャッシュ・フローの状況", (r"配当の状況", r"業績予想"))
+    scale = _amount_scale(block, default_scale) if block else None
+    if scale is not None:
+        row = _first_row(block, 3)
+        if row:
+            for field, idx in (("operating_cf", 0), ("investment_cf", 1), ("financing_cf", 2)):
+                if row[idx] is not None:
+                    result["cf"][field] = _scaled(row[idx], scale)
+
+    # 業績予想: the 通期 row holds amount/% pairs, operating profit is the second pair
+    period = result["basic_info"].get("fiscal_period", "")
+    if "通期" not in period:
+        block = _block(summary, r"業績予想")
+        scale = _amount_scale(block, default_scale) if block else None
+        if scale is not None:
+            m = re.search(r"通期\s*(.*)", block)
+            if m:
+                values = [_to_number(tok) for tok in _NUMBER.findall(m.group(1))]
+                if len(values) >= 3 and values[2] is not None:
+                    result["pl"]["operating_profit_forecast"] = _scaled(values[2], scale)
+
+    return result
+
+def missing_fields(parsed: Dict[str, Any]) -> List[str]:
+    """Fields (as 'section.field') the parser did not fill."""
+    missing = [f"basic_info.{f}" for f in BASIC_FIELDS if f not in parsed.get("basic_info", {})]
+    for section, fields in NUMERIC_FIELDS.items():
+        missing.extend(f"{section}.{f}" for f in fields if f not in parsed.get(section, {}))
+    return missing
+
+def merge_results(parsed: Dict[str, Any], llm: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merges parser output with the LLM response. Parsed values take precedence.
+    The merged dict keeps the analyzer JSON layout expected by map_json_to_model and adds
+    a 'provenance' map of 'section.field' -> 'parser' | 'llm'.
+    """
+    merged: Dict[str, Any] = {}
+    provenance: Dict[str, str] = {}
+    for section in ("basic_info", "pl", "bs", "cf", "qualitative"):
+        values = dict(llm.get(section) or {})
+        for key in values:
+            if values[key] is not None:
+                provenance[f"{section}.{key}"] = "llm"
+        for key, value in (parsed.get(section) or {}).items():
+            values[key] = value
+            provenance[f"{section}.{key}"] = "parser"
+        merged[section] = values
+    merged["provenance"] = provenance
+    return merged
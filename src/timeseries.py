@@ -0,0 +1,147 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from .models import FinancialData
+
+# Flow items are reported as fiscal-year-to-date (累計) figures in Japanese filings
+FLOW_METRICS = ["net_sales", "operating_profit", "eps"]
+
+QUARTER_INDEX = {"1Q": 1, "2Q": 2, "3Q": 3, "4Q": 4, "通期": 4}
+
+Period = Tuple[int, int]  # (fiscal year, quarter number 1-4)
+
+def to_period(year: str, quarter: str) -> Optional[Period]:
+    n = QUARTER_INDEX.get(quarter)
+    if n is None:
+        return None
+    return int(year), n
+
+def previous_quarter(period: Period) -> Period:
+    year, n = period
+    return (year, n - 1) if n > 1 else (year - 1, 4)
+
+def period_label(period: Period) -> str:
+    year, n = period
+    return f"{year} {'通期' if n == 4 else f'{n}Q'}"
+
+@dataclass
+class PeriodMetrics:
+    period: Period
+    # Standalone three-month figures derived from the YTD figures
+    quarter: Dict[str, Optional[float]]
+    ttm: Dict[str, Optional[float]]
+    qoq: Dict[str, Optional[float]]
+    quarter_margin: Optional[float] = None
+    ttm_margin: Optional[float] = None
+
+class QuarterlySeries:
+    """
+    Multi-period history of one company.
+    add() stores a period's YTD figures and recomputes only the derived values that depend on it:
+    the standalone quarter of that period and of the next one, and the TTM figures that use it.
+    """
+
+    def __init__(self):
+        self.ytd: Dict[Period, Dict[str, Optional[float]]] = {}
+        self.standalone: Dict[Period, Dict[str, Optional[float]]] = {}
+        self.ttm: Dict[Period, Dict[str, Optional[float]]] = {}
+
+    def add(self, year: str, quarter: str, data: FinancialData):
+        period = to_period(year, quarter)
+        if period is None:
+            return
+        self.ytd[period] = {m: getattr(data, m) for m in FLOW_METRICS}
+
+        y, n = period
+        affected_quarters = [period] + ([(y, n + 1)] if n < 4 else [(y + 1, 1)])
+        # TTM(Y, n) uses FY(Y-1), YTD(Y, n) and YTD(Y-1, n)
+        affected_ttm = [period, (y + 1, n)]
+        if n == 4:
+            affected_ttm += [(y + 1, m) for m in (1, 2, 3)]
+
+        for p in affected_quarters:
+            if p in self.ytd:
+                self.standalone[p] = self._standalone(p)
+        for p in affected_ttm:
+            if p in self.ytd:
+                self.ttm[p] = self._ttm(p)
+
+    def _standalone(self, period: Period) -> Dict[str, Optional[float]]:
+        y, n = period
+        current = self.ytd[period]
+        if n == 1:
+            return dict(current)
+        prior = self.ytd.get((y, n - 1))
+        return {m: _sub(current[m], prior[m] if prior else None) for m in FLOW_METRICS}
+
+    def _ttm(self, period: Period) -> Dict[str, Optional[float]]:
+        y, n = period
+        current = self.ytd[period]
+        if n == 4:
+            return dict(current)
+        last_fy = self.ytd.get((y - 1, 4))
+        last_ytd = self.ytd.get((y - 1, n))
+        if last_fy is None or last_ytd is None:
+            return {m: None for m in FLOW_METRICS}
+        return {m: _sub(_add(last_fy[m], current[m]), last_ytd[m]) for m in FLOW_METRICS}
+
+    def periods(self) -> List[Period]:
+        return sorted(self.ytd)
+
+    def metrics(self, period: Period) -> PeriodMetrics:
+        quarter = self.standalone.get(period, {m: None for m in FLOW_METRICS})
+        ttm = self.ttm.get(period, {m: None for m in FLOW_METRICS})
+        prev = self.standalone.get(previous_quarter(period), {})
+        qoq = {m: _growth(quarter.get(m), prev.get(m)) for m in FLOW_METRICS}
+        return PeriodMetrics(
+            period=period,
+            quarter=quarter,
+            ttm=ttm,
+            qoq=qoq,
+            quarter_margin=_ratio(quarter.get("operating_profit"), quarter.get("net_sales")),
+            ttm_margin=_ratio(ttm.get("operating_profit"), ttm.get("net_sales")),
+        )
+
+    def cagr(self, metric: str, period: Optional[Period] = None, years: Optional[int] = None) -> Optional[Tuple[int, float]]:
+        """
+        Compound annual growth of a TTM metric up to period (latest by default), as (years, rate %).
+        Uses the longest span available unless years is given. Undefined for non-positive values.
+        """
+        periods = self.periods()
+        if not periods:
+            return None
+        end = period or periods[-1]
+        end_value = self.ttm.get(end, {}).get(metric)
+        if not end_value or end_value <= 0:
+            return None
+
+        spans = [years] if years else range(end[0] - periods[0][0], 0, -1)
+        for k in spans:
+            start_value = self.ttm.get((end[0] - k, end[1]), {}).get(metric)
+            if start_value and start_value > 0:
+                return k, ((end_value / start_value) ** (1 / k) - 1) * 100
+        return None
+
+    def margin_trend(self, last_n: int = 8) -> Optional[float]:
+        """Least-squares slope of the TTM operating margin over the last_n periods, in %pt per quarter."""
+        points = [(i, m) for i, m in enumerate(self.metrics(p).ttm_margin for p in self.periods()[-last_n:])
+                  if m is not None]
+        if len(points) < 2:
+            return None
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        var = sum((x - mean_x) ** 2 for x, _ in points)
+        return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+def _add(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    return a + b if a is not None and b is not None else None
+
+def _sub(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    return a - b if a is not None and b is not None else None
+
+def _ratio(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    return (a / b) * 100 if a is not None and b else None
+
+def _growth(current: Optional[float], prior: Optional[float]) -> Optional[float]:
+    if current is None or not prior or prior <= 0:
+        return None
+    return ((current - prior) / prior) * 100
@@ -0,0 +1,117 @@
+import numpy as np
+from dataclasses import fields
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Sequence
+from .models import FinancialData, EvaluationResult, AnalysisReport
+from .rule_engine import Rule, OPS
+
+# Optional[float] fields of FinancialData (the text fields default to "")
+NUMERIC_FIELDS = [f.name for f in fields(FinancialData) if f.default is None]
+
+def to_columns(records: Sequence[Optional[FinancialData]]) -> Dict[str, np.ndarray]:
+    """
+    Lays records out as one float64 array per numeric field. Missing values and missing
+    records become NaN.
+    """
+    columns = {}
+    for name in NUMERIC_FIELDS:
+        # dtype=float turns None into NaN
+        columns[name] = np.array([getattr(r, name) if r is not None else None for r in records], dtype=float)
+    return columns
+
+def _truthy(col: np.ndarray) -> np.ndarray:
+    """Mirrors `if value:` in the scalar path: None (NaN here) and 0 are treated as missing."""
+    return ~np.isnan(col) & (col != 0)
+
+def compute_metrics(rules: Sequence[Rule], cur: Dict[str, np.ndarray], last: Dict[str, np.ndarray],
+                    prices: np.ndarray,
+                    quarters: Sequence[Optional[str]]) -> Dict[str, np.ndarray]:
+    """
+    Runs the compiled rule table over all rows at once.
+    Each rule yields '<key>' values, a '<key>.valid' mask and a '<key>.label' array;
+    PER/PBR/PEG are added as 'per', 'pbr' and 'peg' with their own masks.
+    """
+    n = len(prices)
+    cur_ns, last_ns = SimpleNamespace(**cur), SimpleNamespace(**last)
+    quarter_col = np.array(list(quarters), dtype=object)
+    m: Dict[str, np.ndarray] = {}
+
+    for rule in rules:
+        if rule.keywords is not None:
+            continue  # text rules run per row in build_reports
+        valid = np.ones(n, dtype=bool)
+        if rule.quarter is not None:
+            valid &= quarter_col == rule.quarter
+        for side, field, allow_zero in rule.requires:
+            col = cur[field] if side == "cur" else last[field]
+            valid &= ~np.isnan(col) if allow_zero else _truthy(col)
+        with np.errstate(all='ignore'):
+            values = np.where(valid, rule.compute(cur_ns, last_ns), np.nan)
+        m[rule.key] = values
+        m[f"{rule.key}.valid"] = valid
+        # Rows failing every step (including NaN) fall through to the default, as in Rule.assess
+        m[f"{rule.key}.label"] = np.select([OPS[op](values, t) for op, t, _ in rule.steps],
+                                           [label for _, _, label in rule.steps], default=rule.default)
+
+    # Valuation
+    with np.errstate(all='ignore'):
+        eps_valid = _truthy(cur['eps'])
+        m['per'] = np.where(eps_valid, prices / cur['eps'], np.nan)
+        m['per.valid'] = eps_valid
+        bps_valid = _truthy(cur['bps'])
+        m['pbr'] = np.where(bps_valid, prices / cur['bps'], np.nan)
+        m['pbr.valid'] = bps_valid
+        last_eps_valid = _truthy(last['eps']) & (np.nan_to_num(last['eps']) > 0)
+        eps_growth = np.where(eps_valid & last_eps_valid, ((cur['eps'] - last['eps']) / last['eps']) * 100, np.nan)
+        peg_valid = eps_valid & last_eps_valid & (np.nan_to_num(eps_growth) > 0)
+        m['peg'] = np.where(peg_valid, m['per'] / eps_growth, np.nan)
+        m['peg.valid'] = peg_valid
+    return m
+
+def build_reports(m: Dict[str, np.ndarray], rules: Sequence[Rule], currents: Sequence[FinancialData],
+                  lasts: Sequence[Optional[FinancialData]], prices: Sequence[float],
+                  quarters: Sequence[Optional[str]]) -> List[AnalysisReport]:
+    """Turns computed metric arrays into AnalysisReports identical to Evaluator.evaluate."""
+    # Converting once to Python lists is much faster than indexing numpy scalars per row
+    col = {k: v.tolist() for k, v in m.items()}
+    reports = []
+    for i, current in enumerate(currents):
+        evaluations = []
+        for rule in rules:
+            if rule.keywords is not None:
+                result = rule.evaluate(current, lasts[i], quarters[i])
+                if result is not None:
+                    evaluations.append(result)
+                continue
+            if not col[f"{rule.key}.valid"][i]:
+                continue
+            evaluations.append(EvaluationResult(
+                metric_name=rule.metric_name,
+                value=rule.fmt.format(col[rule.key][i]),
+                assessment=col[f"{rule.key}.label"][i],
+                details=rule.details(current, lasts[i]) if rule.details else ""
+            ))
+
+        vals = {}
+        if col['per.valid'][i]:
+            vals['PER'] = f"{col['per'][i]:.2f}倍"
+        if col['pbr.valid'][i]:
+            vals['PBR'] = f"{col['pbr'][i]:.2f}倍"
+        if col['peg.valid'][i]:
+            vals['PEG'] = f"{col['peg'][i]:.2f}倍"
+
+        reports.append(AnalysisReport(
+            company_name=current.company_name,
+            fiscal_period=current.fiscal_period,
+            stock_price=prices[i],
+            evaluations=evaluations,
+            qualitative_analysis={
+                "progress_comment": current.progress_comment,
+                "future_strategy": current.future_strategy,
+                "risk_factors": current.risk_factors,
+                "management_attitude": current.management_attitude,
+                "cost_efficiency": current.cost_efficiency_comment
+            },
+            valuations=vals
+        ))
+    return reports
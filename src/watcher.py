@@ -0,0 +1,337 @@
+import os
+import time
+import functools
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from .batch import load_universe
+from .parallel_extract import extract_text_guarded
+from .extraction_cache import ExtractionCache
+from .store import FinancialStore
+from .file_index import FileIndex
+from .timeseries import to_period
+
+STAGES = ["queue", "extract", "analyze", "evaluate", "report", "total"]
+
+JobKey = Tuple[str, str, str]  # (code, year, quarter)
+
+@dataclass
+class WatchJob:
+    code: str
+    year: str
+    quarter: str
+    path: str
+    # When the filing was first seen; kept when a pending job is superseded so latency covers the whole wait
+    detected_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def key(self) -> JobKey:
+        return self.code, self.year, self.quarter
+
+class WorkQueue:
+    """
+    Bounded FIFO of WatchJobs deduplicated by (code, year, quarter).
+    Putting a job whose key is already pending replaces its path in place instead of adding a second entry.
+    put() blocks while the queue is full, which stops the watcher from scanning ahead of the workers.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._pending: "OrderedDict[JobKey, WatchJob]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.deduplicated = 0
+
+    def put(self, job: WatchJob, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            pending = self._pending.get(job.key)
+            if pending is not None:
+                pending.path = job.path
+                self.deduplicated += 1
+                return True
+            if not self._cond.wait_for(lambda: len(self._pending) < self.maxsize or self._closed, timeout):
+                return False
+            if self._closed:
+                return False
+            self._pending[job.key] = job
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[WatchJob]:
+        """Next job, or None when the queue is closed and drained (or on timeout)."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._pending or self._closed, timeout):
+                return None
+            if not self._pending:
+                return None
+            _, job = self._pending.popitem(last=False)
+            self._cond.notify_all()
+            return job
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+class StageMetrics:
+    """
+    Per-stage latency samples (seconds) and queue depth.
+    Only the most recent `window` samples per stage are kept for the percentiles.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {s: [] for s in STAGES}
+        self.processed = 0
+        self.failed = 0
+        self.over_target = 0
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            samples = self._samples.setdefault(stage, [])
+            samples.append(seconds)
+            if len(samples) > self.window:
+                del samples[0]
+
+    def snapshot(self, queue_depth: int = 0) -> Dict[str, object]:
+        with self._lock:
+            stages = {}
+            for stage, samples in self._samples.items():
+                if not samples:
+                    continue
+                ordered = sorted(samples)
+                stages[stage] = {
+                    "count": len(ordered),
+                    "p50": ordered[len(ordered) // 2],
+                    "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                    "max": ordered[-1],
+                }
+            return {"queue_depth": queue_depth, "processed": self.processed, "failed": self.failed,
+                    "over_target": self.over_target, "stages": stages}
+
+def _open_inotify(input_dir: str):
+    """An inotify_simple.INotify watching input_dir, or None when inotify is unavailable."""
+    try:
+        from inotify_simple import INotify, flags
+    except ImportError:
+        return None
+    try:
+        inotify = INotify()
+        inotify.add_watch(input_dir, flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.DELETE)
+    except OSError:
+        return None
+    return inotify
+
+class FilingWatcher:
+    """
+    Long-running watch mode over the input directory.
+    A watcher thread waits for inotify events (or polls every poll_interval seconds when inotify_simple
+    is not installed), diffs the FileIndex, and queues new or rewritten filings. Worker threads extract
+    text in a shared process pool, analyze it, store the result and regenerate the report of that
+    company only. Prices come from a code,price CSV that is re-read when it changes.
+    """
+
+    def __init__(self, input_dir: str, analyzer, evaluator, reporter, prices_path: str,
+                 extraction_cache: Optional[ExtractionCache] = None, store: Optional[FinancialStore] = None,
+                 file_index: Optional[FileIndex] = None, workers: int = 4, extract_workers: Optional[int] = None,
+                 queue_size: int = 256, poll_interval: float = 2.0, sections_only: bool = True,
+                 fast_path: bool = True, latency_target: Optional[float] = None,
+                 metrics_interval: float = 60.0, extract_options: Optional[Dict[str, Any]] = None):
+        self.input_dir = input_dir
+        self.analyzer = analyzer
+        self.evaluator = evaluator
+        self.reporter = reporter
+        self.prices_path = prices_path
+        self.extraction_cache = extraction_cache
+        self.store = store
+        self.file_index = file_index or FileIndex(input_dir)
+        self.workers = workers
+        self.extract_workers = extract_workers
+        self.poll_interval = poll_interval
+        self.sections_only = sections_only
+        self.extract_options = extract_options or {}
+        self.fast_path = fast_path
+        self.latency_target = latency_target
+        self.metrics_interval = metrics_interval
+        self.queue = WorkQueue(queue_size)
+        self.metrics = StageMetrics()
+        self._stop = threading.Event()
+        self._scanned = False
+        self._prices: Dict[str, float] = {}
+        self._prices_mtime_ns: Optional[int] = None
+        self._prices_lock = threading.Lock()
+
+    def price(self, code: str) -> Optional[float]:
+        with self._prices_lock:
+            try:
+                mtime_ns = os.stat(self.prices_path).st_mtime_ns
+            except FileNotFoundError:
+                return None
+            if mtime_ns != self._prices_mtime_ns:
+                self._prices = dict(load_universe(self.prices_path))
+                self._prices_mtime_ns = mtime_ns
+            return self._prices.get(code)
+
+    def scan(self) -> List[WatchJob]:
+        """
+        Refreshes the index and returns jobs for filings that are new or changed since the last scan.
+        The first scan diffs against the index as persisted before this process started, and also
+        checks the store, so the latest filing of each code is not skipped when it arrived (or was
+        queued but not processed) while the daemon was down. Older periods are left to backfill
+        rather than analyzed one by one here.
+        """
+        first = not self._scanned
+        before = self.file_index.loaded_entries if first else dict(self.file_index.entries)
+        self.file_index.refresh(force=True)
+        self._scanned = True
+        jobs = []
+        skipped = 0
+        for filename, entry in self.file_index.entries.items():
+            code, year, quarter = entry[:3]
+            changed = before.get(filename) != entry
+            if first and not changed and self.store is not None:
+                changed = self.store.get(code, year, quarter) is None
+            if first and changed and to_period(year, quarter) != self._latest_period(code):
+                skipped += 1
+                continue
+            if changed:
+                jobs.append(WatchJob(code, year, quarter, os.path.join(self.input_dir, filename)))
+        if skipped:
+            print(f"起動前の未解析ファイル {skipped} 件は最新期ではないためスキップしました (backfill で解析できます)。")
+        return jobs
+
+    def _latest_period(self, code: str) -> Optional[Tuple[int, int]]:
+        periods = [to_period(year, quarter) for year, quarters in self.file_index.lookup(code).items()
+                   for quarter in quarters]
+        return max((p for p in periods if p is not None), default=None)
+
+    def _watch(self):
+        inotify = _open_inotify(self.input_dir)
+        print("監視モード: " + ("inotify" if inotify else f"ポーリング ({self.poll_interval}秒間隔)"))
+        try:
+            while not self._stop.is_set():
+                # The first scan runs right away to pick up filings that arrived while stopped
+                if self._scanned and inotify is not None:
+                    # read_delay batches the burst of events produced by one copy
+                    if not inotify.read(timeout=int(self.poll_interval * 1000), read_delay=100):
+                        continue
+                elif self._scanned:
+                    self._stop.wait(self.poll_interval)
+                for job in self.scan():
+                    while not self.queue.put(job, timeout=1.0):
+                        if self._stop.is_set():
+                            return
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def _work(self, extract_pool: ProcessPoolExecutor):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            try:
+                self.process(job, extract_pool)
+                self.metrics.increment("processed")
+            except Exception as e:
+                self.metrics.increment("failed")
+                print(f"  {job.code} {job.year} {job.quarter}: 処理に失敗しました ({e})")
+
+    def process(self, job: WatchJob, extract_pool: Optional[ProcessPoolExecutor] = None):
+        started = time.monotonic()
+        self.metrics.observe("queue", started - job.detected_at)
+
+        # Same quarter of the prior year, from the store when it was analyzed before
+        prev_year = str(int(job.year) - 1)
+        last_year_data = self.store.get(job.code, prev_year, job.quarter) if self.store else None
+        prev_entry = self.file_index.stat(job.code, prev_year, job.quarter)
+        prev_path = prev_entry[0] if prev_entry and last_year_data is None else None
+
+        t = time.monotonic()
+        extract = functools.partial(extract_text_guarded, cache=self.extraction_cache,
+                                    sections_only=self.sections_only, **self.extract_options)
+        if extract_pool is not None:
+            current_text = extract_pool.submit(extract, job.path).result()
+            prev_text = extract_pool.submit(extract, prev_path).result() if prev_path else ""
+        else:
+            current_text = extract(job.path)
+            prev_text = extract(prev_path) if prev_path else ""
+        self.metrics.observe("extract", time.monotonic() - t)
+        if not current_text:
+            raise ValueError("no text extracted")
+
+        t = time.monotonic()
+        current_json = self.analyzer.analyze(current_text, fast_path=self.fast_path)
+        prev_json = self.analyzer.analyze(prev_text, fast_path=self.fast_path) if prev_text else None
+        self.metrics.observe("analyze", time.monotonic() - t)
+
+        t = time.monotonic()
+        signals = self.evaluator.scan(current_text)
+        signals.attach(current_json)
+        current_data = self.evaluator.map_json_to_model(current_json)
+        if prev_json:
+            last_year_data = self.evaluator.map_json_to_model(prev_json)
+        if self.store is not None:
+            records = [(job.code, job.year, job.quarter, current_data, current_json, job.path)]
+            if prev_json:
+                records.append((job.code, prev_year, job.quarter, last_year_data, prev_json, prev_path))
+            self.store.put_many(records)
+
+        price = self.price(job.code)
+        if price is None:
+            print(f"  {job.code} {job.year} {job.quarter}: 株価が未登録のためデータ保存のみ行いました。")
+            return
+        report = self.evaluator.evaluate(current_data, last_year_data, price, signals)
+        self.metrics.observe("evaluate", time.monotonic() - t)
+
+        t = time.monotonic()
+        self.reporter.submit(job.code, job.year, job.quarter, report)
+        now = time.monotonic()
+        self.metrics.observe("report", now - t)
+
+        total = now - job.detected_at
+        self.metrics.observe("total", total)
+        if self.latency_target is not None and total > self.latency_target:
+            self.metrics.increment("over_target")
+            print(f"  {job.code} {job.year} {job.quarter}: 目標レイテンシ超過 ({total:.1f}s > {self.latency_target:.1f}s)")
+
+    def print_metrics(self):
+        snap = self.metrics.snapshot(len(self.queue))
+        parts = [f"{stage} p50 {s['p50']:.2f}s / p95 {s['p95']:.2f}s" for stage, s in snap["stages"].items()]
+        print(f"[metrics] queue {snap['queue_depth']} | processed {snap['processed']} | failed {snap['failed']}"
+              + (" | " + ", ".join(parts) if parts else ""))
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        """Blocks until stop() is called or the process is interrupted."""
+        with ProcessPoolExecutor(max_workers=self.extract_workers) as extract_pool:
+            workers = [threading.Thread(target=self._work, args=(extract_pool,), daemon=True)
+                       for _ in range(self.workers)]
+            for w in workers:
+                w.start()
+            watcher = threading.Thread(target=self._watch, daemon=True)
+            watcher.start()
+            try:
+                while not self._stop.wait(self.metrics_interval):
+                    self.print_metrics()
+            except KeyboardInterrupt:
+                print("\n監視を停止します...")
+                self.stop()
+            watcher.join()
+            self.queue.close()
+            for w in workers:
+                w.join()
+        self.print_metrics()
@@ -0,0 +1,112 @@
+import json
+import threading
+import importlib.util
+import unittest
+from types import SimpleNamespace
+from src.ai_analyzer import (ANALYSIS_PROMPT, QUALITATIVE_PROMPT, ALL_FIELDS, narrow_prompt, numeric_response_format,
+                             merge_split)
+from src.evaluator import Evaluator
+
+HAS_OPENAI = importlib.util.find_spec("openai") is not None
+
+class FakeCompletions:
+    """Answers numeric (json_schema) requests with figures and json_object requests with qualitative text."""
+
+    def __init__(self):
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def create(self, model, messages, response_format):
+        with self.lock:
+            self.requests.append({"model": model, "prompt": messages[1]["content"], "response_format": response_format})
+        if response_format["type"] == "json_schema":
+            schema = response_format["json_schema"]["schema"]["properties"]
+            content = {section: {name: (1.0 if section != "basic_info" else "テスト") for name in spec["properties"]}
+                       for section, spec in schema.items()}
+        else:
+            content = {"qualitative": {"progress_comment": "順調", "future_strategy": "拡大"}}
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(content)))])
+
+class TestSplitPrompts(unittest.TestCase):
+    def test_narrow_prompt_without_qualitative(self):
+        prompt = narrow_prompt(["pl.eps", "bs.bps"], qualitative=False)
+        self.assertIn("- eps:", prompt)
+        self.assertIn("- bps:", prompt)
+        self.assertNotIn("progress_comment", prompt)
+        self.assertNotIn("net_sales", prompt)
+        self.assertIn("コードブロック", prompt)
+        # The strict json_schema request must not be told to wrap its reply in a code block
+        schema_prompt = narrow_prompt(["pl.eps"], qualitative=False, schema=True)
+        self.assertNotIn("コードブロック", schema_prompt)
+        self.assertIn("必ず有効なJSON形式で出力してください。", schema_prompt)
+
+    def test_qualitative_prompt_has_no_numeric_fields(self):
+        self.assertIn("progress_comment", QUALITATIVE_PROMPT)
+        self.assertNotIn("net_sales", QUALITATIVE_PROMPT)
+        self.assertNotIn("company_name", QUALITATIVE_PROMPT)
+        self.assertEqual(narrow_prompt(ALL_FIELDS), ANALYSIS_PROMPT)
+
+    def test_numeric_schema_is_strict_and_nullable(self):
+        fmt = numeric_response_format(["basic_info.company_name", "pl.eps", "pl.net_sales"])
+        schema = fmt["json_schema"]["schema"]
+        self.assertTrue(fmt["json_schema"]["strict"])
+        self.assertEqual(schema["required"], ["basic_info", "pl"])
+        self.assertEqual(schema["properties"]["pl"]["required"], ["eps", "net_sales"])
+        self.assertEqual(schema["properties"]["pl"]["properties"]["eps"]["type"], ["number", "null"])
+        self.assertEqual(schema["properties"]["basic_info"]["properties"]["company_name"]["type"], ["string", "null"])
+        self.assertFalse(schema["properties"]["pl"]["additionalProperties"])
+
+    def test_merge_split_maps_to_model(self):
+        parsed = {"basic_info": {"company_name": "テスト"}, "pl": {"net_sales": 100.0}}
+        numeric = {"pl": {"eps": 5.0}, "bs": {"bps": 50.0}, "qualitative": {"progress_comment": "ignored"}}
+        merged = merge_split(parsed, numeric, {"qualitative": {"risk_factors": "為替"}})
+        data = Evaluator("config/criteria.yaml").map_json_to_model(merged)
+        self.assertEqual((data.net_sales, data.eps, data.bps), (100.0, 5.0, 50.0))
+        self.assertEqual(data.risk_factors, "為替")
+        self.assertEqual(data.progress_comment, "")
+        self.assertEqual(merged["provenance"]["pl.net_sales"], "parser")
+        self.assertEqual(merged["provenance"]["bs.bps"], "llm")
+
+@unittest.skipUnless(HAS_OPENAI, "openai is not installed")
+class TestAnalyzeSplit(unittest.TestCase):
+    def make_analyzer(self, **kwargs):
+        from src.ai_analyzer import AIAnalyzer
+
+        analyzer = AIAnalyzer(api_key="test", **kwargs)
+        completions = FakeCompletions()
+        analyzer.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        return analyzer, completions
+
+    def test_routes_numeric_and_qualitative_to_separate_models(self):
+        analyzer, completions = self.make_analyzer(split=True, numeric_model="gpt-4o-mini")
+        result = analyzer.analyze_with_fast_path("売上高 1,000 百万円")
+
+        models = sorted((r["model"], r["response_format"]["type"]) for r in completions.requests)
+        self.assertEqual(models, [("gpt-4o", "json_object"), ("gpt-4o-mini", "json_schema")])
+        numeric = next(r for r in completions.requests if r["model"] == "gpt-4o-mini")
+        self.assertNotIn("progress_comment", numeric["prompt"])
+        self.assertNotIn("```json", numeric["prompt"])
+        self.assertEqual(result["pl"]["eps"], 1.0)
+        self.assertEqual(result["qualitative"]["progress_comment"], "順調")
+
+    def test_numeric_only_skips_qualitative_request(self):
+        analyzer, completions = self.make_analyzer(qualitative=False)
+        result = analyzer.analyze_with_fast_path("売上高 1,000 百万円")
+
+        self.assertEqual(len(completions.requests), 1)
+        self.assertEqual(completions.requests[0]["model"], "gpt-4o-mini")
+        self.assertEqual(result["qualitative"], {})
+        self.assertEqual(Evaluator("config/criteria.yaml").map_json_to_model(result).progress_comment, "")
+
+    def test_llm_only_keeps_the_split(self):
+        analyzer, completions = self.make_analyzer(qualitative=False)
+        analyzer.analyze("売上高 1,000 百万円", fast_path=False)
+
+        request, = completions.requests
+        self.assertEqual((request["model"], request["response_format"]["type"]), ("gpt-4o-mini", "json_schema"))
+        self.assertNotIn("progress_comment", request["prompt"])
+        schema = request["response_format"]["json_schema"]["schema"]
+        self.assertEqual(sum(len(s["required"]) for s in schema["properties"].values()), len(ALL_FIELDS))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import json
+import time
+import asyncio
+import threading
+import importlib.util
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.rate_limiter import TokenBucket, RateLimiter, backoff_delay
+
+HAS_OPENAI = importlib.util.find_spec("openai") is not None
+
+class StubCompletionsHandler(BaseHTTPRequestHandler):
+    """Mimics POST /v1/chat/completions; the first `fail_first` requests get a 429."""
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests.append(body)
+            fail = len(server.requests) <= server.fail_first
+
+        if fail:
+            payload = {"error": {"message": "rate limited", "type": "rate_limit_error"}}
+            self._send(429, payload, {"retry-after": "0"})
+            return
+
+        content = json.dumps({"basic_info": {"company_name": "テスト株式会社"}, "pl": {"net_sales": 1000}})
+        self._send(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        })
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestRateLimiter(unittest.TestCase):
+    def test_bucket_throttles_after_capacity(self):
+        async def run():
+            bucket = TokenBucket(rate_per_minute=600, capacity=2)  # 10 per second
+            start = time.monotonic()
+            for _ in range(3):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.08)
+
+    def test_unbounded_limiter_does_not_wait(self):
+        async def run():
+            limiter = RateLimiter()
+            start = time.monotonic()
+            for _ in range(100):
+                await limiter.acquire(10000)
+            return time.monotonic() - start
+
+        self.assertLess(asyncio.run(run()), 0.05)
+
+    def test_backoff_is_capped(self):
+        for attempt in range(10):
+            delay = backoff_delay(attempt, base=1.0, max_delay=8.0)
+            self.assertGreaterEqual(delay, 0.0)
+            self.assertLessEqual(delay, min(8.0, 2 ** attempt))
+
+@unittest.skipUnless(HAS_OPENAI, "openai is not installed")
+class TestAsyncAIAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubCompletionsHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.fail_first = 1
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_concurrent_analysis_with_retry(self):
+        from src.async_analyzer import AsyncAIAnalyzer
+
+        async def run():
+            analyzer = AsyncAIAnalyzer(api_key="test", base_url=self.base_url, max_concurrency=2)
+            try:
+                return await asyncio.gather(analyzer.analyze_text("今期"), analyzer.analyze_text("前期"))
+            finally:
+                await analyzer.aclose()
+
+        results = asyncio.run(run())
+        self.assertEqual([r["pl"]["net_sales"] for r in results], [1000, 1000])
+        # One 429 followed by a retry
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_tracer_records_usage_and_retries(self):
+        from src.async_analyzer import AsyncAIAnalyzer
+        from src.instrumentation import Tracer, SpanCollector, set_tracer
+
+        async def run():
+            analyzer = AsyncAIAnalyzer(api_key="test", base_url=self.base_url)
+            try:
+                return await analyzer.analyze_text("今期")
+            finally:
+                await analyzer.aclose()
+
+        collector = SpanCollector()
+        tracer = Tracer([collector])
+        previous = set_tracer(tracer)
+        try:
+            asyncio.run(run())
+        finally:
+            set_tracer(previous)
+
+        self.assertEqual(tracer.counters["llm.retry"], 1)
+        self.assertEqual(tracer.llm_usage["gpt-4o"]["prompt_tokens"], 10)
+        self.assertEqual(tracer.llm_usage["gpt-4o"]["completion_tokens"], 5)
+        llm_span, = [s for s in collector.spans if s.name == "llm"]
+        self.assertAlmostEqual(llm_span.attrs["cost_usd"], (10 * 2.50 + 5 * 10.00) / 1_000_000)
+
+    def test_split_sends_numeric_and_qualitative_requests(self):
+        from src.async_analyzer import AsyncAIAnalyzer
+
+        self.server.fail_first = 0
+
+        async def run():
+            analyzer = AsyncAIAnalyzer(api_key="test", base_url=self.base_url, split=True, numeric_model="gpt-4o-mini")
+            try:
+                return await analyzer.analyze_with_fast_path("今期")
+            finally:
+                await analyzer.aclose()
+
+        result = asyncio.run(run())
+        formats = sorted((r["model"], r["response_format"]["type"]) for r in self.server.requests)
+        self.assertEqual(formats, [("gpt-4o", "json_object"), ("gpt-4o-mini", "json_schema")])
+        self.assertEqual(result["pl"]["net_sales"], 1000)
+
+if __name__ == '__main__':
+    unittest.main()
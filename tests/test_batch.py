@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from benchmarks.synthetic import write_pdf, filing_pages
+from benchmarks.fake_analyzer import FakeAnalyzer
+from src.batch import BatchScreener, load_universe
+from src.evaluator import Evaluator
+from src.store import FinancialStore
+
+class FakeReporter:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, code, year, quarter, report):
+        self.submitted.append((code, year, quarter, report))
+
+class TestLoadUniverse(unittest.TestCase):
+    def test_parses_rows_and_skips_invalid_ones(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "universe.csv")
+            with open(path, 'w', encoding='utf-8-sig') as f:
+                f.write("code,price\n8035,24000\n\n# comment\n6758, 3000.5\n130A,abc\n9999\n7203,2500\n")
+            with mock.patch("builtins.print") as printed:
+                universe = load_universe(path)
+        self.assertEqual(universe, [("8035", 24000.0), ("6758", 3000.5), ("7203", 2500.0)])
+        self.assertEqual(printed.call_count, 2)
+
+class TestBatchScreener(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp.name, "input")
+        os.makedirs(self.input_dir)
+        self.store = FinancialStore(os.path.join(self.tmp.name, "store.sqlite3"))
+        self.analyzer = FakeAnalyzer()
+        self.reporter = FakeReporter()
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def _pdf(self, code, year, quarter):
+        write_pdf(os.path.join(self.input_dir, f"{code}_{year}_{quarter}.pdf"), filing_pages(code, year, quarter, 4))
+
+    def run_screener(self, universe, **kwargs):
+        screener = BatchScreener(self.input_dir, self.analyzer, Evaluator("config/criteria.yaml"), self.reporter,
+                                 extract_workers=2, llm_workers=2, store=self.store, **kwargs)
+        with mock.patch("builtins.print"):
+            return {r.stock_code: r for r in screener.run(universe)}
+
+    def test_screens_universe_and_records_failures(self):
+        self._pdf("1111", 2024, "1Q")
+        self._pdf("1111", 2025, "1Q")
+        # No prior-year filing: still reported, only the current period is analyzed
+        self._pdf("2222", 2025, "2Q")
+        with open(os.path.join(self.input_dir, "3333_2025_1Q.pdf"), 'wb') as f:
+            f.write(b"not a pdf")
+
+        results = self.run_screener([("1111", 1000.0), ("2222", 500.0), ("3333", 800.0), ("4444", 100.0)])
+
+        self.assertEqual(results["1111"].error, "")
+        self.assertEqual((results["1111"].year, results["1111"].quarter), ("2025", "1Q"))
+        self.assertIsNotNone(self.store.get("1111", "2024", "1Q"))
+        self.assertEqual(results["2222"].error, "")
+        self.assertIsNotNone(results["2222"].report)
+        self.assertEqual(self.store.periods("2222"), [("2025", "2Q")])
+        self.assertEqual(results["3333"].error, "no text extracted")
+        self.assertIsNone(results["3333"].report)
+        self.assertEqual(results["4444"].error, "no PDF found")
+        self.assertEqual(sorted(code for code, *_ in self.reporter.submitted), ["1111", "2222"])
+        self.assertEqual(self.analyzer.calls, 3)
+
+    def test_prior_year_from_store_is_not_reanalyzed(self):
+        self._pdf("1111", 2024, "1Q")
+        self._pdf("1111", 2025, "1Q")
+        self.run_screener([("1111", 1000.0)])
+        self.assertEqual(self.analyzer.calls, 2)
+
+        # A new price run re-analyzes only the current period (the prior year is in the store)
+        self.store.conn.execute("DELETE FROM filings WHERE year = '2025'")
+        self.store.conn.commit()
+        results = self.run_screener([("1111", 1200.0)])
+        self.assertEqual(self.analyzer.calls, 3)
+        self.assertEqual(results["1111"].report.stock_price, 1200.0)
+
+    def test_page_workers_extract_with_a_timeout(self):
+        self._pdf("1111", 2025, "1Q")
+        with open(os.path.join(self.input_dir, "3333_2025_1Q.pdf"), 'wb') as f:
+            f.write(b"not a pdf")
+        results = self.run_screener([("1111", 1000.0), ("3333", 800.0)],
+                                    extract_options={"page_workers": 2, "page_timeout": 30.0})
+        self.assertEqual(results["1111"].error, "")
+        self.assertEqual(results["3333"].error, "no text extracted")
+
+if __name__ == '__main__':
+    unittest.main()
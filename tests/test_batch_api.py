@@ -0,0 +1,131 @@
+import os
+import json
+import tempfile
+import unittest
+from types import SimpleNamespace
+from benchmarks.synthetic import write_pdf, filing_pages
+from src.batch_api import BatchSubmitter, ENDPOINT
+from src.evaluator import Evaluator
+from src.store import FinancialStore
+from src.response_cache import ResponseCache, SQLiteBackend
+
+class FakeBatchClient:
+    """
+    Stand-in for the files/batches part of the OpenAI client. A batch reports in_progress on the
+    first retrieve and completed on the next, with canned responses for every request line;
+    custom_ids in `fail` get a 500 in the error file instead.
+    """
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.contents = {}
+        self.batches_by_id = {}
+        self.uploads = 0
+        self.files = SimpleNamespace(create=self._create_file, content=self._content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve)
+
+    def _create_file(self, file, purpose):
+        self.uploads += 1
+        file_id = f"file-{len(self.contents)}"
+        self.contents[file_id] = file.read().decode('utf-8')
+        return SimpleNamespace(id=file_id)
+
+    def _content(self, file_id):
+        return SimpleNamespace(text=self.contents[file_id])
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        assert endpoint == ENDPOINT
+        batch_id = f"batch-{len(self.batches_by_id)}"
+        self.batches_by_id[batch_id] = {"input": input_file_id, "polls": 0}
+        return SimpleNamespace(id=batch_id, status="validating")
+
+    def _retrieve(self, batch_id):
+        batch = self.batches_by_id[batch_id]
+        batch["polls"] += 1
+        if batch["polls"] < 2:
+            return SimpleNamespace(id=batch_id, status="in_progress", output_file_id=None, error_file_id=None)
+        output, errors = [], []
+        for line in self.contents[batch["input"]].splitlines():
+            request = json.loads(line)
+            assert request["url"] == ENDPOINT and request["body"]["messages"]
+            rid = request["custom_id"]
+            if rid in self.fail:
+                errors.append({"custom_id": rid, "response": {"status_code": 500, "body": {"error": "server"}}, "error": None})
+                continue
+            cf = 120.0 if "_2025_" in rid else 100.0
+            content = json.dumps({"pl": {"net_sales": 1.0}, "cf": {"operating_cf": cf},
+                                  "qualitative": {"progress_comment": f"{rid} 順調"}}, ensure_ascii=False)
+            output.append({"custom_id": rid, "error": None, "response": {"status_code": 200, "body": {
+                "choices": [{"message": {"role": "assistant", "content": content}}]}}})
+        ids = {}
+        for kind, lines in (("output", output), ("error", errors)):
+            if lines:
+                ids[kind] = f"file-{len(self.contents)}"
+                self.contents[ids[kind]] = "\n".join(json.dumps(l, ensure_ascii=False) for l in lines)
+        return SimpleNamespace(id=batch_id, status="completed", output_file_id=ids.get("output"),
+                               error_file_id=ids.get("error"))
+
+class TestBatchSubmitter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.jobs = []
+        for year in (2024, 2025):
+            path = os.path.join(self.tmp.name, f"1234_{year}_1Q.pdf")
+            write_pdf(path, filing_pages("1234", year, "1Q", 4))
+            self.jobs.append(("1234", str(year), "1Q", path))
+        self.store = FinancialStore(os.path.join(self.tmp.name, "store.sqlite3"))
+        self.cache = ResponseCache(SQLiteBackend(os.path.join(self.tmp.name, "responses.sqlite3")))
+        self.evaluator = Evaluator("config/criteria.yaml")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def submitter(self, client):
+        return BatchSubmitter(client, self.evaluator, self.store, state_path=os.path.join(self.tmp.name, "state.json"),
+                              work_dir=os.path.join(self.tmp.name, "batch"), cache=self.cache)
+
+    def test_resumes_after_interruption_and_stores_results(self):
+        client = FakeBatchClient()
+        self.assertFalse(self.submitter(client).run(self.jobs, wait=False))
+        self.assertIsNone(self.store.get("1234", "2025", "1Q"))
+
+        # A new process picks the batch up from the state file without uploading again
+        self.assertTrue(self.submitter(client).run(self.jobs, wait=False))
+        self.assertEqual(client.uploads, 1)
+        data = self.store.get("1234", "2025", "1Q")
+        self.assertEqual(data.operating_cf, 120.0)
+        self.assertNotEqual(data.net_sales, 1.0)
+        self.assertEqual(data.progress_comment, "1234_2025_1Q 順調")
+        # Parser fields come from the summary page, the rest from the batch response
+        raw = self.store.get_raw("1234", "2025", "1Q")
+        self.assertEqual(raw["provenance"]["cf.operating_cf"], "llm")
+        self.assertEqual(raw["provenance"]["pl.net_sales"], "parser")
+
+        # Nothing left to do on the next run
+        self.assertTrue(self.submitter(client).run(self.jobs, wait=False))
+        self.assertEqual(client.uploads, 1)
+
+    def test_failed_requests_are_resubmitted_next_run(self):
+        client = FakeBatchClient(fail={"1234_2024_1Q"})
+        self.assertTrue(self.submitter(client).run(self.jobs, poll_interval=0))
+        self.assertIsNone(self.store.get("1234", "2024", "1Q"))
+        self.assertIsNotNone(self.store.get("1234", "2025", "1Q"))
+
+        client.fail.clear()
+        submitter = self.submitter(client)
+        batch, = submitter.prepare(self.jobs)
+        self.assertEqual(list(batch["requests"]), ["1234_2024_1Q"])
+
+    def test_cached_responses_skip_the_batch(self):
+        self.assertTrue(self.submitter(FakeBatchClient()).run(self.jobs, poll_interval=0))
+        self.store.conn.execute("DELETE FROM filings")
+        self.store.conn.commit()
+
+        client = FakeBatchClient()
+        self.assertEqual(self.submitter(client).prepare(self.jobs), [])
+        self.assertEqual(client.uploads, 0)
+        self.assertIsNotNone(self.store.get("1234", "2024", "1Q"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import csv
+import tempfile
+import unittest
+from unittest import mock
+from src.models import AnalysisReport, EvaluationResult
+from src.batch_report import BatchReportWriter, rank_rows, report_filename, parse_number
+from src.reporter import Reporter
+
+def make_report(name, per=None, peg=None, assessments=()):
+    valuations = {}
+    if per is not None:
+        valuations["PER"] = f"{per:.2f}倍"
+    if peg is not None:
+        valuations["PEG"] = f"{peg:.2f}倍"
+    evaluations = [EvaluationResult("売上高成長率(YoY)", "+12.50%", a) for a in assessments]
+    return AnalysisReport(company_name=name, fiscal_period="2025年3月期 第1四半期", stock_price=1000.0,
+                          evaluations=evaluations, qualitative_analysis={}, valuations=valuations)
+
+class TestBatchReportWriter(unittest.TestCase):
+    def test_parsing_and_names(self):
+        self.assertEqual(parse_number("+12.50%"), 12.5)
+        self.assertEqual(parse_number("△1,234百万円"), 1234.0)
+        self.assertEqual(parse_number("-3.2%pt"), -3.2)
+        self.assertIsNone(parse_number("N/A"))
+        self.assertEqual(report_filename("130A", "2025", "通期"), "130A_2025_通期.md")
+        self.assertEqual(report_filename("../x", "2025", "1Q"), ".._x_2025_1Q.md")
+
+    def test_rank_rows(self):
+        rows = [{"code": "a", "score": 1, "PEG": 2.0}, {"code": "b", "score": 3, "PEG": None},
+                {"code": "c", "score": 3, "PEG": 0.5}, {"code": "d", "score": None, "PEG": 0.1}]
+        self.assertEqual([r["code"] for r in rank_rows(rows, ["-score", "PEG"])], ["c", "b", "a", "d"])
+        self.assertEqual([r["code"] for r in rank_rows(rows, ["PEG"])], ["d", "c", "a", "b"])
+
+    def test_writes_reports_and_summary(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with BatchReportWriter(tmp, sort_by=["-score", "PEG"]) as writer:
+                # Same company name and run date: the old naming would overwrite
+                writer.submit("1111", "2025", "1Q", make_report("同名", per=10, peg=1.5, assessments=["Pass"]))
+                writer.submit("2222", "2025", "1Q", make_report("同名", per=20, peg=0.8,
+                                                                 assessments=["Pass", "Excellent"]))
+                writer.submit("3333", "2025", "1Q", make_report("別名", assessments=["Fail"]))
+
+            files = sorted(os.listdir(tmp))
+            self.assertIn("1111_2025_1Q.md", files)
+            self.assertIn("2222_2025_1Q.md", files)
+            self.assertEqual(writer.written, 3)
+            csv_path = os.path.join(tmp, next(f for f in files if f.endswith(".csv")))
+            with open(csv_path, encoding='utf-8-sig', newline='') as f:
+                rows = list(csv.DictReader(f))
+            with open(os.path.join(tmp, "2222_2025_1Q.md"), encoding='utf-8') as f:
+                self.assertIn("# 企業分析レポート: 同名", f.read())
+
+        self.assertEqual([r["code"] for r in rows], ["2222", "1111", "3333"])
+        self.assertEqual(rows[0]["score"], "2")
+        self.assertEqual(rows[0]["PEG"], "0.8")
+        self.assertEqual(rows[0]["売上高成長率(YoY)"], "12.5")
+        self.assertEqual(rows[2]["PER"], "")
+
+    def test_reporter_submit_uses_filing_names(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            reporter = Reporter(tmp)
+            with mock.patch("builtins.print"):
+                reporter.submit("1111", "2025", "1Q", make_report("Unknown"))
+                reporter.submit("1111", "2025", "2Q", make_report("Unknown"))
+                reporter.submit("2222", "2025", "1Q", make_report("Unknown"))
+            self.assertEqual(sorted(os.listdir(tmp)), ["1111_2025_1Q.md", "1111_2025_2Q.md", "2222_2025_1Q.md"])
+        self.assertEqual(report_filename("current", "", ""), "current.md")
+
+    def test_render_failure_does_not_stop_the_writer(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = BatchReportWriter(tmp, max_pending=1)
+            render = writer.renderer.render_markdown
+            with mock.patch.object(writer.renderer, "render_markdown",
+                                   side_effect=lambda r: render(r) if r.company_name != "壊れた" else 1 / 0):
+                writer.submit("1111", "2025", "1Q", make_report("壊れた"))
+                # More reports than max_pending: these would block forever on a dead thread
+                for code in ("2222", "3333", "4444"):
+                    writer.submit(code, "2025", "1Q", make_report("正常"))
+                writer.close()
+
+            self.assertEqual(writer.written, 3)
+            self.assertEqual(len(writer.errors), 1)
+            self.assertIn("ZeroDivisionError", writer.errors[0])
+            self.assertNotIn("1111_2025_1Q.md", os.listdir(tmp))
+
+if __name__ == '__main__':
+    unittest.main()
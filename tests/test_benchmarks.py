@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+from benchmarks.synthetic import write_pdf, filing_pages
+from benchmarks.run import compare
+from src.pdf_loader import extract_text_from_pdf
+from src.summary_parser import parse_summary_page
+from src.sections import detect_sections
+
+class TestSyntheticFilings(unittest.TestCase):
+    def test_roundtrip_through_pdfminer(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "1234_2025_1Q.pdf")
+            write_pdf(path, filing_pages("1234", 2025, "1Q", 10))
+            full_text = extract_text_from_pdf(path)
+            text = extract_text_from_pdf(path, sections_only=True)
+
+        self.assertEqual(full_text.count("\f"), 10)
+        self.assertTrue(detect_sections(text) >= {"summary", "pl", "bs", "cf"})
+        parsed = parse_summary_page(text)
+        self.assertEqual(parsed["basic_info"]["company_name"], "テスト1234株式会社")
+        self.assertEqual(parsed["basic_info"]["fiscal_period"], "2025年3月期 第1四半期")
+        self.assertIn("net_sales", parsed["pl"])
+
+class TestCompare(unittest.TestCase):
+    def test_flags_slow_stages_only(self):
+        baseline = {"throughput_per_min": 100.0, "stages": {
+            "extraction": {"p50_ms": 100.0, "p95_ms": 120.0},
+            "evaluate": {"p50_ms": 0.1, "p95_ms": 0.2},
+        }}
+        result = {"throughput_per_min": 95.0, "stages": {
+            "extraction": {"p50_ms": 150.0, "p95_ms": 125.0},
+            "evaluate": {"p50_ms": 0.5, "p95_ms": 0.9},
+        }}
+        regressions = compare(result, baseline, tolerance=0.3)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("extraction p50_ms"))
+
+    def test_scales_the_baseline_by_calibration(self):
+        baseline = {"calibration_ms": 10.0, "throughput_per_min": 100.0,
+                    "stages": {"extraction": {"p50_ms": 100.0, "p95_ms": 120.0}}}
+        # Twice as slow overall on a machine whose calibration is twice as slow: no regression
+        slower_machine = {"calibration_ms": 20.0, "throughput_per_min": 50.0,
+                          "stages": {"extraction": {"p50_ms": 200.0, "p95_ms": 240.0}}}
+        self.assertEqual(compare(slower_machine, baseline, tolerance=0.3), [])
+        # Same numbers on a machine as fast as the baseline's: a regression of every check
+        same_machine = dict(slower_machine, calibration_ms=10.0)
+        self.assertEqual(len(compare(same_machine, baseline, tolerance=0.3)), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs main.py in a fresh interpreter and reports which heavy dependencies were imported
+_PROBE = """
+import sys, runpy
+sys.argv = ["main.py"] + sys.argv[1:]
+runpy.run_path("main.py", run_name="__main__")
+print("LOADED", "openai" in sys.modules, "pdfminer" in sys.modules)
+"""
+
+def _run(*argv):
+    return subprocess.run([sys.executable, "-c", _PROBE, *argv], cwd=REPO_ROOT,
+                          capture_output=True, text=True, timeout=60)
+
+class TestLazyImports(unittest.TestCase):
+    def test_import_main_does_not_load_openai_or_pdfminer(self):
+        proc = subprocess.run([sys.executable, "-c", "import sys, main; print('openai' in sys.modules, 'pdfminer' in sys.modules)"],
+                              cwd=REPO_ROOT, capture_output=True, text=True, timeout=60)
+        self.assertEqual(proc.stdout.split(), ["False", "False"], proc.stderr)
+
+    def test_evaluate_and_report_from_json(self):
+        analysis = {
+            "basic_info": {"company_name": "テスト株式会社", "fiscal_period": "2025年3月期 第1四半期"},
+            "pl": {"net_sales": 1200.0, "operating_profit": 150.0, "eps": 50.0},
+            "bs": {"total_assets": 5000.0, "net_assets": 2500.0, "bps": 800.0},
+        }
+        prev = {"basic_info": analysis["basic_info"], "pl": {"net_sales": 1000.0, "operating_profit": 100.0, "eps": 40.0}}
+        with tempfile.TemporaryDirectory() as tmp:
+            current_path = os.path.join(tmp, "current.json")
+            prev_path = os.path.join(tmp, "prev.json")
+            for path, data in ((current_path, analysis), (prev_path, prev)):
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+
+            proc = _run("evaluate", "--json", current_path, "--prev-json", prev_path, "--price", "1000")
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            self.assertIn("テスト株式会社", proc.stdout)
+            self.assertIn("PER", proc.stdout)
+            self.assertIn("LOADED False False", proc.stdout)
+
+            out_dir = os.path.join(tmp, "out")
+            proc = _run("report", "--json", current_path, "--price", "1000", "--output", out_dir)
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            self.assertIn("LOADED False False", proc.stdout)
+            self.assertEqual(os.listdir(out_dir), ["current.md"])
+
+class TestResponseCacheOption(unittest.TestCase):
+    def test_no_cache_skips_the_response_cache(self):
+        import argparse
+        from unittest import mock
+        import main
+
+        self.assertIsNone(main.open_response_cache(argparse.Namespace(no_cache=True)))
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(main, "RESPONSE_CACHE_PATH", os.path.join(tmp, "responses.sqlite3")):
+            cache = main.open_response_cache(argparse.Namespace(no_cache=False))
+            self.assertEqual(cache.ttl_seconds, main.RESPONSE_CACHE_TTL)
+            cache.backend.conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
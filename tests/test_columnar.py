@@ -0,0 +1,65 @@
+import os
+import random
+import tempfile
+import unittest
+import importlib.util
+from dataclasses import fields
+from src.models import FinancialData
+from src.columnar import FinancialRecord, FinancialTable, NUMERIC_FIELDS
+from src.store import FinancialStore
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+def random_data(rng):
+    values = {f: (rng.uniform(-1000, 1000) if rng.random() > 0.3 else None) for f in NUMERIC_FIELDS}
+    values["net_sales"] = 0.0  # zero must stay distinct from missing
+    return FinancialData(**values, company_name="テスト株式会社", fiscal_period="2024年3月期 第1四半期",
+                         progress_comment="順調" * rng.randint(0, 3), risk_factors="為替")
+
+class TestFinancialRecord(unittest.TestCase):
+    def test_roundtrip_and_slots(self):
+        data = random_data(random.Random(0))
+        record = FinancialRecord.from_data(data)
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(record.to_data(), data)
+        self.assertEqual([f.name for f in fields(FinancialRecord)], [f.name for f in fields(FinancialData)])
+
+class TestFinancialTable(unittest.TestCase):
+    def test_roundtrip(self):
+        rng = random.Random(1)
+        rows = [random_data(rng) for _ in range(50)] + [FinancialData()]
+        table = FinancialTable.from_records(rows)
+        self.assertEqual(len(table), 51)
+        self.assertEqual(list(table), rows)
+        self.assertEqual(table.column("eps"), [r.eps for r in rows])
+        self.assertEqual(table.value(0, "net_sales"), 0.0)
+        # Identical qualitative text is stored once
+        self.assertIs(table.row(0).risk_factors, table.row(1).risk_factors)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+    def test_numpy_columns_match_vectorized(self):
+        import numpy as np
+        from src.vectorized import to_columns
+
+        rng = random.Random(2)
+        rows = [random_data(rng) for _ in range(30)]
+        expected = to_columns(rows)
+        for name, col in FinancialTable.from_records(rows).to_numpy_columns().items():
+            np.testing.assert_array_equal(col, expected[name])
+
+    def test_store_table_loads_text_lazily(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = FinancialStore(os.path.join(tmp, "financials.sqlite3"))
+            data = FinancialData(net_sales=1200, company_name="テスト", progress_comment="順調")
+            store.put_many([("8035", "2024", "1Q", data, None, ""),
+                            ("6758", "2024", "1Q", FinancialData(net_sales=5), None, "")])
+
+            table = store.table(codes=["8035"])
+            self.assertEqual(len(table), 1)
+            self.assertEqual(table.get(("8035", "2024", "1Q")), data)
+            self.assertIsNone(table.get(("6758", "2024", "1Q")))
+            self.assertEqual(len(store.table(keep_text=True)), 2)
+            store.close()
+
+if __name__ == '__main__':
+    unittest.main()
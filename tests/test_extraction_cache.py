@@ -0,0 +1,61 @@
+import os
+import time
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.extraction_cache import ExtractionCache
+
+class TestExtractionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_depends_on_bytes_and_params(self):
+        key = ExtractionCache.make_key(b"%PDF-1.4 a", "pdfminer=1")
+        self.assertEqual(key, ExtractionCache.make_key(b"%PDF-1.4 a", "pdfminer=1"))
+        self.assertNotEqual(key, ExtractionCache.make_key(b"%PDF-1.4 b", "pdfminer=1"))
+        self.assertNotEqual(key, ExtractionCache.make_key(b"%PDF-1.4 a", "pdfminer=2"))
+
+    def test_hit_and_miss_stats(self):
+        cache = ExtractionCache(self.cache_dir)
+        key = cache.make_key(b"pdf", "params")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "売上高 12,345")
+        self.assertEqual(cache.get(key), "売上高 12,345")
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+
+    def test_lru_eviction(self):
+        cache = ExtractionCache(self.cache_dir, max_bytes=25)
+        cache.put("a", "x" * 10)
+        time.sleep(0.01)
+        cache.put("b", "y" * 10)
+        time.sleep(0.01)
+        # Reading "a" makes "b" the least recently used entry
+        cache.get("a")
+        time.sleep(0.01)
+        cache.put("c", "z" * 10)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_concurrent_puts_of_one_key(self):
+        cache = ExtractionCache(self.cache_dir)
+        texts = [str(i) * 50_000 for i in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            # Raises if one thread's temp file was renamed away by another
+            list(pool.map(lambda text: cache.put("same", text), texts * 5))
+
+        self.assertIn(cache.get("same"), texts)
+        self.assertEqual(os.listdir(self.cache_dir), ["same.txt"])
+
+if __name__ == '__main__':
+    unittest.main()
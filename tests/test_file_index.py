@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from src.file_index import FileIndex, parse_report_filename
+
+class TestFileIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp.name, "input")
+        self.index_path = os.path.join(self.tmp.name, "cache", "file_index.json")
+        os.makedirs(self.input_dir)
+        for name in ("8035_2024_1Q.pdf", "8035_2023_1Q.pdf", "130A_2025_通期.pdf", "notes.pdf", "8035_2024_1Q_old.pdf"):
+            self._touch(name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _touch(self, name, content=b"%PDF-1.4"):
+        with open(os.path.join(self.input_dir, name), 'wb') as f:
+            f.write(content)
+
+    def _bump_dir_mtime(self):
+        st = os.stat(self.input_dir)
+        os.utime(self.input_dir, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    def test_strict_filename_parsing(self):
+        self.assertEqual(parse_report_filename("8035_2024_1Q.pdf"), ("8035", "2024", "1Q"))
+        self.assertEqual(parse_report_filename("130A_2025_通期.pdf"), ("130A", "2025", "通期"))
+        self.assertIsNone(parse_report_filename("8035_2024_1Q_old.pdf"))
+        self.assertIsNone(parse_report_filename("a_b_c.pdf"))
+        self.assertIsNone(parse_report_filename("8035_2024_5Q.pdf"))
+
+    def test_lookup(self):
+        index = FileIndex(self.input_dir, self.index_path)
+        self.assertEqual(index.lookup("8035"), {
+            "2024": {"1Q": os.path.join(self.input_dir, "8035_2024_1Q.pdf")},
+            "2023": {"1Q": os.path.join(self.input_dir, "8035_2023_1Q.pdf")},
+        })
+        self.assertEqual(index.codes(), ["130A", "8035"])
+        self.assertEqual(index.lookup("9999"), {})
+        self.assertEqual(index.ignored, ["8035_2024_1Q_old.pdf", "notes.pdf"])
+
+    def test_persisted_and_incremental(self):
+        FileIndex(self.input_dir, self.index_path)
+        self.assertTrue(os.path.exists(self.index_path))
+
+        index = FileIndex(self.input_dir, self.index_path)
+        self.assertFalse(index.refresh())  # unchanged directory, no rescan
+
+        self._touch("8035_2024_2Q.pdf")
+        os.remove(os.path.join(self.input_dir, "8035_2023_1Q.pdf"))
+        self._bump_dir_mtime()
+        self.assertTrue(index.refresh())
+        self.assertEqual(sorted(index.lookup("8035")["2024"]), ["1Q", "2Q"])
+        self.assertNotIn("2023", index.lookup("8035"))
+
+        reloaded = FileIndex(self.input_dir, self.index_path)
+        self.assertEqual(reloaded.lookup("8035"), index.lookup("8035"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import io
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+from types import SimpleNamespace
+from src.instrumentation import (Tracer, NullTracer, JsonLinesExporter, PrometheusTextfileExporter,
+                                 SummaryTableExporter, SpanCollector, estimate_cost, get_tracer, set_tracer)
+
+class TestTracer(unittest.TestCase):
+    def test_nested_spans_and_errors(self):
+        collector = SpanCollector()
+        tracer = Tracer([collector])
+        with tracer.span("analyze", code="8035"):
+            with tracer.span("llm"):
+                pass
+        with self.assertRaises(ValueError):
+            with tracer.span("evaluate"):
+                raise ValueError("boom")
+
+        llm, analyze, evaluate = collector.spans
+        self.assertEqual(llm.parent_id, analyze.span_id)
+        self.assertIsNone(analyze.parent_id)
+        self.assertEqual(analyze.attrs, {"code": "8035"})
+        self.assertEqual(evaluate.error, "ValueError")
+        self.assertEqual(tracer.stage_totals()["evaluate"]["errors"], 1)
+
+    def test_asyncio_tasks_keep_their_parent(self):
+        collector = SpanCollector()
+        tracer = Tracer([collector])
+
+        async def child(name):
+            with tracer.span(name):
+                await asyncio.sleep(0)
+
+        async def run():
+            with tracer.span("analyze"):
+                await asyncio.gather(child("current"), child("prev"))
+
+        asyncio.run(run())
+        parent = next(s for s in collector.spans if s.name == "analyze")
+        self.assertEqual({s.parent_id for s in collector.spans if s.name != "analyze"}, {parent.span_id})
+
+    def test_llm_usage_and_cost(self):
+        collector = SpanCollector()
+        tracer = Tracer([collector])
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=200,
+                                prompt_tokens_details=SimpleNamespace(cached_tokens=400))
+        with tracer.span("llm"):
+            tracer.record_llm("gpt-4o-2024-08-06", usage)
+        expected = (600 * 2.50 + 400 * 1.25 + 200 * 10.00) / 1_000_000
+        self.assertAlmostEqual(tracer.llm_usage["gpt-4o-2024-08-06"]["cost"], expected)
+        self.assertAlmostEqual(collector.spans[0].attrs["cost_usd"], expected)
+        self.assertAlmostEqual(estimate_cost("gpt-4o-mini", 1_000_000, 0), 0.15)
+        self.assertIsNone(estimate_cost("unknown-model", 10, 10))
+
+    def test_spans_are_not_retained(self):
+        tracer = Tracer()
+        for _ in range(1000):
+            with tracer.span("evaluate"):
+                pass
+        self.assertFalse(hasattr(tracer, "spans"))
+        totals = tracer.stage_totals()["evaluate"]
+        self.assertEqual((totals["count"], totals["errors"]), (1000, 0))
+        self.assertGreaterEqual(totals["total"], totals["max"])
+
+    def test_disabled_tracer_is_a_noop(self):
+        self.assertIsInstance(get_tracer(), NullTracer)
+        self.assertFalse(get_tracer().enabled)
+        tracer = NullTracer()
+        self.assertIs(tracer.span("a"), tracer.span("b"))
+        with tracer.span("a") as span:
+            self.assertIsNone(span)
+
+class TestExporters(unittest.TestCase):
+    def test_exporters(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_path = os.path.join(tmp, "trace", "run.jsonl")
+            prom_path = os.path.join(tmp, "finsight.prom")
+            out = io.StringIO()
+            tracer = Tracer([JsonLinesExporter(trace_path), PrometheusTextfileExporter(prom_path),
+                             SummaryTableExporter(out)])
+            previous = set_tracer(tracer)
+            try:
+                with get_tracer().span("extract", code="8035"):
+                    get_tracer().count("extraction_cache.miss")
+                get_tracer().record_span("extract", 0.5, code="6758")
+                get_tracer().record_llm("gpt-4o", SimpleNamespace(prompt_tokens=10, completion_tokens=5))
+            finally:
+                set_tracer(previous)
+            tracer.close()
+
+            with open(trace_path, encoding='utf-8') as f:
+                records = [json.loads(line) for line in f]
+            with open(prom_path, encoding='utf-8') as f:
+                prom = f.read()
+
+        self.assertEqual([r["type"] for r in records], ["span", "span", "summary"])
+        self.assertEqual(records[0]["attrs"], {"code": "8035"})
+        self.assertEqual(records[2]["counters"], {"extraction_cache.miss": 1})
+        self.assertIn('finsight_stage_seconds_count{stage="extract"} 2', prom)
+        self.assertIn('finsight_events_total{event="extraction_cache.miss"} 1', prom)
+        self.assertIn('finsight_llm_tokens_total{model="gpt-4o",type="prompt"} 10', prom)
+        self.assertIn("extract", out.getvalue())
+        self.assertIn("LLM gpt-4o: 1 calls", out.getvalue())
+
+    def test_prometheus_file_is_written_while_running(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            prom_path = os.path.join(tmp, "finsight.prom")
+            tracer = Tracer([PrometheusTextfileExporter(prom_path, interval=3600)])
+
+            def read():
+                with open(prom_path, encoding='utf-8') as f:
+                    return f.read()
+
+            with tracer.span("analyze"):
+                pass
+            self.assertIn('finsight_stage_seconds_count{stage="analyze"} 1', read())
+            # Throttled to one write per interval; close() always writes the final totals
+            with tracer.span("analyze"):
+                pass
+            self.assertIn('finsight_stage_seconds_count{stage="analyze"} 1', read())
+            tracer.close()
+            self.assertIn('finsight_stage_seconds_count{stage="analyze"} 2', read())
+            self.assertEqual(os.listdir(tmp), ["finsight.prom"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from src.models import FinancialData
+from src.evaluator import Evaluator
+from src.keyword_scanner import AhoCorasick, KeywordSignals
+from src.store import FinancialStore
+
+TEXT = """私たちは中期経営計画に基づき研究開
+発と広告宣伝を強化しました。当社グループは増配を決定し、
+自己株式の取得も実施します。役員報酬は据え置きです。"""
+
+class TestAhoCorasick(unittest.TestCase):
+    def test_leftmost_longest_without_overlaps(self):
+        automaton = AhoCorasick(["私", "私たち", "当社", "当社グループ", "グループ会社"])
+        self.assertEqual(automaton.find("私たちと当社グループ会社"), [(0, "私たち"), (4, "当社グループ")])
+        self.assertEqual(automaton.count("私は私たちの当社を"), {"私": 1, "私たち": 1, "当社": 1})
+
+    def test_patterns_found_through_failure_links(self):
+        automaton = AhoCorasick(["abcd", "bc", "c"])
+        self.assertEqual(automaton.find("abcxc"), [(1, "bc"), (4, "c")])
+        self.assertEqual(automaton.find("xabcd"), [(1, "abcd")])
+
+class TestKeywordScanner(unittest.TestCase):
+    def setUp(self):
+        self.evaluator = Evaluator("config/criteria.yaml")
+
+    def test_scan_counts_across_line_breaks(self):
+        signals = self.evaluator.scan(TEXT)
+        self.assertEqual(signals.counts["研究開発"], 1)
+        self.assertEqual(signals.counts["自己株式の取得"], 1)
+        self.assertEqual(signals.counts["私たち"], 1)
+        self.assertNotIn("私", signals.counts)
+
+    def test_first_person_keywords_skip_compounds(self):
+        text = "当社は私募債を発行し、私的整理は行わず、私立学校向けの事業を拡大します。" * 5
+        signals = self.evaluator.scan(text)
+        self.assertEqual(signals.counts, {})
+        report = self.evaluator.evaluate(FinancialData(), None, 1000, signals)
+        self.assertNotIn("主語が自分か(本文)", {e.metric_name for e in report.evaluations})
+
+    def test_first_person_is_scored_by_frequency(self):
+        # 当社 on every line does not count against the one first-person sentence
+        text = "私たちは変革を進めます。" + "当社グループの売上高は前年同期比で増加しました。" * 500
+        report = self.evaluator.evaluate(FinancialData(), None, 1000, self.evaluator.scan(text))
+        tone, = [e for e in report.evaluations if e.metric_name == "主語が自分か(本文)"]
+        self.assertEqual((tone.value, tone.assessment), ("0.83件/万字", "Neutral"))
+
+        report = self.evaluator.evaluate(FinancialData(), None, 1000, self.evaluator.scan(text + "私どもは" * 2))
+        tone, = [e for e in report.evaluations if e.metric_name == "主語が自分か(本文)"]
+        self.assertEqual(tone.assessment, "Good")
+        self.assertEqual(tone.details, "良: 私ども×2, 私たち×1")
+
+    def test_signals_are_scored_by_evaluate(self):
+        signals = self.evaluator.scan(TEXT)
+        report = self.evaluator.evaluate(FinancialData(), None, 1000, signals)
+        by_name = {e.metric_name: e for e in report.evaluations}
+
+        # Full-text counts feed the existing rule rather than adding a second sga_efficiency metric
+        sga, = [e for e in report.evaluations if e.metric_name.startswith("販管費の効率性")]
+        self.assertEqual((sga.metric_name, sga.value, sga.assessment), ("販管費の効率性", "+1", "Good"))
+        self.assertEqual(sga.details, "良: 研究開発×1, 広告宣伝×1 / 悪: 役員報酬×1 (本文)")
+        self.assertEqual(by_name["株主をパートナーとして見ているか(本文)"].assessment, "Good")
+        self.assertEqual((by_name["主語が自分か(本文)"].value, by_name["主語が自分か(本文)"].assessment),
+                         ("140.85件/万字", "Good"))
+        # Below min_hits: not reported rather than scored on one hit
+        self.assertNotIn("未来への戦略(本文)", by_name)
+
+        without = self.evaluator.evaluate(FinancialData(), None, 1000)
+        self.assertNotIn("販管費の効率性", {e.metric_name for e in without.evaluations})
+        # No keyword in the full text: the rule falls back to the LLM's cost efficiency comment
+        commented = FinancialData(cost_efficiency_comment="広告宣伝を強化")
+        sga, = [e for e in self.evaluator.evaluate(commented, None, 1000, self.evaluator.scan("私たちは")).evaluations
+                if e.metric_name == "販管費の効率性"]
+        self.assertEqual(sga.details, "良: 広告宣伝×1")
+
+    def test_extra_lexicons_come_from_criteria(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = os.path.join(tmp, "criteria.yaml")
+            shutil.copy("config/criteria.yaml", config_path)
+            with open(config_path, 'a', encoding='utf-8') as f:
+                f.write('      dx:\n        description: "DX"\n        positive: ["DX"]\n        negative: ["レガシー"]\n')
+            evaluator = Evaluator(config_path)
+            report = evaluator.evaluate(FinancialData(), None, 1000, evaluator.scan("DXを推進。レガシー刷新。DX"))
+            dx, = [e for e in report.evaluations if e.metric_name == "DX"]
+            self.assertEqual((dx.value, dx.assessment), ("66.7%", "Good"))
+
+    def test_signals_survive_the_store(self):
+        signals = self.evaluator.scan(TEXT)
+        result = {"basic_info": {"company_name": "Test"}}
+        signals.attach(result)
+        with tempfile.TemporaryDirectory() as tmp:
+            store = FinancialStore(os.path.join(tmp, "store.sqlite3"))
+            store.put("1234", "2025", "1Q", self.evaluator.map_json_to_model(result), result, "x.pdf")
+            restored = KeywordSignals.from_result(store.get_raw("1234", "2025", "1Q"))
+            store.close()
+        self.assertEqual(restored, signals)
+        self.assertEqual(KeywordSignals.from_result(json.loads(json.dumps(result))), signals)
+        self.assertIsNone(KeywordSignals.from_result({"pl": {}}))
+
+if __name__ == '__main__':
+    unittest.main()
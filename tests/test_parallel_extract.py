@@ -0,0 +1,123 @@
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+from benchmarks.synthetic import write_pdf, filing_pages
+from src.pdf_loader import extract_text_from_pdf
+from src.extraction_cache import ExtractionCache
+from src.instrumentation import Tracer, set_tracer
+from src.parallel_extract import extract_pages_parallel, extract_text_parallel, extract_text_guarded, count_pages
+
+def _hang_after_first_page(filepath, start, end, laparams, memory_limit, conn):
+    conn.send((start, f"page {start}\f", None))
+    time.sleep(60)
+
+class TestParallelExtraction(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "1234_2025_通期.pdf")
+        write_pdf(cls.path, filing_pages("1234", 2025, "通期", 12))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_matches_serial_extraction(self):
+        self.assertEqual(count_pages(self.path), 12)
+        result = extract_pages_parallel(self.path, workers=3, pages_per_worker=2)
+        self.assertTrue(result.ok, result.errors)
+        self.assertEqual(result.text, extract_text_from_pdf(self.path))
+
+        cache = ExtractionCache(os.path.join(self.tmp.name, "cache"))
+        result = extract_text_parallel(self.path, cache=cache, sections_only=True, workers=4)
+        self.assertEqual(result.text, extract_text_from_pdf(self.path, sections_only=True))
+        # Shares cache entries with the serial path
+        self.assertEqual(extract_text_from_pdf(self.path, cache=cache, sections_only=True), result.text)
+        self.assertEqual(cache.stats()["hits"], 1)
+        cached = extract_text_parallel(self.path, cache=cache, sections_only=True)
+        self.assertTrue(cached.from_cache)
+        # The entry only holds the selected pages, so it cannot tell the document's page count
+        self.assertIsNone(cached.page_count)
+        extract_text_parallel(self.path, cache=cache, workers=4)
+        self.assertEqual(extract_text_parallel(self.path, cache=cache).page_count, 12)
+
+    def test_timeout_is_reported_per_page(self):
+        with mock.patch("src.parallel_extract._extract_range", _hang_after_first_page):
+            started = time.monotonic()
+            result = extract_pages_parallel(self.path, workers=2, pages_per_worker=6, timeout=0.5)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(result.text, "page 0\fpage 6\f")
+        self.assertEqual(len(result.errors), 10)
+        errors = {e.page: e.error for e in result.errors}
+        self.assertEqual(errors[1], "timed out after 0.5s")
+        self.assertEqual(errors[2], "not extracted: timed out after 0.5s on page 2")
+
+    def test_guarded_extraction_stops_a_hanging_filing(self):
+        tracer = Tracer()
+        previous = set_tracer(tracer)
+        try:
+            with mock.patch("src.parallel_extract._extract_range", _hang_after_first_page), \
+                    mock.patch("builtins.print") as printed:
+                started = time.monotonic()
+                text = extract_text_guarded(self.path, page_workers=1, page_timeout=0.5)
+        finally:
+            set_tracer(previous)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(text, "page 0\f")
+        self.assertEqual(tracer.counters["extract.page_error"], 11)
+        self.assertIn("page 2: timed out after 0.5s", printed.call_args_list[0][0][0])
+        # Without page_workers it is the serial extraction
+        self.assertEqual(extract_text_guarded(self.path), extract_text_from_pdf(self.path))
+
+    @unittest.skipUnless(os.path.exists("/proc/self/statm"), "needs /proc to size the limit")
+    def test_memory_limit_fails_pages_not_the_run(self):
+        from pdfminer.pdfinterp import PDFPageInterpreter
+
+        with open("/proc/self/statm") as f:
+            vm_mb = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+        original = PDFPageInterpreter.process_page
+
+        def greedy(interpreter, page):
+            if page.pageid % 2:
+                bytearray(512 * 1024 * 1024)
+            return original(interpreter, page)
+
+        with mock.patch.object(PDFPageInterpreter, "process_page", greedy):
+            result = extract_pages_parallel(self.path, workers=2, memory_limit_mb=vm_mb + 128)
+        self.assertTrue(result.errors)
+        self.assertTrue(all(e.error.startswith("MemoryError") for e in result.errors))
+        self.assertEqual(len(result.errors) + result.text.count("\f"), 12)
+
+    def test_crashed_worker(self):
+        def crash(filepath, start, end, laparams, memory_limit, conn):
+            conn.send((start, "ok\f", None))
+            os._exit(1)
+
+        with mock.patch("src.parallel_extract._extract_range", crash):
+            result = extract_pages_parallel(self.path, workers=2, pages_per_worker=6)
+        self.assertEqual(result.text, "ok\fok\f")
+        self.assertEqual(result.errors[0].error, "worker ran out of memory or crashed")
+
+    def test_unreadable_document(self):
+        path = os.path.join(self.tmp.name, "broken.pdf")
+        with open(path, 'wb') as f:
+            f.write(b"not a pdf")
+        result = extract_pages_parallel(path, workers=2)
+        self.assertFalse(result.ok)
+        self.assertIsNone(result.errors[0].page)
+
+        # The serial path still returns "", but the failure is logged and counted
+        tracer = Tracer()
+        previous = set_tracer(tracer)
+        try:
+            with mock.patch("builtins.print") as printed:
+                self.assertEqual(extract_text_from_pdf(path), "")
+        finally:
+            set_tracer(previous)
+        self.assertEqual(tracer.counters["extract.error"], 1)
+        self.assertIn("broken.pdf: PDFSyntaxError", printed.call_args[0][0])
+
+if __name__ == '__main__':
+    unittest.main()
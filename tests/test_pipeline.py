@@ -0,0 +1,20 @@
+import unittest
+from src.pipeline import select_periods
+
+class TestSelectPeriods(unittest.TestCase):
+    def test_latest_quarter_and_prior_year(self):
+        reports_map = {
+            '2023': {'1Q': 'input/8035_2023_1Q.pdf', '2Q': 'input/8035_2023_2Q.pdf'},
+            '2024': {'1Q': 'input/8035_2024_1Q.pdf', '2Q': 'input/8035_2024_2Q.pdf'},
+        }
+        year, quarter, current, prev_year, prev = select_periods(reports_map)
+        self.assertEqual((year, quarter, current), ('2024', '2Q', 'input/8035_2024_2Q.pdf'))
+        self.assertEqual((prev_year, prev), ('2023', 'input/8035_2023_2Q.pdf'))
+
+    def test_missing_prior_year(self):
+        _, _, _, prev_year, prev = select_periods({'2024': {'3Q': 'input/8035_2024_3Q.pdf'}})
+        self.assertEqual(prev_year, '2023')
+        self.assertIsNone(prev)
+
+if __name__ == '__main__':
+    unittest.main()
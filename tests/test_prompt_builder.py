@@ -0,0 +1,64 @@
+import unittest
+from src.prompt_builder import PromptBuilder, Tokenizer, normalize_pages
+
+def make_doc(pages):
+    header = "株式会社テスト (1234) 2025年3月期 決算短信"
+    return "\f".join(f"{header}\n{body}\n- {i + 1} -" for i, body in enumerate(pages))
+
+class TestNormalize(unittest.TestCase):
+    def test_strips_headers_page_numbers_and_toc(self):
+        doc = make_doc([
+            "サマリー情報\n売上高　　12,345　　10.5",
+            "目次\n1．経営成績等の概況 ........ 2",
+            "（1）連結損益計算書\n売上高合計 12,345\n営業利益合計 1,500\n12,345\n12,345",
+            "（2）連結キャッシュ・フロー計算書\n売上高合計 12,345\n営業利益合計 1,500",
+        ])
+        pages = normalize_pages(doc)
+        joined = "\n".join(pages)
+        self.assertNotIn("決算短信", joined)
+        self.assertNotIn("- 1 -", joined)
+        self.assertNotIn("........", joined)
+        self.assertIn("売上高 12,345 10.5", joined)
+        # Row labels that recur across statement pages are kept
+        self.assertEqual(joined.count("営業利益合計 1,500"), 2)
+        self.assertEqual(joined.count("12,345\n12,345"), 1)
+
+    def test_dedupes_repeated_lines_within_a_page(self):
+        sentence = "当社グループの売上高は前年同期を上回りました。"
+        pages = normalize_pages("\f".join([
+            f"経営成績\n経営成績\n{sentence}\n補足\n{sentence}",
+            f"（1）連結損益計算書\n売上高\n営業利益\n売上高\n営業利益\n1,500\n1,500\n{sentence}",
+        ]))
+        self.assertEqual(pages[0], f"経営成績\n{sentence}\n補足")
+        # Label columns and figures repeat legitimately; prose is only deduplicated within a page
+        self.assertEqual(pages[1], f"（1）連結損益計算書\n売上高\n営業利益\n売上高\n営業利益\n1,500\n1,500\n{sentence}")
+
+class TestPromptBuilder(unittest.TestCase):
+    def test_budget_prefers_statements_over_other_pages(self):
+        filler = "セグメント別の補足説明です。" * 200
+        doc = make_doc([
+            "サマリー情報\n売上高 12,345",
+            "1．経営成績等の概況\n増収増益となりました。",
+            "今後の見通し",
+            filler,
+            "（1）連結貸借対照表\n総資産 99,999",
+            "（2）連結損益計算書\n営業利益 1,234",
+            "（3）連結キャッシュ・フロー計算書\n営業活動によるキャッシュ・フロー 2,000",
+        ])
+        builder = PromptBuilder(max_tokens=200)
+        built = builder.build(doc)
+
+        self.assertLessEqual(built.tokens, 200)
+        self.assertTrue(built.truncated)
+        for heading in ("サマリー情報", "連結貸借対照表", "連結損益計算書", "連結キャッシュ・フロー計算書"):
+            self.assertIn(heading, built.text)
+        # Original page order is preserved
+        self.assertLess(built.text.index("サマリー情報"), built.text.index("連結貸借対照表"))
+
+    def test_truncate_respects_budget(self):
+        tokenizer = Tokenizer()
+        text = "売上高は前年同期比で増加しました。" * 50
+        self.assertLessEqual(tokenizer.count(tokenizer.truncate(text, 40)), 40)
+
+if __name__ == '__main__':
+    unittest.main()
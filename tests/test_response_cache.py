@@ -0,0 +1,55 @@
+import os
+import time
+import tempfile
+import unittest
+from src.response_cache import ResponseCache, DirectoryBackend, SQLiteBackend
+
+class ResponseCacheCases:
+    """Shared cases; the TestCase combining it sets backend_factory(root) -> backend."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backend = self.backend_factory(self.tmp.name)
+
+    def tearDown(self):
+        self.backend = None
+        self.tmp.cleanup()
+
+    def test_roundtrip(self):
+        cache = ResponseCache(self.backend)
+        key = cache.make_key("gpt-4o", "prompt", "text", {"type": "json_object"})
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {"basic_info": {"company_name": "東京エレクトロン"}})
+        self.assertEqual(cache.get(key)["basic_info"]["company_name"], "東京エレクトロン")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_ttl_expiry(self):
+        cache = ResponseCache(self.backend, ttl_seconds=0.01)
+        cache.put("k", {"pl": {}})
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("k"))
+
+    def test_max_entries(self):
+        cache = ResponseCache(self.backend, max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, {"key": key})
+            time.sleep(0.01)
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+class TestDirectoryBackend(ResponseCacheCases, unittest.TestCase):
+    backend_factory = staticmethod(lambda root: DirectoryBackend(os.path.join(root, "responses")))
+
+class TestSQLiteBackend(ResponseCacheCases, unittest.TestCase):
+    backend_factory = staticmethod(lambda root: SQLiteBackend(os.path.join(root, "responses.sqlite3")))
+
+class TestCacheKey(unittest.TestCase):
+    def test_key_components(self):
+        base = ResponseCache.make_key("gpt-4o", "p", "t", {"type": "json_object"})
+        self.assertNotEqual(base, ResponseCache.make_key("gpt-4o-mini", "p", "t", {"type": "json_object"}))
+        self.assertNotEqual(base, ResponseCache.make_key("gpt-4o", "p2", "t", {"type": "json_object"}))
+        self.assertNotEqual(base, ResponseCache.make_key("gpt-4o", "p", "t2", {"type": "json_object"}))
+        self.assertNotEqual(base, ResponseCache.make_key("gpt-4o", "p", "t", None))
+
+if __name__ == '__main__':
+    unittest.main()
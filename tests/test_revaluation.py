@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.evaluator import Evaluator
+from src.models import FinancialData
+from src.store import FinancialStore
+from src.revaluation import Revaluer
+from src.batch_report import BatchReportWriter
+
+class TestRevaluer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = FinancialStore(os.path.join(self.tmp.name, "store.sqlite3"))
+        self.evaluator = Evaluator("config/criteria.yaml")
+        self.current = FinancialData(company_name="テスト", fiscal_period="2025年3月期 第1四半期",
+                                     net_sales=1300.0, operating_profit=200.0, eps=100.0, bps=1000.0, equity_ratio=60.0)
+        self.last_year = FinancialData(net_sales=1000.0, operating_profit=150.0, eps=80.0)
+        self.store.put("1234", "2024", "1Q", self.last_year)
+        self.store.put("1234", "2025", "1Q", self.current)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_revalue_matches_full_evaluation(self):
+        base = self.evaluator.evaluate(self.current, self.last_year, 1000)
+        for price in (500, 1500, 2500):
+            revalued = self.evaluator.revalue(base, self.current, self.last_year, price)
+            self.assertEqual(revalued, self.evaluator.evaluate(self.current, self.last_year, price))
+        self.assertEqual(base.stock_price, 1000)
+        self.assertEqual(base.valuations["PER"], "10.00倍")
+
+    def test_rules_run_once_per_code(self):
+        revaluer = Revaluer(self.evaluator, self.store)
+        with mock.patch.object(self.evaluator, "evaluate", wraps=self.evaluator.evaluate) as evaluate:
+            reports = [revaluer.report("1234", price) for price in (1000, 1500, 2000)]
+        self.assertEqual(evaluate.call_count, 1)
+        self.assertEqual([r.valuations["PER"] for r in reports], ["10.00倍", "15.00倍", "20.00倍"])
+        self.assertEqual(reports[2].valuations["PEG"], f"{20 / 25:.2f}倍")
+        self.assertIsNone(revaluer.report("9999", 1000))
+
+    def test_run_writes_summary_only(self):
+        out_dir = os.path.join(self.tmp.name, "out")
+        revaluer = Revaluer(self.evaluator, self.store)
+        with BatchReportWriter(out_dir, write_reports=False) as writer:
+            results = revaluer.run([("1234", 1200.0), ("9999", 500.0)], writer)
+        self.assertEqual((results[0].year, results[0].quarter), ("2025", "1Q"))
+        self.assertEqual(results[1].error, "no analyzed filing in the store")
+        names = os.listdir(out_dir)
+        self.assertFalse(any(n.startswith("1234_") for n in names))
+        self.assertEqual(len([n for n in names if n.startswith("summary_")]), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+from src.models import FinancialData
+from src.evaluator import Evaluator
+from src.rule_engine import RuleEngine
+
+class TestRuleEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmp.name, "criteria.yaml")
+        shutil.copy("config/criteria.yaml", self.config_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_thresholds_are_ordered(self):
+        rules = {r.key: r for r in RuleEngine(self.config_path).rules}
+        self.assertEqual(rules["pl.revenue_growth_yoy"].steps,
+                         ((">=", 30.0, "Top Class"), (">=", 20.0, "Excellent"), (">=", 10.0, "Pass")))
+        self.assertEqual(rules["bs.de_ratio"].steps,
+                         (("<=", 0.5, "Very Safe"), ("<=", 1.0, "Healthy"), ("<=", 2.0, "Caution")))
+        self.assertIn("pl.progress_rate.1Q", rules)
+
+    def test_previously_unused_metrics(self):
+        evaluator = Evaluator(self.config_path)
+        current = FinancialData(quick_assets=80, current_liabilities=100,
+                                cost_efficiency_comment="研究開発費を増額し、広告宣伝も強化。交際費は削減。",
+                                operating_cf=500, operating_profit=300, investment_cf=-200)
+        report = evaluator.evaluate(current, None, 1000)
+        by_name = {e.metric_name: e for e in report.evaluations}
+
+        self.assertEqual(by_name["当座比率"].value, "80.00%")
+        self.assertEqual(by_name["当座比率"].assessment, "OK")
+        self.assertEqual(by_name["販管費の効率性"].assessment, "Good")
+        self.assertEqual(by_name["営業CF > 営業利益"].assessment, "Pass")
+        self.assertEqual(by_name["投資CF"].assessment, "Pass")
+        self.assertEqual(by_name["フリーキャッシュフロー"].value, "300百万円")
+
+    def test_reload_on_change(self):
+        evaluator = Evaluator(self.config_path)
+        current = FinancialData(equity_ratio=45.0)
+        first = evaluator.evaluate(current, None, 1000).evaluations[0]
+        self.assertEqual(first.assessment, "Safe")
+
+        rules_before = evaluator.rule_engine.rules
+        self.assertIs(rules_before, evaluator.rule_engine.rules)  # not recompiled without a change
+
+        with open(self.config_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            f.write(text.replace("ironclad: 50.0", "ironclad: 45.0"))
+        st = os.stat(self.config_path)
+        os.utime(self.config_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        second = evaluator.evaluate(current, None, 1000).evaluations[0]
+        self.assertEqual(second.assessment, "Ironclad")
+
+if __name__ == '__main__':
+    unittest.main()
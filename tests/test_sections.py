@@ -0,0 +1,47 @@
+import unittest
+from src.sections import SectionPageSelector, detect_sections, looks_like_toc
+
+TOC_PAGE = """添付資料の目次
+1．経営成績等の概況 ..................... 2
+2．連結財務諸表 ......................... 5
+（1）連結貸借対照表 ..................... 5
+（2）連結損益計算書 ..................... 7
+（3）連結キャッシュ・フロー計算書 ....... 9
+"""
+
+class TestSections(unittest.TestCase):
+    def test_toc_is_not_a_section(self):
+        self.assertTrue(looks_like_toc(TOC_PAGE))
+        self.assertEqual(detect_sections(TOC_PAGE), set())
+
+    def test_detects_statement_variants(self):
+        self.assertEqual(detect_sections("（2）連結損益及び包括利益計算書\n売上高 12,345"), {"pl"})
+        self.assertEqual(detect_sections("連結キャッシュ･フロー計算書"), {"cf"})
+        self.assertEqual(detect_sections("（1）連結貸借対照表"), {"bs"})
+
+    def test_selector_stops_after_statements(self):
+        pages = [
+            "2025年3月期 決算短信〔日本基準〕(連結)\nサマリー情報\n1．2025年3月期の連結業績",
+            TOC_PAGE,
+            "1．経営成績等の概況\n当期の経営成績は...",
+            "続き",
+            "株主還元方針",
+            "（1）連結貸借対照表\n資産の部",
+            "負債の部",
+            "（2）連結損益計算書",
+            "（3）連結キャッシュ・フロー計算書",
+            "営業活動によるキャッシュ・フロー 続き",
+            "セグメント情報",
+        ]
+        selector = SectionPageSelector(continuation_pages=1)
+        for page_no, text in enumerate(pages):
+            selector.feed(page_no, text)
+            if selector.done:
+                break
+
+        self.assertEqual(selector.selected, [0, 2, 3, 5, 6, 7, 8, 9])
+        self.assertTrue(selector.done)
+        self.assertEqual(selector.found["cf"], 8)
+
+if __name__ == '__main__':
+    unittest.main()
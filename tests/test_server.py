@@ -0,0 +1,168 @@
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.synthetic import write_pdf, filing_pages
+from src.evaluator import Evaluator
+from src.file_index import FileIndex
+from src.models import FinancialData
+from src.store import FinancialStore
+from src.server import AnalysisServer, ConcurrencyLimiter, HTTPError
+
+class FakeAsyncAnalyzer:
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def analyze(self, text, fast_path=True):
+        self.calls += 1
+        await self.release.wait()
+        return {"basic_info": {"company_name": "テスト1234株式会社", "fiscal_period": "2025年3月期 第1四半期"},
+                "pl": {"net_sales": 1200.0, "operating_profit": 150.0, "eps": 50.0}}
+
+async def request(port, method, path, payload=None, body=b"", headers=None):
+    if payload is not None:
+        body = json.dumps(payload).encode('utf-8')
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(body)}", "Connection: close"]
+    lines.extend(f"{k}: {v}" for k, v in (headers or {}).items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, data = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(data)
+
+class TestAnalysisServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp.name, "input")
+        os.makedirs(self.input_dir)
+        self.store = FinancialStore(os.path.join(self.tmp.name, "store.sqlite3"))
+        self.analyzer = FakeAsyncAnalyzer()
+        self.pool = ThreadPoolExecutor(max_workers=2)
+        self.server = AnalysisServer(Evaluator("config/criteria.yaml"), self.store, self.analyzer,
+                                     input_dir=self.input_dir, port=0, max_concurrency=1, max_waiting=0,
+                                     extract_pool=self.pool)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.pool.shutdown()
+        self.store.close()
+        self.tmp.cleanup()
+
+    async def test_evaluate_from_store_without_analyzing(self):
+        self.store.put("1234", "2025", "1Q", FinancialData(company_name="テスト", fiscal_period="2025年3月期 第1四半期",
+                                                          net_sales=1200.0, eps=50.0, bps=800.0))
+        self.store.put("1234", "2024", "1Q", FinancialData(net_sales=1000.0, eps=40.0))
+
+        status, body = await request(self.server.port, "POST", "/evaluate", {"code": "1234", "price": 1000})
+        self.assertEqual(status, 200)
+        self.assertEqual((body["year"], body["quarter"], body["source"]), ("2025", "1Q", "store"))
+        self.assertTrue(body["has_prior_year"])
+        self.assertEqual(body["report"]["valuations"]["PER"], "20.00倍")
+        self.assertEqual(self.analyzer.calls, 0)
+
+        status, body = await request(self.server.port, "POST", "/evaluate", {"code": "9999", "price": 1000})
+        self.assertEqual(status, 404)
+        status, body = await request(self.server.port, "POST", "/evaluate", {"code": "1234"})
+        self.assertEqual(status, 400)
+
+    async def test_analyze_stores_result_then_answers_from_store(self):
+        write_pdf(os.path.join(self.input_dir, "1234_2025_1Q.pdf"), filing_pages("1234", 2025, "1Q", 4))
+
+        status, body = await request(self.server.port, "POST", "/analyze", {"code": "1234", "price": 1000})
+        self.assertEqual(status, 200, body)
+        self.assertEqual(body["source"], "analyzed")
+        self.assertEqual(self.analyzer.calls, 1)
+        self.assertIsNotNone(self.store.get("1234", "2025", "1Q"))
+
+        status, body = await request(self.server.port, "POST", "/analyze", {"code": "1234", "price": 1000})
+        self.assertEqual(body["source"], "store")
+        self.assertEqual(self.analyzer.calls, 1)
+
+    async def test_uploaded_pdf(self):
+        path = os.path.join(self.tmp.name, "upload.pdf")
+        write_pdf(path, filing_pages("1234", 2025, "1Q", 4))
+        with open(path, 'rb') as f:
+            pdf = f.read()
+        status, body = await request(self.server.port, "POST", "/analyze?price=1000&code=1234&year=2025&quarter=1Q",
+                                     body=pdf, headers={"Content-Type": "application/pdf"})
+        self.assertEqual(status, 200, body)
+        self.assertEqual(body["report"]["company_name"], "テスト1234株式会社")
+        self.assertIsNotNone(self.store.get("1234", "2025", "1Q"))
+
+    async def test_rejects_excess_analyses_with_503(self):
+        write_pdf(os.path.join(self.input_dir, "1234_2025_1Q.pdf"), filing_pages("1234", 2025, "1Q", 4))
+        write_pdf(os.path.join(self.input_dir, "5678_2025_1Q.pdf"), filing_pages("5678", 2025, "1Q", 4))
+        self.analyzer.release.clear()
+
+        first = asyncio.create_task(request(self.server.port, "POST", "/analyze", {"code": "1234", "price": 1000}))
+        while self.analyzer.calls == 0:
+            await asyncio.sleep(0.01)
+        status, body = await request(self.server.port, "POST", "/analyze", {"code": "5678", "price": 1000})
+        self.assertEqual(status, 503)
+
+        status, health = await request(self.server.port, "GET", "/health")
+        self.assertEqual(health["analyze"]["rejected"], 1)
+        self.analyzer.release.set()
+        status, body = await first
+        self.assertEqual(status, 200)
+
+    async def test_duplicate_requests_do_not_take_a_slot(self):
+        write_pdf(os.path.join(self.input_dir, "1234_2025_1Q.pdf"), filing_pages("1234", 2025, "1Q", 4))
+        self.analyzer.release.clear()
+
+        first = asyncio.create_task(request(self.server.port, "POST", "/analyze", {"code": "1234", "price": 1000}))
+        while self.analyzer.calls == 0:
+            await asyncio.sleep(0.01)
+        second = asyncio.create_task(request(self.server.port, "POST", "/analyze", {"code": "1234", "price": 2000}))
+        status, health = await request(self.server.port, "GET", "/health")
+        self.assertEqual(health["analyze"]["rejected"], 0)
+        self.analyzer.release.set()
+        for task in (first, second):
+            status, body = await task
+            self.assertEqual(status, 200, body)
+        self.assertEqual(self.analyzer.calls, 1)
+
+    async def test_finds_pdfs_added_after_start(self):
+        self.server.file_index = FileIndex(self.input_dir)
+        status, _ = await request(self.server.port, "POST", "/analyze", {"code": "1234", "price": 1000})
+        self.assertEqual(status, 404)
+
+        write_pdf(os.path.join(self.input_dir, "1234_2025_1Q.pdf"), filing_pages("1234", 2025, "1Q", 4))
+        status, body = await request(self.server.port, "POST", "/analyze", {"code": "1234", "price": 1000})
+        self.assertEqual(status, 200, body)
+        self.assertEqual((body["year"], body["source"]), ("2025", "analyzed"))
+
+    async def test_oversized_request_line(self):
+        status, body = await request(self.server.port, "GET", "/health?" + "x" * 70000)
+        self.assertEqual(status, 400)
+        self.assertIn("too long", body["error"])
+
+    async def test_unknown_route(self):
+        status, _ = await request(self.server.port, "GET", "/nope")
+        self.assertEqual(status, 404)
+        status, _ = await request(self.server.port, "GET", "/analyze")
+        self.assertEqual(status, 405)
+
+class TestConcurrencyLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_queues_up_to_max_waiting(self):
+        limiter = ConcurrencyLimiter(limit=1, max_waiting=1)
+        await limiter.__aenter__()
+        waiter = asyncio.create_task(limiter.__aenter__())
+        await asyncio.sleep(0)
+        self.assertEqual(limiter.waiting, 1)
+        with self.assertRaises(HTTPError) as cm:
+            await limiter.__aenter__()
+        self.assertEqual(cm.exception.status, 503)
+        await limiter.__aexit__(None, None, None)
+        await waiter
+        self.assertEqual(limiter.stats()["active"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+from src.models import FinancialData
+from src.store import FinancialStore
+
+class TestFinancialStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = FinancialStore(os.path.join(self.tmp.name, "financials.sqlite3"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_roundtrip(self):
+        data = FinancialData(net_sales=1300, eps=45.6, company_name="東京エレクトロン",
+                             fiscal_period="2024年3月期 第1四半期", progress_comment="順調")
+        raw = {"pl": {"net_sales": 1300}, "provenance": {"pl.net_sales": "parser"}}
+        self.store.put("8035", "2024", "1Q", data, raw, "input/8035_2024_1Q.pdf")
+
+        self.assertEqual(self.store.get("8035", "2024", "1Q"), data)
+        self.assertEqual(self.store.get_raw("8035", "2024", "1Q"), raw)
+        self.assertIsNone(self.store.get("8035", "2023", "1Q"))
+
+    def test_replace_and_bulk_queries(self):
+        self.store.put_many([
+            ("8035", "2023", "1Q", FinancialData(net_sales=1000), None, ""),
+            ("8035", "2024", "1Q", FinancialData(net_sales=1200), None, ""),
+            ("8035", "2024", "通期", FinancialData(net_sales=5000), None, ""),
+            ("6758", "2024", "1Q", FinancialData(net_sales=3000), None, ""),
+        ])
+        self.store.put("8035", "2024", "1Q", FinancialData(net_sales=1300))
+
+        self.assertEqual(self.store.periods("8035"), [("2023", "1Q"), ("2024", "1Q"), ("2024", "通期")])
+        quarter = self.store.by_quarter("2024", "1Q")
+        self.assertEqual(sorted(quarter), ["6758", "8035"])
+        self.assertEqual(quarter["8035"].net_sales, 1300)
+        self.assertEqual(self.store.latest("8035")[:2], ("2024", "通期"))
+        self.assertEqual(self.store.codes(), ["6758", "8035"])
+
+if __name__ == '__main__':
+    unittest.main()
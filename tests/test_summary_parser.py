@@ -0,0 +1,98 @@
+import unittest
+from src.summary_parser import parse_summary_page, missing_fields, merge_results
+from src.ai_analyzer import narrow_prompt, ANALYSIS_PROMPT
+from src.evaluator import Evaluator
+
+SUMMARY_1Q = """2025年3月期 第1四半期決算短信〔日本基準〕(連結)
+2024年8月9日
+上場会社名 テスト工業株式会社 上場取引所 東
+コード番号 1234 URL https://www.example.co.jp
+(百万円未満切捨て)
+1．2025年3月期第1四半期の連結業績（2024年4月1日～2024年6月30日）
+(1) 連結経営成績（累計） (%表示は、対前年同四半期増減率)
+売上高 営業利益 経常利益 親会社株主に帰属する四半期純利益
+百万円 % 百万円 % 百万円 % 百万円 %
+2025年3月期第1四半期 12,345 10.5 1,500 △3.2 1,600 2.0 1,000 －
+2024年3月期第1四半期 11,172 5.0 1,550 8.1 1,568 7.7 900 1.1
+(注) 包括利益 2025年3月期第1四半期 1,200百万円 (5.0%)
+1株当たり四半期純利益 潜在株式調整後1株当たり四半期純利益
+円 銭 円 銭
+2025年3月期第1四半期 45.67 －
+2024年3月期第1四半期 41.10 －
+(2) 連結財政状態
+総資産 純資産 自己資本比率
+百万円 百万円 %
+2025年3月期第1四半期 80,000 50,000 61.2
+2024年3月期 78,000 49,000 61.0
+2．配当の状況
+3．2025年3月期の連結業績予想（2024年4月1日～2025年3月31日）
+売上高 営業利益 経常利益
+百万円 % 百万円 % 百万円 %
+通期 52,000 8.0 6,500 5.0 6,700 4.0
+\f1．経営成績等の概況
+"""
+
+class TestSummaryParser(unittest.TestCase):
+    def test_parse_quarterly_summary(self):
+        parsed = parse_summary_page(SUMMARY_1Q)
+        self.assertEqual(parsed["basic_info"], {"company_name": "テスト工業株式会社",
+                                                "fiscal_period": "2025年3月期 第1四半期"})
+        self.assertEqual(parsed["pl"], {"net_sales": 12345, "operating_profit": 1500, "ordinary_profit": 1600,
+                                        "net_income": 1000, "eps": 45.67, "operating_profit_forecast": 6500})
+        self.assertEqual(parsed["bs"], {"total_assets": 80000, "total_net_assets": 50000, "equity_ratio": 61.2})
+        self.assertEqual(parsed["cf"], {})
+
+    def test_negative_numbers(self):
+        text = "2025年3月期 決算短信〔日本基準〕(連結)\n(3) 連結キャッシュ・フローの状況\n2025年3月期 5,000 △1,200 ▲800 9,000\n"
+        parsed = parse_summary_page(text)
+        self.assertEqual(parsed["basic_info"]["fiscal_period"], "2025年3月期 通期")
+        self.assertEqual(parsed["cf"], {"operating_cf": 5000, "investment_cf": -1200, "financing_cf": -800})
+
+    def test_thousand_yen_filer_is_scaled_to_millions(self):
+        text = (SUMMARY_1Q.replace("百万円", "千円")
+                .replace("12,345 10.5 1,500", "12,345,678 10.5 1,500,000")
+                .replace("80,000 50,000", "80,000,000 50,000,000")
+                .replace("通期 52,000 8.0 6,500", "通期 52,000,000 8.0 6,500,000"))
+        parsed = parse_summary_page(text)
+        self.assertEqual(parsed["pl"]["net_sales"], 12345.678)
+        self.assertEqual(parsed["pl"]["operating_profit"], 1500)
+        self.assertEqual(parsed["pl"]["operating_profit_forecast"], 6500)
+        # Per-share and ratio columns are not amounts
+        self.assertEqual(parsed["pl"]["eps"], 45.67)
+        self.assertEqual(parsed["bs"], {"total_assets": 80000, "total_net_assets": 50000, "equity_ratio": 61.2})
+
+    def test_unknown_unit_is_left_to_the_llm(self):
+        text = SUMMARY_1Q.replace("百万円 % 百万円 % 百万円 % 百万円 %", "円 % 円 % 円 % 円 %")
+        parsed = parse_summary_page(text)
+        self.assertNotIn("net_sales", parsed["pl"])
+        self.assertIn("pl.net_sales", missing_fields(parsed))
+        self.assertEqual(parsed["bs"]["total_assets"], 80000)
+
+    def test_merge_prefers_parser_and_maps_to_model(self):
+        parsed = parse_summary_page(SUMMARY_1Q)
+        llm = {"pl": {"net_sales": 99999}, "bs": {"current_assets": 30000, "bps": None},
+               "qualitative": {"progress_comment": "順調"}}
+        merged = merge_results(parsed, llm)
+
+        self.assertEqual(merged["pl"]["net_sales"], 12345)
+        self.assertEqual(merged["provenance"]["pl.net_sales"], "parser")
+        self.assertEqual(merged["provenance"]["bs.current_assets"], "llm")
+        self.assertNotIn("bs.bps", merged["provenance"])
+
+        data = Evaluator("config/criteria.yaml").map_json_to_model(merged)
+        self.assertEqual(data.current_assets, 30000)
+        self.assertEqual(data.eps, 45.67)
+        self.assertEqual(data.progress_comment, "順調")
+
+    def test_narrowed_prompt(self):
+        missing = missing_fields(parse_summary_page(SUMMARY_1Q))
+        prompt = narrow_prompt(missing)
+        self.assertIn("current_assets", prompt)
+        self.assertNotIn("net_sales", prompt)
+        self.assertNotIn("(basic_info)", prompt)
+        self.assertIn("(qualitative)", prompt)
+        # With nothing parsed the prompt is the full one, so cached responses stay valid
+        self.assertEqual(narrow_prompt(missing_fields({})), ANALYSIS_PROMPT)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import random
+import unittest
+from src.models import FinancialData
+from src.timeseries import QuarterlySeries
+
+def ytd(sales, op, eps):
+    return FinancialData(net_sales=sales, operating_profit=op, eps=eps)
+
+# Cumulative (YTD) figures as printed in 決算短信
+FILINGS = [
+    ("2022", "1Q", ytd(100, 10, 1.0)), ("2022", "2Q", ytd(210, 22, 2.1)),
+    ("2022", "3Q", ytd(330, 35, 3.3)), ("2022", "通期", ytd(460, 50, 4.6)),
+    ("2023", "1Q", ytd(120, 13, 1.2)), ("2023", "2Q", ytd(250, 28, 2.5)),
+    ("2023", "3Q", ytd(390, 44, 3.9)), ("2023", "通期", ytd(540, 62, 5.4)),
+    ("2024", "1Q", ytd(150, 18, 1.5)),
+]
+
+class TestQuarterlySeries(unittest.TestCase):
+    def build(self, filings):
+        series = QuarterlySeries()
+        for year, quarter, data in filings:
+            series.add(year, quarter, data)
+        return series
+
+    def test_standalone_and_ttm(self):
+        series = self.build(FILINGS)
+
+        q = series.metrics((2023, 3)).quarter
+        self.assertEqual(q["net_sales"], 140)
+        self.assertEqual(q["operating_profit"], 16)
+        self.assertEqual(series.metrics((2023, 4)).quarter["net_sales"], 150)
+
+        # FY2023 + 1Q2024 - 1Q2023
+        ttm = series.metrics((2024, 1)).ttm
+        self.assertEqual(ttm["net_sales"], 570)
+        self.assertEqual(ttm["operating_profit"], 67)
+        self.assertIsNone(series.metrics((2022, 2)).ttm["net_sales"])
+
+        # 1Q2024 (150) against the standalone 4Q2023 (150)
+        self.assertAlmostEqual(series.metrics((2024, 1)).qoq["net_sales"], 0.0)
+        self.assertAlmostEqual(series.metrics((2024, 1)).ttm_margin, 67 / 570 * 100)
+
+    def test_cagr_and_margin_trend(self):
+        series = self.build(FILINGS)
+        years, rate = series.cagr("net_sales", period=(2023, 4))
+        self.assertEqual(years, 1)
+        self.assertAlmostEqual(rate, (540 / 460 - 1) * 100)
+        self.assertIsNone(series.cagr("net_sales", period=(2022, 4)))
+        self.assertGreater(series.margin_trend(), 0)
+
+    def test_incremental_matches_full_rebuild(self):
+        expected = self.build(FILINGS)
+        for seed in range(5):
+            shuffled = list(FILINGS)
+            random.Random(seed).shuffle(shuffled)
+            series = self.build(shuffled)
+            self.assertEqual(series.standalone, expected.standalone)
+            self.assertEqual(series.ttm, expected.ttm)
+
+    def test_missing_prior_quarter(self):
+        series = self.build([f for f in FILINGS if f[:2] != ("2023", "3Q")])
+        self.assertIsNone(series.metrics((2023, 4)).quarter["net_sales"])
+        self.assertIsNone(series.metrics((2024, 1)).qoq["net_sales"])
+        self.assertEqual(series.metrics((2024, 1)).ttm["net_sales"], 570)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import random
+import importlib.util
+import unittest
+from src.models import FinancialData
+from src.evaluator import Evaluator
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+def random_data(rng: random.Random) -> FinancialData:
+    def value(scale, allow_negative=False):
+        r = rng.random()
+        if r < 0.15:
+            return None
+        if r < 0.2:
+            return 0
+        v = rng.uniform(-scale if allow_negative else 0, scale)
+        return round(v, 2) if rng.random() < 0.5 else int(v)
+
+    return FinancialData(
+        net_sales=value(100000), operating_profit=value(20000, True), eps=value(500, True),
+        operating_profit_forecast=value(40000), total_net_assets=value(50000),
+        current_assets=value(30000), current_liabilities=value(20000),
+        interest_bearing_debt=value(40000), equity_ratio=value(90), bps=value(5000),
+        quick_assets=value(25000), operating_cf=value(30000, True), investment_cf=value(20000, True),
+        cost_efficiency_comment=rng.choice(["", "研究開発費と広告宣伝費が増加", "交際費が増加", "特になし"]),
+        fiscal_period=rng.choice(["2024年3月期 第1四半期", "2024年3月期 第2四半期", "2024年3月期 第3四半期",
+                                  "2024年3月期 通期", "Unknown", ""]),
+        company_name=f"Company{rng.randint(0, 999)}",
+    )
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+class TestEvaluateBatch(unittest.TestCase):
+    def setUp(self):
+        self.evaluator = Evaluator("config/criteria.yaml")
+
+    def test_matches_scalar_path(self):
+        rng = random.Random(42)
+        items = []
+        for _ in range(500):
+            last = random_data(rng) if rng.random() < 0.8 else None
+            items.append((random_data(rng), last, rng.choice([1000, 2500.5, 24000])))
+
+        batch = self.evaluator.evaluate_batch(items)
+        scalar = [self.evaluator.evaluate(c, l, p) for c, l, p in items]
+        self.assertEqual(batch, scalar)
+
+    def test_batch_metrics_columns(self):
+        items = [(FinancialData(net_sales=1300, operating_profit=100, eps=100), FinancialData(net_sales=1000), 1500),
+                 (FinancialData(net_sales=None, eps=0), None, 1500)]
+        metrics = self.evaluator.batch_metrics(items)
+        self.assertEqual(metrics['pl.revenue_growth_yoy.valid'].tolist(), [True, False])
+        self.assertEqual(metrics['pl.revenue_growth_yoy.label'][0], "Top Class")
+        self.assertAlmostEqual(metrics['per'][0], 15.0)
+        self.assertFalse(metrics['per.valid'][1])
+
+    def test_empty(self):
+        self.assertEqual(self.evaluator.evaluate_batch([]), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from src.evaluator import Evaluator
+from src.file_index import FileIndex
+from src.store import FinancialStore
+from src.watcher import FilingWatcher, WatchJob, WorkQueue
+
+class FakeAnalyzer:
+    def analyze(self, text, fast_path=True):
+        sales = 1200 if "2024" in text else 1000
+        return {"basic_info": {"company_name": "テスト", "fiscal_period": text},
+                "pl": {"net_sales": sales, "operating_profit": sales / 10, "eps": 50.0}}
+
+class FakeReporter:
+    def __init__(self):
+        self.reports = []
+
+    def submit(self, code, year, quarter, report):
+        self.reports.append((code, year, quarter, report))
+
+class TestWorkQueue(unittest.TestCase):
+    def test_deduplicates_pending_jobs(self):
+        queue = WorkQueue(maxsize=4)
+        first = WatchJob("8035", "2024", "1Q", "a.pdf")
+        queue.put(first)
+        queue.put(WatchJob("8035", "2024", "1Q", "b.pdf"))
+        queue.put(WatchJob("6758", "2024", "1Q", "c.pdf"))
+        self.assertEqual(len(queue), 2)
+        self.assertEqual(queue.deduplicated, 1)
+
+        job = queue.get()
+        self.assertEqual(job.path, "b.pdf")
+        self.assertEqual(job.detected_at, first.detected_at)
+        self.assertEqual(queue.get().code, "6758")
+
+    def test_bounded(self):
+        queue = WorkQueue(maxsize=1)
+        self.assertTrue(queue.put(WatchJob("8035", "2024", "1Q", "a.pdf")))
+        self.assertFalse(queue.put(WatchJob("6758", "2024", "1Q", "b.pdf"), timeout=0.01))
+
+        consumer = threading.Timer(0.05, queue.get)
+        consumer.start()
+        self.assertTrue(queue.put(WatchJob("6758", "2024", "1Q", "b.pdf"), timeout=2))
+        consumer.join()
+
+    def test_close_drains(self):
+        queue = WorkQueue()
+        queue.put(WatchJob("8035", "2024", "1Q", "a.pdf"))
+        queue.close()
+        self.assertIsNotNone(queue.get())
+        self.assertIsNone(queue.get())
+
+class TestFilingWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp.name, "input")
+        os.makedirs(self.input_dir)
+        self._touch("8035_2023_1Q.pdf")
+        self.prices_path = os.path.join(self.tmp.name, "prices.csv")
+        with open(self.prices_path, 'w', encoding='utf-8') as f:
+            f.write("code,price\n8035,24000\n")
+        self.store = FinancialStore(os.path.join(self.tmp.name, "financials.sqlite3"))
+        self.reporter = FakeReporter()
+        self.watcher = FilingWatcher(self.input_dir, FakeAnalyzer(), Evaluator("config/criteria.yaml"),
+                                     self.reporter, self.prices_path, store=self.store,
+                                     file_index=FileIndex(self.input_dir))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def _touch(self, name, content=b"%PDF-1.4"):
+        with open(os.path.join(self.input_dir, name), 'wb') as f:
+            f.write(content)
+
+    def test_scan_reports_new_and_rewritten_files(self):
+        # The filing written before startup has not been analyzed yet
+        self.assertEqual([j.key for j in self.watcher.scan()], [("8035", "2023", "1Q")])
+        self.assertEqual(self.watcher.scan(), [])
+        self._touch("8035_2024_1Q.pdf")
+        self.assertEqual([j.key for j in self.watcher.scan()], [("8035", "2024", "1Q")])
+        self.assertEqual(self.watcher.scan(), [])
+
+        self._touch("8035_2023_1Q.pdf", b"%PDF-1.4 revised")
+        self.assertEqual([j.key for j in self.watcher.scan()], [("8035", "2023", "1Q")])
+
+    def test_first_scan_picks_up_filings_added_while_stopped(self):
+        index_path = os.path.join(self.tmp.name, "file_index.json")
+        FileIndex(self.input_dir, index_path)
+        self.store.put("8035", "2023", "1Q", Evaluator("config/criteria.yaml").map_json_to_model({}), {}, "x.pdf")
+        # Written while no watcher was running; the persisted index does not know it yet
+        self._touch("8035_2024_1Q.pdf")
+
+        watcher = FilingWatcher(self.input_dir, FakeAnalyzer(), Evaluator("config/criteria.yaml"),
+                                self.reporter, self.prices_path, store=self.store,
+                                file_index=FileIndex(self.input_dir, index_path))
+        self.assertEqual([j.key for j in watcher.scan()], [("8035", "2024", "1Q")])
+        self.assertEqual(watcher.scan(), [])
+
+        # Indexed by an earlier run but never stored, e.g. queued when the daemon was stopped
+        restarted = FilingWatcher(self.input_dir, FakeAnalyzer(), Evaluator("config/criteria.yaml"),
+                                  self.reporter, self.prices_path, store=self.store,
+                                  file_index=FileIndex(self.input_dir, index_path))
+        self.assertEqual([j.key for j in restarted.scan()], [("8035", "2024", "1Q")])
+
+    def test_first_scan_does_not_backfill_the_archive(self):
+        for name in ("8035_2022_1Q.pdf", "8035_2024_通期.pdf", "8035_2024_2Q.pdf", "6758_2024_3Q.pdf"):
+            self._touch(name)
+        with mock.patch("builtins.print") as printed:
+            jobs = self.watcher.scan()
+        # Only the latest period of each code; the three older 8035 filings are left to backfill
+        self.assertEqual(sorted(j.key for j in jobs), [("6758", "2024", "3Q"), ("8035", "2024", "通期")])
+        self.assertIn("3 件", printed.call_args[0][0])
+
+        # Later scans queue every new filing, whatever its period
+        self._touch("8035_2021_1Q.pdf")
+        self.assertEqual([j.key for j in self.watcher.scan()], [("8035", "2021", "1Q")])
+
+    def test_process_updates_store_and_report(self):
+        self._touch("8035_2024_1Q.pdf")
+        job, = [j for j in self.watcher.scan() if j.year == "2024"]
+        with mock.patch("src.watcher.extract_text_guarded", side_effect=lambda path, *a, **kw: path):
+            self.watcher.process(job)
+
+        self.assertEqual(self.store.get("8035", "2024", "1Q").net_sales, 1200)
+        self.assertEqual(self.store.get("8035", "2023", "1Q").net_sales, 1000)
+        (code, year, quarter, report), = self.reporter.reports
+        self.assertEqual((code, year, quarter), ("8035", "2024", "1Q"))
+        self.assertEqual(report.stock_price, 24000)
+        snapshot = self.watcher.metrics.snapshot()
+        self.assertEqual(snapshot["stages"]["total"]["count"], 1)
+        self.assertIn("analyze", snapshot["stages"])
+
+if __name__ == '__main__':
+    unittest.main()